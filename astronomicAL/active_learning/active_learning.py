@@ -1,6 +1,24 @@
-from astronomicAL.extensions import models, query_strategies, feature_generation
-from astronomicAL.utils.optimise import optimise
+from astronomicAL.active_learning.batch import BATCH_DIVERSITY, query_batch
+from astronomicAL.active_learning.committee import (
+    ParallelCommittee,
+    map_members,
+    share_n_jobs,
+)
+from astronomicAL.active_learning.incremental import (
+    DEFAULT_REFIT_EVERY,
+    TRAINING_MODES,
+    IncrementalTrainer,
+)
+from astronomicAL.active_learning import preprocessing
+from astronomicAL.active_learning.predictions import PredictionCache
+from astronomicAL.active_learning.speculative import SpeculativeCache
+from astronomicAL.active_learning.training_data import ActivePool, LabelledSet
+from astronomicAL.active_learning.worker import TrainingWorker
+from astronomicAL.extensions import models, query_strategies
+from astronomicAL.utils.inference import predict_chunked
+from astronomicAL.utils.metrics import binary_classification_metrics
 from astronomicAL.utils import save_config
+from astronomicAL.utils.source_index import get_source
 from bokeh.models import (
     ColumnDataSource,
     CheckboxButtonGroup,
@@ -15,27 +33,17 @@ from holoviews.operation.datashader import (
     dynspread,
 )
 from joblib import dump
-from modAL.models import ActiveLearner, Committee
+from modAL.models import ActiveLearner
 from sklearn.base import clone
-from sklearn.preprocessing import RobustScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import (
-    accuracy_score,
-    confusion_matrix,
-    f1_score,
-    precision_score,
-    recall_score,
-)
 
 import astronomicAL.config as config
+import copy
 import datashader as ds
 import holoviews as hv
 import numpy as np
 import os
 import pandas as pd
 import panel as pn
-import json
-import sys
 import time
 
 
@@ -75,6 +83,9 @@ class ActiveLearningModel:
     _assigned : bool
         Flag for whether the user has assigned a label to the current queried
         source.
+    _checkpoint_enabled : bool
+        Whether `checkpoint_button` was enabled before the query buttons were
+        locked while `worker` was busy.
     retrain : bool
         Flag for whether the class is retraining a previous model from within `config.settings["classifiers"]`
     scaler : sklearn.preprocessing.RobustScaler
@@ -136,14 +147,28 @@ class ActiveLearningModel:
         A dropdown menu showing all the classifiers initialised in `astronomicAL.extensions.models`.
     query_strategy_dropdown : Panel Select Widget
         A dropdown menu showing all the query strategies initialised in `astronomicAL.extensions.query_strategies`.
+    training_mode_dropdown : Panel Select Widget
+        A dropdown menu for choosing whether the selected classifier is refit from scratch after every label or trained incrementally.
+    refit_every_input : Panel IntInput Widget
+        Set the number of new labels after which incrementally trained classifiers are refit from scratch.
+    batch_size_input : Panel IntInput Widget
+        Set the number of queried sources the user labels before the classifiers are retrained.
+    batch_diversity_dropdown : Panel Select Widget
+        A dropdown menu for choosing how the sources in each batch are kept from being too similar to each other.
+    pool_scoring_dropdown : Panel Select Widget
+        A dropdown menu showing all the pool scoring options initialised in `astronomicAL.extensions.query_strategies`, which decide which sources in the pool are scored by the query strategy.
+    pool_sample_size_input : Panel IntInput Widget
+        Set the number of pool sources scored by the approximate pool scoring options.
+    speculative_checkbox : Panel Checkbox Widget
+        A checkbox for whether the classifiers for each possible label of the queried source are trained in the background while the user is labelling.
     starting_num_points : Panel IntInput Widget
         Set the number of initial randomly selected points to train on.
     classifier_table_source : ColumnDataSource
-        The collection of all the currently selected classifier and query strategy pairs.
+        The collection of all the currently selected classifier, query strategy and training mode combinations.
     classifier_table : DataTable
         The table for visualising `classifier_table_source`
     add_classifier_button : Panel Button Widget
-        The button for appending the currently selected values from `classifier_dropdown` and `query_strategy_dropdown` to `classifier_table_source`.
+        The button for appending the currently selected values from `classifier_dropdown`, `query_strategy_dropdown` and `training_mode_dropdown` to `classifier_table_source`.
     remove_classifier_button : Panel Button Widget
         The button for removing the last entry from `classifier_table_source`.
     start_training_button : Panel Button Widget
@@ -210,22 +235,42 @@ class ActiveLearningModel:
         A dataframe containing all the test labels.
     id_test : DataFrame
         A dataframe containing all the test ids.
+    labelled_set : LabelledSet
+        The sources that the classifier is training on.
     x_al_train : Numpy Array
-        The data that the classifier is training on.
+        View of the data that the classifier is training on.
     y_al_train : Numpy Array
-        The labels for the data the classifier is training on.
-    id_al_train : DataFrame
-        The ids of the data the classifier is training on.
+        View of the labels for the data the classifier is training on.
+    id_al_train : Numpy Array
+        View of the ids of the data the classifier is training on.
+    pool : ActivePool
+        The sources that are available to query from.
     x_pool : Numpy Array
-        The data of the sources in the pool that are available to query from.
+        Copy of the data of the sources in the pool that are available to query from.
     y_pool : Numpy Array
-        The labels of the sources in the pool that are available to query from.
-    id_pool : DataFrame
-        The ids of the sources in the pool that are available to query from.
-    query_index : int
+        View of the labels of the sources in the pool that are available to query from.
+    id_pool : Numpy Array
+        View of the ids of the sources in the pool that are available to query from.
+    query_index : Numpy Array
         The current index of `x_pool` that contains the current queried point.
+    query_instance : Numpy Array
+        The data of the current queried point.
+    batch_index : Numpy Array
+        The indices of `x_pool` of every source in the current batch of queried points.
+    batch_instances : Numpy Array
+        The data of every source in the current batch of queried points.
     learner : ModAL ActiveLearner
-        The current classifier that is being trained. If multiple classifiers exist in `classifier_table_source`, then `learner` will be a ModAL Committee.
+        The current classifier that is being trained. If multiple classifiers exist in `classifier_table_source`, then `learner` will be a ParallelCommittee, whose members are fitted and make predictions at the same time.
+    trainers : list of IncrementalTrainer
+        The trainers responsible for refitting each classifier in `learner`.
+    prediction_cache : PredictionCache
+        The predictions of the current `learner`, shared between the metrics and queries until it is refit.
+    pool_scorer : object
+        The pool scoring option from `astronomicAL.extensions.query_strategies` choosing which pool sources are scored at each query.
+    worker : TrainingWorker
+        The worker which trains `learner` and queries new sources in the background.
+    speculation : SpeculativeCache
+        The classifiers being pre-trained for each possible label of the current queried source.
     """
 
     def __init__(self, src, df, label):
@@ -240,8 +285,12 @@ class ActiveLearningModel:
 
         self._training = False
         self._assigned = False
+        self._checkpoint_enabled = False
         self.retrain = False
 
+        self.worker = TrainingWorker()
+        self.speculation = SpeculativeCache(max_size=2)
+
         if "config_load_level" in list(config.settings.keys()):
             if (config.settings["config_load_level"] == 2) and (
                 f"{self._label}" in config.settings["classifiers"]
@@ -250,39 +299,29 @@ class ActiveLearningModel:
                 if ("y" in keys) and ("id" in keys):
                     self.retrain = True
 
-        if len(config.ml_data.keys()) == 0:
-            print("preprocessing...")
-            self._preprocess_data()
-
-            self.x_train_without_unknowns = config.ml_data["x_train_without_unknowns"]
-
-        elif len(config.ml_data["x_train_with_unknowns"].columns) == 0:
-            print("preprocessing...")
-            self._preprocess_data()
-
-            self.x_train_without_unknowns = config.ml_data["x_train_without_unknowns"]
+        if preprocessing.is_preprocessed(self.df):
+            self.df = config.main_df
         else:
+            self.df = preprocessing.preprocess_data(self.df)
 
-            self.x_train_without_unknowns = config.ml_data["x_train_without_unknowns"]
-
-            self.y_train_without_unknowns = config.ml_data["y_train_without_unknowns"]
-            self.y_train_with_unknowns = config.ml_data["y_train_with_unknowns"]
-            self.y_val = config.ml_data["y_val"]
-            self.y_test = config.ml_data["y_test"]
+        self.x_train_without_unknowns = config.ml_data["x_train_without_unknowns"]
 
-            self.id_train_with_unknowns = config.ml_data["id_train_with_unknowns"]
-            self.id_train_without_unknowns = config.ml_data["id_train_without_unknowns"]
-            self.id_val = config.ml_data["id_val"]
-            self.id_test = config.ml_data["id_test"]
+        self.id_train_with_unknowns = config.ml_data["id_train_with_unknowns"]
+        self.id_train_without_unknowns = config.ml_data["id_train_without_unknowns"]
+        self.id_val = config.ml_data["id_val"]
+        self.id_test = config.ml_data["id_test"]
 
-            if config.settings["scale_data"]:
+        if config.settings["scale_data"]:
 
-                self.scaler = config.ml_data["scaler"]
-
-            self.df = config.main_df
+            self.scaler = config.ml_data["scaler"]
 
         self._convert_to_one_vs_rest()
 
+        # x_train_without_unknowns holds these rows of x_train_with_unknowns.
+        self._known_rows = np.flatnonzero(
+            self.y_train_with_unknowns[config.settings["label_col"]].to_numpy() != -1
+        )
+
         self._construct_panel()
 
         self._initialise_placeholders()
@@ -390,7 +429,11 @@ class ActiveLearningModel:
 
         self.queried_points = ColumnDataSource(self._empty_data())
 
-        self.id_al_train = []
+        self.labelled_set = None
+
+        self.batch_index = np.array([], dtype=int)
+        self._batch_position = 0
+        self._batch_labelled = 0
 
         self.full_labelled_data = {"id": [], "y": []}
 
@@ -442,14 +485,40 @@ class ActiveLearningModel:
             name="Query Strategy",
             options=list(query_strategies.get_strategy_dict().keys()),
         )
+        self.training_mode_dropdown = pn.widgets.Select(
+            name="Training",
+            options=TRAINING_MODES,
+        )
         self.starting_num_points = pn.widgets.IntInput(
             name="How many initial points?", value=5, step=1, start=3
         )
+        self.refit_every_input = pn.widgets.IntInput(
+            name="Full refit every N labels", value=DEFAULT_REFIT_EVERY, step=1, start=1
+        )
+        self.batch_size_input = pn.widgets.IntInput(
+            name="Labels per refit", value=1, step=1, start=1
+        )
+        self.batch_diversity_dropdown = pn.widgets.Select(
+            name="Batch diversity", options=BATCH_DIVERSITY
+        )
+        self.pool_scoring_dropdown = pn.widgets.Select(
+            name="Pool scoring",
+            options=list(query_strategies.get_pool_scoring_dict().keys()),
+        )
+        self.pool_sample_size_input = pn.widgets.IntInput(
+            name="Pool sample size", value=10000, step=1000, start=1
+        )
+        self.speculative_checkbox = pn.widgets.Checkbox(
+            name="Pre-train while labelling", value=False
+        )
 
-        self.classifier_table_source = ColumnDataSource(dict(classifier=[], query=[]))
+        self.classifier_table_source = ColumnDataSource(
+            dict(classifier=[], query=[], training=[])
+        )
         table_column = [
             TableColumn(field="classifier", title="classifier"),
             TableColumn(field="query", title="query"),
+            TableColumn(field="training", title="training"),
         ]
 
         self.classifier_table = DataTable(
@@ -461,24 +530,57 @@ class ActiveLearningModel:
             if str(self._label) in config.settings["classifiers"].keys():
                 list_c1 = self.classifier_table_source.data["classifier"]
                 list_c2 = self.classifier_table_source.data["query"]
+                list_c3 = self.classifier_table_source.data["training"]
 
-                imported_classifiers = config.settings["classifiers"][f"{self._label}"][
-                    "classifier"
-                ]
-                imported_querys = config.settings["classifiers"][f"{self._label}"][
-                    "query"
-                ]
+                imported_settings = config.settings["classifiers"][f"{self._label}"]
+
+                imported_classifiers = imported_settings["classifier"]
+                imported_querys = imported_settings["query"]
+
+                # Configs saved before incremental training always refit.
+                imported_training = imported_settings.get(
+                    "training", ["Full"] * len(imported_classifiers)
+                )
+
+                if "refit_every" in imported_settings:
+                    self.refit_every_input.value = int(imported_settings["refit_every"])
+
+                if "batch_size" in imported_settings:
+                    self.batch_size_input.value = int(imported_settings["batch_size"])
+
+                if "batch_diversity" in imported_settings:
+                    self.batch_diversity_dropdown.value = imported_settings[
+                        "batch_diversity"
+                    ]
+
+                if "pool_scoring" in imported_settings:
+                    self.pool_scoring_dropdown.value = imported_settings[
+                        "pool_scoring"
+                    ]
+
+                if "pool_sample_size" in imported_settings:
+                    self.pool_sample_size_input.value = int(
+                        imported_settings["pool_sample_size"]
+                    )
+
+                if "speculative" in imported_settings:
+                    self.speculative_checkbox.value = bool(
+                        imported_settings["speculative"]
+                    )
 
                 assert len(imported_classifiers) == len(imported_querys)
+                assert len(imported_classifiers) == len(imported_training)
 
                 for i in range(len(imported_classifiers)):
 
                     list_c1.append(imported_classifiers[i])
                     list_c2.append(imported_querys[i])
+                    list_c3.append(imported_training[i])
 
                 self.classifier_table_source.data = {
                     "classifier": list_c1,
                     "query": list_c2,
+                    "training": list_c3,
                 }
 
         self.add_classifier_button = pn.widgets.Button(name=">>", max_height=30)
@@ -585,165 +687,38 @@ class ActiveLearningModel:
         self.conf_mat_test_fp = "FP"
         self.conf_mat_test_tp = "TP"
 
-    def _preprocess_data(self):
-
-        self.df, self.all_al_data = self.generate_features(self.df)
-
-        x, y = self.split_x_y_ids(self.all_al_data)
-
-        excluded_x = {}
-        excluded_y = {}
-        if config.settings["exclude_labels"]:
-            for label in config.settings["unclassified_labels"]:
-                (
-                    x,
-                    y,
-                    excluded_x[f"{label}"],
-                    excluded_y[f"{label}"],
-                ) = self.exclude_unclassified_labels(x, y, label)
-
-        if "-1" in config.settings["labels_to_strings"].keys():
-            print("removing -1")
-            label = config.settings["labels_to_strings"]["-1"]
-            (
-                x,
-                y,
-                excluded_x[f"{label}"],
-                excluded_y[f"{label}"],
-            ) = self.exclude_unclassified_labels(x, y, label)
-
-        (
-            self.x_train,
-            y_train,
-            self.x_val,
-            y_val,
-            self.x_test,
-            y_test,
-        ) = self.train_val_test_split(x, y, excluded_x, excluded_y, 0.6, 0.2)
-
-        if "exclude_unknown_labels" in config.settings.keys():
-            if not config.settings["exclude_unknown_labels"]:
-                if "-1" in config.settings["labels_to_strings"].keys():
-                    if config.settings["labels_to_strings"]["-1"] in excluded_x.keys():
-                        self.x_train = self.x_train.append(
-                            excluded_x[config.settings["labels_to_strings"]["-1"]],
-                            ignore_index=True,
-                        )
-                        y_train = y_train.append(
-                            excluded_y[config.settings["labels_to_strings"]["-1"]],
-                            ignore_index=True,
-                        )
-
-        x_cols = list(self.x_train.columns)
-        y_cols = list(y_train.columns)
-
-        if "index" in x_cols:
-            x_cols.remove("index")
-
-        if "index" in y_cols:
-            y_cols.remove("index")
-
-        if "level_0" in x_cols:
-            x_cols.remove("level_0")
-
-        if "level_0" in y_cols:
-            y_cols.remove("level_0")
-
-        assert not "index" in x_cols
-        assert not "index" in y_cols
-        assert not "level_0" in x_cols
-        assert not "level_0" in y_cols
-
-        self.x_cols = x_cols
-        self.y_cols = y_cols
-
-        print(f"train: {y_train[config.settings['label_col']].value_counts()}")
-        print(f"val: {y_val[config.settings['label_col']].value_counts()}")
-        print(f"test: {y_test[config.settings['label_col']].value_counts()}")
-
-        if config.settings["scale_data"]:
-
-            (self.x_train, self.x_val, self.x_test,) = self.scale_data(
-                self.x_train,
-                self.x_val,
-                self.x_test,
-                self.x_cols,
-            )
-
-        (
-            self.y_train,
-            self.id_train,
-            self.y_val,
-            self.id_val,
-            self.y_test,
-            self.id_test,
-        ) = self.split_y_ids(y_train, y_val, y_test)
-
-        self.assign_global_data()
-
-        total = 0
-        total += sys.getsizeof(config.ml_data)
-        for dataframe in config.ml_data.keys():
-            total += sys.getsizeof(config.ml_data[dataframe])
-
-        for key in config.ml_data.keys():
-            if isinstance(config.ml_data[key], pd.DataFrame):
-                config.ml_data[key] = optimise(config.ml_data[key])
-
-        total = 0
-        total += sys.getsizeof(config.ml_data)
-        for dataframe in config.ml_data.keys():
-            total += sys.getsizeof(config.ml_data[dataframe])
-
-    def assign_global_data(self):
-        """Assign the current train, validation and test sets to the shared
-         `ml_data` dictionary so that it can be used by other classifiers.
-
-        Returns
-        -------
-        None
-
-        """
-
-        self.x_train = self.x_train[self.x_cols]
-        self.x_val = self.x_val[self.x_cols]
-        self.x_test = self.x_test[self.x_cols]
-
-        print(self.x_train.shape)
-        print(self.y_train.shape)
-        print(self.y_train[config.settings["label_col"]] != -1)
-
-        config.ml_data["x_train_without_unknowns"] = self.x_train[
-            self.y_train[config.settings["label_col"]] != -1
-        ]
+    @property
+    def x_al_train(self):
+        return self.labelled_set.x
 
-        self.x_train_without_unknowns = self.x_train[
-            self.y_train[config.settings["label_col"]] != -1
-        ]
+    @property
+    def y_al_train(self):
+        return self.labelled_set.y
 
-        config.ml_data["x_train_with_unknowns"] = self.x_train
-        config.ml_data["x_val"] = self.x_val
-        config.ml_data["x_test"] = self.x_test
+    @property
+    def id_al_train(self):
+        return self.labelled_set.ids
 
-        config.ml_data["y_train_without_unknowns"] = self.y_train[
-            self.y_train[config.settings["label_col"]] != -1
-        ]
-        config.ml_data["y_train_with_unknowns"] = self.y_train
-        config.ml_data["y_val"] = self.y_val
-        config.ml_data["y_test"] = self.y_test
+    @property
+    def x_pool(self):
+        return self.pool.x
 
-        config.ml_data["id_train_without_unknowns"] = self.id_train[
-            self.y_train[config.settings["label_col"]] != -1
-        ]
-        config.ml_data["id_train_with_unknowns"] = self.id_train
-        config.ml_data["id_val"] = self.id_val
-        config.ml_data["id_test"] = self.id_test
+    @property
+    def y_pool(self):
+        return self.pool.y
 
-        if config.settings["scale_data"]:
-            config.ml_data["scaler"] = self.scaler
+    @property
+    def id_pool(self):
+        return self.pool.ids
 
     def remove_from_pool(self, id=None):
-        """Remove the current queried source from the active learning pool.
+        """Remove the current batch of queried sources from the active learning pool.
+
+        Parameters
+        ----------
+        id : any, default = None
+            The id of the source to remove. If `None`, every source in the
+            current batch is removed.
 
         Returns
         -------
@@ -752,27 +727,9 @@ class ActiveLearningModel:
         """
 
         if id is None:
-            index = self.query_index
+            self.pool.remove(self.batch_index)
         else:
-            ind_list = list(self.id_pool.index.values)
-            df_index = self.id_pool.index[
-                self.id_pool[config.settings["id_col"]] == id
-            ].to_list()[0]
-            index = ind_list.index(df_index)
-
-        self.x_pool = np.delete(
-            self.x_pool,
-            index,
-            0,
-        )
-
-        self.y_pool = np.delete(
-            self.y_pool,
-            index,
-            0,
-        )
-
-        self.id_pool = self.id_pool.drop(self.id_pool.index[index])
+            self.pool.remove_id(id)
 
     def save_model(self, checkpoint=False):
         """Save the current classifier(s) as a joblib file to the models/
@@ -885,19 +842,17 @@ class ActiveLearningModel:
 
         data = self.df
 
-        queried_id = self.id_pool.iloc[query_idx][config.settings["id_col"]].copy()
+        queried_id = self.id_pool[query_idx]
 
         act_label = self.y_pool[query_idx]
 
-        selected_source = self.df[
-            self.df[config.settings["id_col"]] == queried_id.values[0]
-        ]
+        selected_source = get_source(queried_id[0], self.df)
 
         selected_dict = selected_source.set_index(config.settings["id_col"]).to_dict(
             "list"
         )
 
-        selected_dict[config.settings["id_col"]] = [queried_id.values[0]]
+        selected_dict[config.settings["id_col"]] = [queried_id[0]]
 
         try:
             self.src.data = selected_dict
@@ -925,6 +880,11 @@ class ActiveLearningModel:
     def iterate_AL(self):
         """Iterate through one iteration of active learning.
 
+        The classifiers are retrained and the next source is queried by
+        `worker`, after which the new results are displayed. If the classifiers
+        were pre-trained for the label that was assigned, they are used instead
+        of being retrained.
+
         Returns
         -------
         None
@@ -933,33 +893,285 @@ class ActiveLearningModel:
 
         # self.assign_label = False
 
+        self.curr_num_points = self.x_al_train.shape[0]
+
+        branch = self.speculation.take(
+            (self.id_al_train[-1], int(self.y_al_train[-1]))
+        )
+
+        self.worker.submit(
+            partial(self._train_and_query, branch),
+            self._iteration_done_cb,
+            on_error=partial(self._training_failed_cb, self.next_iteration_button),
+            on_progress=partial(self._training_progress_cb, self.next_iteration_button),
+        )
+
+    def _train_and_query(self, branch=None):
+
+        # The pool is only modified by the worker so that it is never changed
+        # while a query is reading it.
         self.remove_from_pool()
 
-        self.curr_num_points = self.x_al_train.shape[0]
+        predictions = None
+        if branch is not None:
+            predictions = self._use_branch(branch)
+
+        if predictions is None:
+            self.fit_learners()
+
+            self.save_model(checkpoint=False)
+
+            predictions = self._predict_sets()
+
+        query_index, query_instance = self.query_pool()
+
+        return predictions, query_index, query_instance
+
+    def start_speculation(self):
+        """Pre-train the classifiers for each label of the current queried source.
+
+        A copy of the classifiers is trained by `worker` for both the positive
+        and negative label while the user is labelling. The branch matching
+        the assigned label is then used by `iterate_AL` and the other is
+        discarded without being waited for. Only runs when
+        `speculative_checkbox` is checked.
+
+        The branches only copy the classifiers. They never read the pool, so
+        the next source is queried by `iterate_AL` with the shared
+        `pool_scorer` once the labelled source has been removed.
+
+        Returns
+        -------
+        None
+
+        """
+
+        self.speculation.clear()
+
+        if not self.speculative_checkbox.value:
+            return
+
+        # Branches only skip the refit after the last label of a batch.
+        if len(self.batch_index) > 1:
+            return
+
+        queried_id = self.id_pool[self.query_index][0]
+
+        for label in [1, 0]:
+            job = partial(
+                self._train_branch,
+                self.learner,
+                self.trainers,
+                self.x_al_train,
+                self.y_al_train,
+                self.query_instance,
+                label,
+            )
+            self.speculation.put(
+                (queried_id, label), self.worker.submit_background(job)
+            )
+
+    def _train_branch(self, learner, trainers, x, y, query, label):
+
+        # Only the classifiers are copied, the pool and its scorer are shared.
+        learner, trainers = copy.deepcopy((learner, trainers))
 
-        print("fitting...")
-        self.learner.fit(self.x_al_train, self.y_al_train)
+        x = np.vstack((x, query))
+        y = np.concatenate((y, [label]))
+
+        self._fit_trainers(learner, trainers, x, y)
+
+        cache = self._create_prediction_cache(learner)
+        predictions = self._predict_sets(learner, cache)
+
+        return learner, trainers, cache, predictions
+
+    def _use_branch(self, branch):
+
+        try:
+            learner, trainers, cache, predictions = branch.result()
+        except Exception as e:
+            print(f"pre-training failed ({e}), refitting...")
+            return None
+
+        self.learner = learner
+        self.trainers = trainers
+        self.prediction_cache = cache
+
+        fits = [trainer.last_fit for trainer in self.trainers]
+        print(f"using pre-trained classifiers... ({', '.join(fits)})")
 
         self.save_model(checkpoint=False)
 
-        self._update_predictions()
+        return predictions
+
+    def _iteration_done_cb(self, result):
+
+        predictions, query_index, query_instance = result
+
+        self._set_query(query_index, query_instance)
 
-        self.query_new_point()
+        self._update_predictions(predictions)
 
         self.show_queried_point()
 
         self.assign_label_button.name = "Assign"
 
+        self.next_iteration_button.name = "Querying..."
+
+        self.checkpoint_button.name = "Checkpoint"
+        self._assigned = False
+
+        self.next_iteration_button.disabled = False
+        self._unlock_query_buttons()
+        self.panel()
+        self.checkpoint_button.disabled = False
+
+        self.start_speculation()
+
+    def _training_progress_cb(self, button, elapsed):
+        button.name = f"Training... ({elapsed:.0f}s)"
+
+    def _training_failed_cb(self, button, error):
+        button.name = "Training Failed"
+        button.disabled = True
+
+    def fit_learners(self):
+        """Retrain every classifier on the current labelled training set.
+
+        Classifiers using incremental training are only refit from scratch
+        every `refit_every_input.value` labels.
+
+        Returns
+        -------
+        None
+
+        """
+
+        self._fit_trainers(
+            self.learner, self.trainers, self.x_al_train, self.y_al_train
+        )
+
+        self.prediction_cache = self._create_prediction_cache(self.learner)
+
+        fits = [trainer.last_fit for trainer in self.trainers]
+        print(f"fitting... ({', '.join(fits)})")
+
+    def _fit_trainers(self, learner, trainers, x, y):
+
+        # The members of a committee are fitted at the same time.
+        map_members(lambda trainer: trainer.fit(x, y), trainers)
+
+        if isinstance(learner, ParallelCommittee):
+            learner.reset_predict_times()
+
+    def _member_timings(self):
+
+        classifiers = self.classifier_table_source.data["classifier"]
+
+        predict_times = None
+        if isinstance(self.learner, ParallelCommittee):
+            predict_times = self.learner.predict_times()
+
+        timings = []
+        for i, trainer in enumerate(self.trainers):
+            timing = f"fit {trainer.fit_time:.2f}s"
+            if predict_times is not None:
+                timing += f", predict {predict_times[i]:.2f}s"
+            timings.append(f"{classifiers[i]}: {timing}")
+
+        return " | ".join(timings)
+
+    def _create_prediction_cache(self, learner):
+
+        return PredictionCache(
+            learner, config.ml_data["x_train_with_unknowns"].to_numpy()
+        )
+
     def query_new_point(self):
         """Query the most informative point from the training pool based off the
         chosen query metric.
 
+        If `batch_size_input.value` is greater than one, a batch of points is
+        queried and the first is made the current queried point.
+
         Returns
         -------
         None
 
         """
-        self.query_index, self.query_instance = self.learner.query(self.x_pool)
+        self._set_query(*self.query_pool())
+
+    def query_pool(self):
+        """Query a batch of `batch_size_input.value` points from the pool.
+
+        Only the pool sources chosen by `pool_scorer` are scored by the query
+        strategy, using the predictions in `prediction_cache` where possible.
+
+        Returns
+        -------
+        query_index : Numpy Array
+            The indices of `x_pool` of the queried points.
+        query_instance : Numpy Array
+            The data of the queried points.
+
+        """
+        learner = self.learner
+        cache = self.prediction_cache
+
+        rows = self.pool.rows
+
+        score = None
+        if cache.has_utility():
+
+            def score(positions):
+                return cache.utility(rows[positions])
+
+        candidates = self.pool_scorer.candidates(learner, self.pool, score=score)
+
+        if candidates is None:
+            x = self.x_pool
+            candidate_rows = rows
+        else:
+            x = self.pool.take(candidates)
+            candidate_rows = rows[candidates]
+
+        query_index, query_instance = query_batch(
+            learner,
+            x,
+            batch_size=self.batch_size_input.value,
+            diversity=self.batch_diversity_dropdown.value,
+            scores=cache.utility(candidate_rows),
+        )
+
+        if candidates is None:
+            return query_index, query_instance
+
+        return candidates[query_index], query_instance
+
+    def _set_query(self, query_index, query_instance):
+
+        self.batch_index = np.asarray(query_index)
+        self.batch_instances = query_instance
+        self._batch_labelled = 0
+        self._show_batch_position(0)
+
+    def _show_batch_position(self, position):
+
+        self._batch_position = position
+        self.query_index = self.batch_index[position : position + 1]
+        self.query_instance = self.batch_instances[position : position + 1]
+
+    def _next_in_batch(self):
+
+        if self._batch_position + 1 >= len(self.batch_index):
+            return False
+
+        self._show_batch_position(self._batch_position + 1)
+        self.show_queried_point()
+        self.start_speculation()
+
+        return True
 
     def _assign_label_cb(self, event):
 
@@ -968,11 +1180,11 @@ class ActiveLearningModel:
         query = self.query_instance
         query_idx = self.query_index
 
+        advanced = False
+
         if not selected_label == "Unsure":
 
-            self.full_labelled_data["id"].append(
-                list(self.id_pool.iloc[query_idx].values)[0][0]
-            )
+            self.full_labelled_data["id"].append(self.id_pool[query_idx][0])
             self.full_labelled_data["y"].append(
                 config.settings["strings_to_labels"][selected_label]
             )
@@ -993,32 +1205,39 @@ class ActiveLearningModel:
 
             selected_label = np.array([selected_label])
 
-            new_train = np.vstack((self.x_al_train, query))
-
-            new_label = np.concatenate((self.y_al_train, selected_label))
+            self.labelled_set.append(query, selected_label, self.id_pool[query_idx])
+            self._batch_labelled += 1
 
-            new_id = self.id_al_train.append(self.id_pool.iloc[query_idx])
-
-            self.x_al_train = new_train
-            self.y_al_train = new_label
-            self.id_al_train = new_id
+            # The classifiers are only retrained once the whole batch is labelled.
+            advanced = self._next_in_batch()
+            if advanced:
+                self._assigned = False
+                self.assign_label_button.name = "Assign"
 
         else:
 
-            self.full_labelled_data["id"].append(
-                list(self.id_pool.iloc[query_idx].values)[0][0]
-            )
+            self.full_labelled_data["id"].append(self.id_pool[query_idx][0])
             self.full_labelled_data["y"].append(-1)
 
-            self.assign_label_button.name = "Querying..."
-            self.assign_label_button.disabled = True
+            advanced = self._next_in_batch()
 
-            self.remove_from_pool()
-            self.query_new_point()
-            self.show_queried_point()
-            self.assign_label_button.name = "Assign"
-            self.assign_label_button.disabled = False
-            self.panel()
+            if advanced:
+                pass
+            elif self._batch_labelled > 0:
+                self._assigned = True
+                self.next_iteration_button.name = "Next Iteration"
+            else:
+                self.assign_label_button.name = "Querying..."
+                self._lock_query_buttons()
+
+                self.speculation.clear()
+                self.worker.submit(
+                    self._remove_and_query,
+                    self._query_done_cb,
+                    on_error=partial(
+                        self._training_failed_cb, self.assign_label_button
+                    ),
+                )
 
         config.settings["classifiers"][f"{self._label}"][
             "id"
@@ -1035,7 +1254,23 @@ class ActiveLearningModel:
             self.id_al_train
         ), f"AL_LABELS & IDs NOT EQUAL - {len(self.y_al_train)}|{len(self.id_al_train)}"
 
-        self.panel(button_update=True)
+        self.panel(button_update=not advanced)
+
+    def _remove_and_query(self):
+
+        self.remove_from_pool()
+
+        return self.query_pool()
+
+    def _query_done_cb(self, result):
+
+        self._set_query(*result)
+        self.show_queried_point()
+        self.assign_label_button.name = "Assign"
+        self._unlock_query_buttons()
+        self.panel()
+
+        self.start_speculation()
 
     def _empty_data(self):
 
@@ -1046,25 +1281,33 @@ class ActiveLearningModel:
 
         return empty
 
+    def _lock_query_buttons(self):
+
+        # The worker reorders the pool while it runs, so until it finishes
+        # `query_index` may point at a different source.
+        self._checkpoint_enabled = not self.checkpoint_button.disabled
+
+        self.assign_label_button.disabled = True
+        self.show_queried_button.disabled = True
+        self.checkpoint_button.disabled = True
+
+    def _unlock_query_buttons(self):
+
+        self.assign_label_button.disabled = False
+        self.show_queried_button.disabled = False
+        self.checkpoint_button.disabled = not self._checkpoint_enabled
+
     def _next_iteration_cb(self, event):
 
         self.assign_label_group.value = "Unsure"
 
         self.next_iteration_button.disabled = True
+        self._lock_query_buttons()
 
         self.next_iteration_button.name = "Training..."
 
         self.iterate_AL()
 
-        self.next_iteration_button.name = "Querying..."
-
-        self.checkpoint_button.name = "Checkpoint"
-        self._assigned = False
-
-        self.next_iteration_button.disabled = False
-        self.panel()
-        self.checkpoint_button.disabled = False
-
     def _start_training_cb(self, event):
         table = self.classifier_table_source.data
 
@@ -1077,7 +1320,6 @@ class ActiveLearningModel:
             self.start_training_button.name = "Start Training"
             return
 
-        self._training = True
         self.start_training_button.name = "Beginning Training..."
         self.start_training_button.disabled = True
         self.add_classifier_button.disabled = True
@@ -1100,10 +1342,56 @@ class ActiveLearningModel:
             "classifier"
         ]
         config.settings["classifiers"][f"{self._label}"]["query"] = table["query"]
+        config.settings["classifiers"][f"{self._label}"]["training"] = table[
+            "training"
+        ]
+        config.settings["classifiers"][f"{self._label}"][
+            "refit_every"
+        ] = self.refit_every_input.value
+        config.settings["classifiers"][f"{self._label}"][
+            "batch_size"
+        ] = self.batch_size_input.value
+        config.settings["classifiers"][f"{self._label}"][
+            "batch_diversity"
+        ] = self.batch_diversity_dropdown.value
+        config.settings["classifiers"][f"{self._label}"][
+            "pool_scoring"
+        ] = self.pool_scoring_dropdown.value
+        config.settings["classifiers"][f"{self._label}"][
+            "pool_sample_size"
+        ] = self.pool_sample_size_input.value
+        config.settings["classifiers"][f"{self._label}"][
+            "speculative"
+        ] = self.speculative_checkbox.value
+
+        self.setup_pool()
+
+        self.worker.submit(
+            self._setup_and_query,
+            self._training_started_cb,
+            on_error=partial(self._training_failed_cb, self.start_training_button),
+            on_progress=partial(self._training_progress_cb, self.start_training_button),
+        )
+
+    def _setup_and_query(self):
 
         self.setup_learners()
 
-        self.query_index, self.query_instance = self.learner.query(self.x_pool)
+        predictions = self._predict_sets()
+
+        query_index, query_instance = self.query_pool()
+
+        return predictions, query_index, query_instance
+
+    def _training_started_cb(self, result):
+
+        predictions, query_index, query_instance = result
+
+        self._set_query(query_index, query_instance)
+
+        self._training = True
+
+        self._update_predictions(predictions)
 
         self.show_queried_point()
 
@@ -1116,423 +1404,83 @@ class ActiveLearningModel:
 
         self.panel()
 
+        self.start_speculation()
+
     def _add_classifier_cb(self, event):
 
         clf = self.classifier_dropdown.value
         qs = self.query_strategy_dropdown.value
+        training = self.training_mode_dropdown.value
         list_c1 = self.classifier_table_source.data["classifier"]
         list_c2 = self.classifier_table_source.data["query"]
+        list_c3 = self.classifier_table_source.data["training"]
 
         list_c1.append(clf)
         list_c2.append(qs)
+        list_c3.append(training)
 
         self.classifier_table_source.data = {
             "classifier": list_c1,
             "query": list_c2,
+            "training": list_c3,
         }
 
     def _remove_classifier_cb(self, event):
 
         list_c1 = self.classifier_table_source.data["classifier"]
         list_c2 = self.classifier_table_source.data["query"]
+        list_c3 = self.classifier_table_source.data["training"]
 
         list_c1 = list_c1[:-1]
         list_c2 = list_c2[:-1]
+        list_c3 = list_c3[:-1]
 
         self.classifier_table_source.data = {
             "classifier": list_c1,
             "query": list_c2,
+            "training": list_c3,
         }
 
-    def split_x_y_ids(self, df_data):
-        """Separate the data into X and [y,ids] dataframes.
-
-        Parameters
-        ----------
-        df_data : DataFrame
-            A dataframe containing all the training features, the label column
-            and the id column.
-
-        Returns
-        -------
-        df_data_x : DataFrame
-            A dataframe containing only the features used for machine learning.
-        df_data_y_ids : DataFrame
-            A dataframe containing only the label and id columns corresponding
-            to `df_data_x`.
-
-        """
-
-        df_data_y_ids = df_data[
-            [config.settings["label_col"], config.settings["id_col"]]
-        ]
-        df_data_x = df_data.drop(
-            columns=[config.settings["label_col"], config.settings["id_col"]]
-        )
-        assert (
-            df_data_y_ids.shape[0] == df_data_x.shape[0]
-        ), f"df_data_y_ids has different number of rows than df_data_x, {df_data_y_ids.shape[0]} != {df_data_x.shape[0]}"
-
-        return df_data_x, df_data_y_ids
-
-    def exclude_unclassified_labels(self, df_data_x, df_data_y, excluded):
-        """Remove any sources that have a label that is not being trained on.
-
-        Parameters
-        ----------
-        df_data_x : DataFrame
-            A dataframe containing only the features used for machine learning.
-        df_data_y : DataFrame
-            A dataframe containing the label corresponding to `df_data_x`.
-        excluded : str
-            The label which should be removed from `df_data_x` and `df_data_y`.
-
-        Returns
-        -------
-        data_x : DataFrame
-            A subset of `df_data_x` which has had all rows with label `excluded`
-            removed.
-        data_y : DataFrame
-            A subset of `df_data_y` which has had all rows with label `excluded`
-            removed.
-        excluded_x : DataFrame
-            A subset of `df_data_x` which only has rows with label `excluded`.
-        excluded_y : DataFrame
-            A subset of `df_data_y` which only has rows with label `excluded`.
-
-        """
-        excluded_label = config.settings["strings_to_labels"][excluded]
-        excluded_x = df_data_x[
-            df_data_y[config.settings["label_col"]] == excluded_label
-        ]
-        excluded_y = df_data_y[
-            df_data_y[config.settings["label_col"]] == excluded_label
-        ]
-
-        data_x = df_data_x[df_data_y[config.settings["label_col"]] != excluded_label]
-        data_y = df_data_y[df_data_y[config.settings["label_col"]] != excluded_label]
-
-        return data_x, data_y, excluded_x, excluded_y
-
-    def train_val_test_split(
-        self, df_data_x, df_data_y, excluded_x, excluded_y, train_ratio, val_ratio
-    ):
-        """Split data into train, validation and test sets.
-        The method uses stratified sampling to ensure each set has the correct
-        distribution of points.
-
-        Parameters
-        ----------
-        df_data_x : DataFrame
-            A dataframe containing only the features used for machine learning.
-        df_data_y : DataFrame
-            A dataframe containing the labels corresponding to `df_data_x`.
-        train_ratio : float
-            The ratio of all the total dataset that should be used for the
-            training set.
-        val_ratio : float
-            The ratio of all the total dataset that should be used for the
-            validation set.
-
-        Returns
-        -------
-        x_train : DataFrame
-            A subset of `df_data_x` which will be used for training a model.
-        y_train : DataFrame
-            A dataframe containing the labels corresponding to `x_train`.
-        x_val : DataFrame
-            A subset of `df_data_x` which will be used for validating a model.
-        y_val : DataFrame
-            A dataframe containing the labels corresponding to `x_val`.
-        x_test : DataFrame
-            A subset of `df_data_x` which will be used for testing a model.
-        y_test : DataFrame
-            A dataframe containing the labels corresponding to `x_test`.
-
-        """
-
-        np.random.seed(0)
-        rng = np.random.RandomState(seed=0)
-
-        include_test_file = True
-
-        if "test_set_file" not in list(config.settings.keys()):
-            include_test_file = False
-
-        elif not config.settings["test_set_file"]:
-            include_test_file = False
-
-        test_ratio = 1 - train_ratio - val_ratio
-        x_train, x_temp, y_train, y_temp = train_test_split(
-            df_data_x,
-            df_data_y,
-            test_size=1 - train_ratio,
-            stratify=df_data_y[config.settings["label_col"]],
-            random_state=rng,
-        )
-
-        x_val, x_test, y_val, y_test = train_test_split(
-            x_temp,
-            y_temp,
-            test_size=test_ratio / (test_ratio + val_ratio),
-            stratify=y_temp[config.settings["label_col"]],
-            random_state=rng,
-        )
-
-        if include_test_file:
-            (
-                x_train,
-                y_train,
-                x_val,
-                y_val,
-                x_test,
-                y_test,
-            ) = self.reconstruct_tailored_sets(
-                x_train, y_train, x_val, y_val, x_test, y_test, excluded_x, excluded_y
-            )
-
-        return x_train, y_train, x_val, y_val, x_test, y_test
-
-    def reconstruct_tailored_sets(
-        self, x_train, y_train, x_val, y_val, x_test, y_test, excluded_x, excluded_y
-    ):
-
-        labels = {}
-        if os.path.exists("data/test_set.json"):
-            with open("data/test_set.json", "r") as json_file:
-                labels = json.load(json_file)
-
-        ids_test = []
-
-        for id_key in list(labels.keys()):
-            if labels[id_key] != -1:
-                ids_test.append(id_key)
-
-        ids_trained_on = []
-
-        if self.retrain:
-            for i in config.settings["classifiers"]:
-                if "id" in list(config.settings["classifiers"][i].keys()):
-                    ids_trained_on += config.settings["classifiers"][i]["id"]
-
-        ids_trained_on = list(dict.fromkeys(ids_trained_on))
-
-        isin_test = y_train[config.settings["id_col"]].isin(ids_test)
-        isin_trained_on = y_train[config.settings["id_col"]].isin(ids_trained_on)
-
-        new_x_test = x_train[(isin_test) & (~isin_trained_on)]
-        new_y_test = y_train[(isin_test) & (~isin_trained_on)]
-
-        new_x_train = x_train[~((isin_test) & (~isin_trained_on))]
-        new_y_train = y_train[~((isin_test) & (~isin_trained_on))]
-
-        isin_test = y_val[config.settings["id_col"]].isin(ids_test)
-        isin_trained_on = y_val[config.settings["id_col"]].isin(ids_trained_on)
-
-        new_x_test_temp = x_val[(isin_test) & (~isin_trained_on)]
-        new_y_test_temp = y_val[(isin_test) & (~isin_trained_on)]
-
-        new_x_test = new_x_test.append(new_x_test_temp)
-        new_y_test = new_y_test.append(new_y_test_temp)
-
-        new_x_val = x_val[~((isin_test) & (~isin_trained_on))]
-        new_y_val = y_val[~((isin_test) & (~isin_trained_on))]
-
-        isin_test = y_test[config.settings["id_col"]].isin(ids_test)
-        isin_trained_on = y_test[config.settings["id_col"]].isin(ids_trained_on)
-
-        new_x_test_temp = x_test[(isin_test) & (~isin_trained_on)]
-        new_y_test_temp = y_test[(isin_test) & (~isin_trained_on)]
-
-        new_x_test = new_x_test.append(new_x_test_temp)
-        new_y_test = new_y_test.append(new_y_test_temp)
-
-        new_x_val_temp = x_test[~((isin_test) & (~isin_trained_on))]
-        new_y_val_temp = y_test[~((isin_test) & (~isin_trained_on))]
-
-        new_x_val = new_x_val.append(new_x_val_temp)
-        new_y_val = new_y_val.append(new_y_val_temp)
-
-        for label in list(excluded_x.keys()):
-
-            curr_x = excluded_x[label]
-            curr_y = excluded_y[label]
-
-            inc_x = curr_x[curr_y[config.settings["id_col"]].isin(ids_test)]
-            inc_y = curr_y[curr_y[config.settings["id_col"]].isin(ids_test)]
-
-            new_x_test = new_x_test.append(inc_x)
-            new_y_test = new_y_test.append(inc_y)
-
-        y_test_temp = []
-
-        for id in list(new_y_test[config.settings["id_col"]].values):
-
-            y_test_temp.append(labels[id])
-
-        new_y_test[config.settings["label_col"]] = y_test_temp
-
-        assert len(new_x_test) == len(
-            new_y_test
-        ), f"new_x_test len:{len(new_x_test)}, new_y_test len:{len(new_y_test)}"
-
-        assert len(y_test_temp) == len(
-            ids_test
-        ), f"y_test_temp len:{len(y_test_temp)}, ids_test len:{len(ids_test)}"
-
-        assert len(new_x_val) == len(
-            new_y_val
-        ), f"new_x_val len:{len(new_x_val)}, new_y_val len:{len(new_y_val)}"
-        assert len(new_x_train) == len(
-            new_y_train
-        ), f"new_x_train len:{len(new_x_train)}, new_y_train len:{len(new_y_train)}"
-
-        return new_x_train, new_y_train, new_x_val, new_y_val, new_x_test, new_y_test
-
-    def scale_data(self, x_train, x_val, x_test, x_cols):
-        """Scale the features of the data according to the training set.
-
-        A RobustScaler is used to limit the impact of outliers on the data.
-
-        Parameters
-        ----------
-        x_train : DataFrame
-            A dataframe containing the training set. All subsequent data will
-            be scaled according to this data.
-        x_val : DataFrame
-            A dataframe containing the validation set.
-        x_test : DataFrame
-            A dataframe containing the testing set.
-        x_cols : list of str
-            List containing all the column names in `x_train`,`x_val` and
-            `x_test`.
-
-        Returns
-        -------
-        data_x_tr : DataFrame
-            A dataframe containing the normalised training set.
-        data_x_val : DataFrame
-            A dataframe containing the normalised validation set.
-        data_x_test : DataFrame
-            A dataframe containing the normalised testing set.
-
-        """
-
-        self.scaler = RobustScaler()
-
-        x_tr = x_train[x_cols]
-        x_tr = x_train.to_numpy()
-        x_tr = x_tr[:, 1:]
-
-        data_x_tr = self.scaler.fit_transform(x_tr)
-
-        x_v = x_val[x_cols]
-        x_v = x_val.to_numpy()
-        x_v = x_v[:, 1:]
-        data_x_val = self.scaler.transform(x_v)
-
-        x_te = x_test[x_cols]
-        x_te = x_test.to_numpy()
-        x_te = x_te[:, 1:]
-        data_x_test = self.scaler.transform(x_te)
-
-        data_x_tr = pd.DataFrame(data_x_tr, columns=x_cols, index=x_train.index)
-
-        data_x_val = pd.DataFrame(data_x_val, columns=x_cols, index=x_val.index)
-
-        data_x_test = pd.DataFrame(data_x_test, columns=x_cols, index=x_test.index)
-
-        return data_x_tr, data_x_val, data_x_test
-
-    def split_y_ids(self, y_id_train, y_id_val, y_id_test):
-        """Split label and id columns into separate dataframes.
-
-        Parameters
-        ----------
-        y_id_train : DataFrame
-            Dataframe containing label and id columns of the training set.
-        y_id_val : DataFrame
-            Dataframe containing label and id columns of the validation set.
-        y_id_test : DataFrame
-            Dataframe containing label and id columns of the test set.
-
-        Returns
-        -------
-        data_y_tr : DataFrame
-            Dataframe containing only the label column of `y_id_train`.
-        data_id_tr : DataFrame
-            Dataframe containing only the id column of `y_id_train`.
-        data_y_val : DataFrame
-            Dataframe containing only the label column of `y_id_val`.
-        data_id_val : DataFrame
-            Dataframe containing only the id column of `y_id_val`.
-        data_y_test : DataFrame
-            Dataframe containing only the label column of `y_id_test`.
-        data_id_test : DataFrame
-            Dataframe containing only the id column of `y_id_test`.
-
-        """
-
-        data_y_tr = pd.DataFrame(
-            y_id_train[config.settings["label_col"]],
-            columns=[config.settings["label_col"]],
-        )
-        data_id_tr = pd.DataFrame(
-            y_id_train[config.settings["id_col"]], columns=[config.settings["id_col"]]
-        )
-        data_y_val = pd.DataFrame(
-            y_id_val[config.settings["label_col"]],
-            columns=[config.settings["label_col"]],
-        )
-        data_id_val = pd.DataFrame(
-            y_id_val[config.settings["id_col"]], columns=[config.settings["id_col"]]
-        )
-        data_y_test = pd.DataFrame(
-            y_id_test[config.settings["label_col"]],
-            columns=[config.settings["label_col"]],
-        )
-        data_id_test = pd.DataFrame(
-            y_id_test[config.settings["id_col"]], columns=[config.settings["id_col"]]
-        )
-
-        return data_y_tr, data_id_tr, data_y_val, data_id_val, data_y_test, data_id_test
-
     def _convert_to_one_vs_rest(self):
 
-        y_tr = config.ml_data["y_train_without_unknowns"].copy()
-        y_val = self.y_val.copy()
-        y_test = self.y_test.copy()
-
-        is_label = y_tr[config.settings["label_col"]] == self._label
-        isnt_label = y_tr[config.settings["label_col"]] != self._label
+        targets = preprocessing.get_one_vs_rest_targets(self._label)
 
-        y_tr.loc[is_label, config.settings["label_col"]] = 1
-        y_tr.loc[isnt_label, config.settings["label_col"]] = 0
+        self.y_train_without_unknowns = targets["y_train_without_unknowns"]
+        self.y_train_with_unknowns = config.ml_data["y_train_with_unknowns"]
+        self.y_val = targets["y_val"]
+        self.y_test = targets["y_test"]
 
-        is_label = y_val[config.settings["label_col"]] == self._label
-        isnt_label = y_val[config.settings["label_col"]] != self._label
+    def _get_blank_classifiers(self):
+        classifiers = models.get_classifiers()
+        return classifiers
 
-        y_val.loc[is_label, config.settings["label_col"]] = 1
-        y_val.loc[isnt_label, config.settings["label_col"]] = 0
+    def _predict_sets(self, learner=None, cache=None):
 
-        is_label = y_test[config.settings["label_col"]] == self._label
-        isnt_label = y_test[config.settings["label_col"]] != self._label
+        if learner is None:
+            learner = self.learner
+        if cache is None:
+            cache = self.prediction_cache
 
-        y_test.loc[is_label, config.settings["label_col"]] = 1
-        y_test.loc[isnt_label, config.settings["label_col"]] = 0
+        predictions = {
+            "train_proba": cache.predict_proba(self._known_rows),
+            "val_pred": cache.get(
+                "val_pred",
+                partial(predict_chunked, learner, config.ml_data["x_val"].to_numpy()),
+            ),
+            "test_pred": cache.get(
+                "test_pred",
+                partial(predict_chunked, learner, config.ml_data["x_test"].to_numpy()),
+            ),
+        }
 
-        self.y_train_without_unknowns = y_tr
-        self.y_train_with_unknowns = config.ml_data["y_train_with_unknowns"].copy()
-        self.y_val = y_val
-        self.y_test = y_test
+        return predictions
 
-    def _get_blank_classifiers(self):
-        classifiers = models.get_classifiers()
-        return classifiers
+    def _update_predictions(self, predictions=None):
 
-    def _update_predictions(self):
+        if predictions is None:
+            predictions = self._predict_sets()
 
-        proba = self.learner.predict_proba(self.x_train_without_unknowns)
+        proba = predictions["train_proba"]
 
         tr_pred = np.argmax(proba, axis=1).reshape((-1, 1))
 
@@ -1566,10 +1514,13 @@ class ActiveLearningModel:
         self.corr_train.data = corr_data
         self.incorr_train.data = incorr_data
 
-        curr_tr_acc = accuracy_score(self.y_train_without_unknowns, tr_pred)
-        curr_tr_f1 = f1_score(self.y_train_without_unknowns, tr_pred)
-        curr_tr_prec = precision_score(self.y_train_without_unknowns, tr_pred)
-        curr_tr_rec = recall_score(self.y_train_without_unknowns, tr_pred)
+        tr_scores, t_conf = binary_classification_metrics(
+            self.y_train_without_unknowns, tr_pred
+        )
+        curr_tr_acc = tr_scores["acc"]
+        curr_tr_f1 = tr_scores["f1"]
+        curr_tr_prec = tr_scores["prec"]
+        curr_tr_rec = tr_scores["rec"]
 
         self._train_scores = {
             "acc": "%.3f" % round(curr_tr_acc, 3),
@@ -1583,9 +1534,7 @@ class ActiveLearningModel:
         self._precision_list["train"]["score"].append(curr_tr_prec)
         self._recall_list["train"]["score"].append(curr_tr_rec)
 
-        t_conf = confusion_matrix(self.y_train_without_unknowns, tr_pred)
-
-        val_pred = self.learner.predict(config.ml_data["x_val"]).reshape((-1, 1))
+        val_pred = predictions["val_pred"].reshape((-1, 1))
 
         temp = self.y_val.to_numpy().reshape((-1, 1))
 
@@ -1614,10 +1563,11 @@ class ActiveLearningModel:
         self.corr_val.data = corr_data
         self.incorr_val.data = incorr_data
 
-        curr_val_acc = accuracy_score(self.y_val, val_pred)
-        curr_val_f1 = f1_score(self.y_val, val_pred)
-        curr_val_prec = precision_score(self.y_val, val_pred)
-        curr_val_rec = recall_score(self.y_val, val_pred)
+        val_scores, v_conf = binary_classification_metrics(self.y_val, val_pred)
+        curr_val_acc = val_scores["acc"]
+        curr_val_f1 = val_scores["f1"]
+        curr_val_prec = val_scores["prec"]
+        curr_val_rec = val_scores["rec"]
 
         self._val_scores = {
             "acc": "%.3f" % round(curr_val_acc, 3),
@@ -1631,16 +1581,13 @@ class ActiveLearningModel:
         self._precision_list["val"]["score"].append(curr_val_prec)
         self._recall_list["val"]["score"].append(curr_val_rec)
 
-        v_conf = confusion_matrix(self.y_val, val_pred)
+        test_pred = predictions["test_pred"].reshape((-1, 1))
 
-        test_pred = self.learner.predict(config.ml_data["x_test"]).reshape((-1, 1))
-
-        temp = self.y_test.to_numpy().reshape((-1, 1))
-
-        curr_test_acc = accuracy_score(self.y_test, test_pred)
-        curr_test_f1 = f1_score(self.y_test, test_pred)
-        curr_test_prec = precision_score(self.y_test, test_pred)
-        curr_test_rec = recall_score(self.y_test, test_pred)
+        test_scores, test_conf = binary_classification_metrics(self.y_test, test_pred)
+        curr_test_acc = test_scores["acc"]
+        curr_test_f1 = test_scores["f1"]
+        curr_test_prec = test_scores["prec"]
+        curr_test_rec = test_scores["rec"]
 
         self._test_scores = {
             "acc": "%.3f" % round(curr_test_acc, 3),
@@ -1649,8 +1596,6 @@ class ActiveLearningModel:
             "f1": "%.3f" % round(curr_test_f1, 3),
         }
 
-        test_conf = confusion_matrix(self.y_test, test_pred)
-
         self.num_points_list.append(self.curr_num_points)
 
         self._accuracy_list["train"]["num_points"] = self.num_points_list
@@ -1672,12 +1617,16 @@ class ActiveLearningModel:
         self.conf_mat_val_fn = str(v_conf[1][0])
         self.conf_mat_val_tp = str(v_conf[1][1])
 
-        try:
+        # The matrix is only shown when both labels appear in the test set or
+        # its predictions.
+        test_labels = test_conf.sum(axis=0) + test_conf.sum(axis=1)
+
+        if np.count_nonzero(test_labels) == 2:
             self.conf_mat_test_tn = str(test_conf[0][0])
             self.conf_mat_test_fp = str(test_conf[0][1])
             self.conf_mat_test_fn = str(test_conf[1][0])
             self.conf_mat_test_tp = str(test_conf[1][1])
-        except:
+        else:
             self.conf_mat_test_tn = str("N/A")
             self.conf_mat_test_fp = str("N/A")
             self.conf_mat_test_fn = str("N/A")
@@ -1740,7 +1689,8 @@ class ActiveLearningModel:
 
             y_tr = self.y_train_without_unknowns.copy()
 
-            X_pool = config.ml_data["x_train_with_unknowns"].to_numpy()
+            # The training set is the first rows of the shared matrix.
+            X_pool = config.ml_data["x"]
             y_pool = self.y_train_with_unknowns.to_numpy().ravel()
 
             self.id_train = config.ml_data["id_train_with_unknowns"].copy()
@@ -1765,22 +1715,19 @@ class ActiveLearningModel:
 
             train_idx = train_idx + [c0, c1]
 
-            self.x_al_train = X_pool[train_idx]
-            self.y_al_train = self.y_train_without_unknowns.iloc[
-                train_idx
-            ].values.ravel()
-            self.id_al_train = self.id_train.iloc[train_idx]
+            self.labelled_set = LabelledSet(
+                X_pool[train_idx],
+                self.y_train_without_unknowns.iloc[train_idx].values,
+                id_pool[train_idx],
+            )
 
-            self.x_pool = np.delete(X_pool, train_idx, axis=0)
-            self.y_pool = np.delete(y_pool, train_idx)
-            self.id_pool = self.id_train.drop(self.id_train.index[train_idx])
+            self.pool = ActivePool(X_pool, y_pool, id_pool)
+            self.pool.remove(train_idx)
 
-            config.settings["classifiers"][f"{self._label}"]["id"] = self.id_al_train[
-                config.settings["id_col"]
-            ].values.tolist()
-            self.full_labelled_data["id"] = self.id_al_train[
-                config.settings["id_col"]
-            ].values.tolist()
+            config.settings["classifiers"][f"{self._label}"][
+                "id"
+            ] = self.id_al_train.tolist()
+            self.full_labelled_data["id"] = self.id_al_train.tolist()
 
             # raw_y_train = []
             # for id in config.settings["classifiers"][f"{self._label}"]["id"]:
@@ -1814,22 +1761,19 @@ class ActiveLearningModel:
             y_tr = self.y_train_without_unknowns.copy()
             self.id_train = config.ml_data["id_train_with_unknowns"].copy()
 
-            X_pool = config.ml_data["x_train_with_unknowns"].to_numpy()
+            X_pool = config.ml_data["x"]
             y_pool = self.y_train_with_unknowns.to_numpy().ravel()
             id_pool = self.id_train.to_numpy()
 
-            train_idx = []
+            self.pool = ActivePool(X_pool, y_pool, id_pool)
 
-            for id in new_id:
-                train_idx.append(np.where(id_pool == id)[0][0])
+            train_idx = [self.pool.get_position(id) for id in new_id]
 
-            self.x_al_train = X_pool[train_idx]
-            self.y_al_train = new_y
-            self.id_al_train = self.id_train.iloc[train_idx]
+            self.labelled_set = LabelledSet(
+                X_pool[train_idx], new_y, id_pool[train_idx]
+            )
 
-            self.x_pool = np.delete(X_pool, train_idx, axis=0)
-            self.y_pool = np.delete(y_pool, train_idx)
-            self.id_pool = self.id_train.drop(self.id_train.index[train_idx])
+            self.pool.remove(train_idx)
 
             config.settings["classifiers"][f"{self._label}"][
                 "y"
@@ -1838,10 +1782,12 @@ class ActiveLearningModel:
                 "id"
             ] = self.full_labelled_data["id"]
 
-    def setup_learners(self):
-        """Initialise the classifiers used during active learning.
+    def setup_pool(self):
+        """Split the training set into the pool and the classifier's initial
+        training set.
 
-        The classifiers used have already been chosen by the user.
+        If retraining a classifier from `config.settings["classifiers"]`, the
+        previously labelled sources are used as the initial training set.
 
         Returns
         -------
@@ -1849,15 +1795,6 @@ class ActiveLearningModel:
 
         """
 
-        table = self.classifier_table_source.data
-
-        if len(table["classifier"]) == 0:
-            return
-
-        qs_dict = query_strategies.get_strategy_dict()
-
-        classifier_dict = self._get_blank_classifiers()
-
         setup = False
 
         if self.retrain:
@@ -1907,78 +1844,65 @@ class ActiveLearningModel:
         if not setup:
             self.create_pool()
 
-        if len(table["classifier"]) == 1:
-            self.committee = False
-            learner = ActiveLearner(
-                estimator=clone(classifier_dict[table["classifier"][0]]),
-                query_strategy=qs_dict[table["query"][0]],
-                X_training=self.x_al_train,
-                y_training=self.y_al_train,
-            )
-
-            self.learner = learner
-
-        else:
-            learners = []
-            self.committee = True
-            for i in range(len(table["classifier"])):
-                learner = ActiveLearner(
-                    estimator=clone(classifier_dict[table["classifier"][i]]),
-                    query_strategy=qs_dict[table["query"][i]],
-                    X_training=self.x_al_train,
-                    y_training=self.y_al_train,
-                )
-                learners.append(learner)
-
-            self.learner = Committee(learner_list=learners)
-
-        self._update_predictions()
+    def setup_learners(self):
+        """Initialise the classifiers used during active learning.
 
-    # TODO :: Add bool to see if user wants this step
-    def generate_features(self, df):
-        """Create the feature combinations that the user specified.
-
-        Parameters
-        ----------
-        df : DataFrame
-            A dataframe containing all of the dataset.
+        The classifiers used have already been chosen by the user and are
+        fitted at the same time on the initial training set created by
+        `setup_pool`. The members of a committee share the machine's cores
+        rather than each using all of them.
 
         Returns
         -------
-        df : DataFrame
-            An expanding dataframe of `df` with the inclusion of the feature
-            combinations.
-        df_al : DataFrame
-            A dataframe containing a subset of `df` with only the required
-            features for training.
+        None
 
         """
-        np.random.seed(0)
 
-        # CHANGED :: Change this to selected["AL_Features"]
-        bands = config.settings["features_for_training"]
+        table = self.classifier_table_source.data
 
-        features = bands + [config.settings["label_col"], config.settings["id_col"]]
+        if len(table["classifier"]) == 0:
+            return
 
-        oper_dict = feature_generation.get_oper_dict()
+        qs_dict = query_strategies.get_strategy_dict()
 
-        if "feature_generation" in list(config.settings.keys()):
-            for generator in config.settings["feature_generation"]:
+        classifier_dict = self._get_blank_classifiers()
 
-                oper = generator[0]
-                n = generator[1]
+        learners = []
+        self.trainers = []
+        for i in range(len(table["classifier"])):
+            learner = ActiveLearner(
+                estimator=clone(classifier_dict[table["classifier"][i]]),
+                query_strategy=qs_dict[table["query"][i]],
+            )
+            learners.append(learner)
 
-                df, generated_features = oper_dict[oper](df, n)
-                features = features + generated_features
+            self.trainers.append(
+                IncrementalTrainer(
+                    learner,
+                    incremental=table["training"][i] == "Incremental",
+                    refit_every=self.refit_every_input.value,
+                )
+            )
 
-        df_al = df[features]
+        if len(learners) > 1:
+            share_n_jobs([learner.estimator for learner in learners])
 
-        shuffled = np.random.permutation(list(df_al.index.values))
+        self._fit_trainers(None, self.trainers, self.x_al_train, self.y_al_train)
 
-        df_al = df_al.reindex(shuffled)
-        df_al = df_al.reset_index()
+        if len(learners) == 1:
+            self.committee = False
+            self.learner = learners[0]
 
-        return df, df_al
+        else:
+            self.committee = True
+            self.learner = ParallelCommittee(learner_list=learners)
+
+        self.prediction_cache = self._create_prediction_cache(self.learner)
+
+        scoring_dict = query_strategies.get_pool_scoring_dict()
+        self.pool_scorer = scoring_dict[self.pool_scoring_dropdown.value](
+            self.pool_sample_size_input.value
+        )
 
     # CHANGED :: Remove static declarations
     def _combine_data(self):
@@ -2033,7 +1957,7 @@ class ActiveLearningModel:
             [config.settings["default_vars"][0], config.settings["default_vars"][1]],
         ).opts(toolbar=None, default_tools=[])
 
-        if hasattr(self, "x_al_train"):
+        if self.labelled_set is not None:
             x_al_train = pd.DataFrame(
                 self.x_al_train, columns=config.ml_data["x_train_with_unknowns"].columns
             )
@@ -2445,10 +2369,26 @@ class ActiveLearningModel:
                     pn.Row(
                         self.classifier_dropdown,
                         self.query_strategy_dropdown,
+                        self.training_mode_dropdown,
+                        max_height=55,
+                    ),
+                    pn.Row(
+                        self.starting_num_points,
+                        self.refit_every_input,
                         max_height=55,
                     ),
-                    self.starting_num_points,
-                    max_height=110,
+                    pn.Row(
+                        self.batch_size_input,
+                        self.batch_diversity_dropdown,
+                        max_height=55,
+                    ),
+                    pn.Row(
+                        self.pool_scoring_dropdown,
+                        self.pool_sample_size_input,
+                        max_height=55,
+                    ),
+                    self.speculative_checkbox,
+                    max_height=250,
                 ),
                 pn.Column(
                     self.add_classifier_button,
@@ -2466,16 +2406,31 @@ class ActiveLearningModel:
                 ),
             )
 
+            if len(self.batch_index) > 1:
+                self.setup_row[0].append(
+                    pn.widgets.StaticText(
+                        name="Queried point",
+                        value=f"{self._batch_position + 1} of {len(self.batch_index)}",
+                    )
+                )
+
+            self.setup_row[0].append(
+                pn.widgets.StaticText(
+                    name="Classifier timings",
+                    value=self._member_timings(),
+                )
+            )
+
     def _update_tab_plots_cb(self, attr, old, new):
 
         self.tabs_view[0] = self._train_tab()
         self.tabs_view[2] = self._val_tab()
 
     def _panel_cb(self, attr, old, new):
-        if self._training:
+        if self._training and not self.worker.is_busy():
 
             query_idx = self.query_index
-            queried_id = self.id_pool.iloc[query_idx][config.settings["id_col"]].copy()
+            queried_id = self.id_pool[query_idx]
 
             if self.src.data[config.settings["id_col"]] == list(queried_id):
                 self._queried_is_selected = True
@@ -0,0 +1,160 @@
+from astronomicAL.extensions import query_strategies
+from astronomicAL.utils.inference import apply_chunked, get_chunk_n_jobs
+from functools import partial
+from modAL.utils.selection import multi_argmax
+
+import numpy as np
+
+# The ways the sources in a batch can be chosen from the most informative
+# sources in the pool.
+BATCH_DIVERSITY = ["None", "k-means++"]
+
+# Number of informative candidates considered for each source in a diverse
+# batch.
+CANDIDATES_PER_QUERY = 10
+
+
+def kmeans_plusplus_select(X, n_select, first=0, random_state=0):
+    """Choose a spread out subset of rows using k-means++ seeding.
+
+    After `first`, each row is chosen at random with probability proportional
+    to its squared distance from the closest row already chosen, so similar
+    rows are unlikely to be chosen together.
+
+    Parameters
+    ----------
+    X : Numpy Array
+        The rows to choose from.
+    n_select : int
+        The number of rows to choose.
+    first : int, default = 0
+        The row that is always chosen first.
+    random_state : int, default = 0
+        The seed used when choosing each subsequent row.
+
+    Returns
+    -------
+    chosen : Numpy Array
+        The positions in `X` of the chosen rows, in the order they were
+        chosen.
+
+    """
+    rng = np.random.RandomState(random_state)
+
+    X = np.asarray(X, dtype=float)
+    n_select = min(n_select, X.shape[0])
+
+    chosen = [first]
+    closest = ((X - X[first]) ** 2).sum(axis=1)
+
+    while len(chosen) < n_select:
+        total = closest.sum()
+        if total > 0:
+            row = rng.choice(X.shape[0], p=closest / total)
+        else:
+            # Every remaining row is a duplicate of one already chosen.
+            row = np.setdiff1d(np.arange(X.shape[0]), chosen)[0]
+
+        chosen.append(row)
+        closest = np.minimum(closest, ((X - X[row]) ** 2).sum(axis=1))
+
+    return np.array(chosen)
+
+
+def query_top(learner, X_pool, n_instances=1, scores=None):
+    """Query the most informative sources, scoring the pool in blocks of rows.
+
+    Query strategies with an entry in `query_strategies.get_utility_dict` are
+    scored using `apply_chunked` and give the same result as
+    `learner.query`. Any other strategy is passed the whole pool at once.
+
+    Parameters
+    ----------
+    learner : ModAL ActiveLearner or Committee
+        The fitted learner whose query strategy ranks the pool.
+    X_pool : Numpy Array
+        The data of the sources that can be queried.
+    n_instances : int, default = 1
+        The number of sources to query.
+    scores : Numpy Array, default = None
+        The utility of each source in `X_pool`, if it is already known.
+
+    Returns
+    -------
+    query_index : Numpy Array
+        The positions in `X_pool` of the queried sources.
+    query_instance : Numpy Array
+        The data of the queried sources.
+
+    """
+    if scores is None:
+        utility = query_strategies.get_utility_dict().get(learner.query_strategy)
+
+        if utility is None:
+            return learner.query(X_pool, n_instances=n_instances)
+
+        scores = apply_chunked(
+            partial(utility, learner), X_pool, n_jobs=get_chunk_n_jobs(learner)
+        )
+
+    query_index = multi_argmax(scores, n_instances=n_instances)
+
+    return query_index, X_pool[query_index]
+
+
+def query_batch(
+    learner, X_pool, batch_size=1, diversity="None", random_state=0, scores=None
+):
+    """Query a batch of the most informative sources in the pool.
+
+    Without diversity, the `batch_size` sources ranked highest by the
+    learner's query strategy are chosen in a single scoring pass. With
+    k-means++ diversity, the batch is instead spread across the
+    `batch_size * CANDIDATES_PER_QUERY` highest ranked sources, starting from
+    the most informative one, so that a batch is not filled with near
+    duplicates.
+
+    Parameters
+    ----------
+    learner : ModAL ActiveLearner or Committee
+        The fitted learner whose query strategy ranks the pool.
+    X_pool : Numpy Array
+        The data of the sources that can be queried.
+    batch_size : int, default = 1
+        The number of sources to query.
+    diversity : str, default = "None"
+        One of `BATCH_DIVERSITY`.
+    random_state : int, default = 0
+        The seed used by k-means++ seeding.
+    scores : Numpy Array, default = None
+        The utility of each source in `X_pool`, if it is already known.
+
+    Returns
+    -------
+    query_index : Numpy Array
+        The positions in `X_pool` of the queried sources.
+    query_instance : Numpy Array
+        The data of the queried sources.
+
+    """
+    batch_size = max(1, min(int(batch_size), X_pool.shape[0]))
+
+    if (batch_size == 1) or (diversity == "None"):
+        return query_top(learner, X_pool, n_instances=batch_size, scores=scores)
+
+    n_candidates = min(X_pool.shape[0], batch_size * CANDIDATES_PER_QUERY)
+    candidates, candidate_x = query_top(
+        learner, X_pool, n_instances=n_candidates, scores=scores
+    )
+
+    if scores is not None:
+        scores = scores[candidates]
+
+    first, _ = query_top(learner, candidate_x, scores=scores)
+    chosen = kmeans_plusplus_select(
+        candidate_x, batch_size, first=int(first[0]), random_state=random_state
+    )
+
+    query_index = np.asarray(candidates)[chosen]
+
+    return query_index, X_pool[query_index]
@@ -0,0 +1,231 @@
+from astronomicAL.utils.inference import DEFAULT_N_JOBS
+from concurrent.futures import ThreadPoolExecutor
+from modAL.disagreement import vote_entropy_sampling
+from modAL.models import Committee
+from modAL.utils.validation import check_class_labels, check_class_proba
+
+import numpy as np
+import time
+
+
+def map_members(func, members, n_jobs=None):
+    """Call `func` on every member of a committee at the same time.
+
+    Members are run on a thread pool rather than a process pool, so the
+    training and prediction arrays are read in place by every member instead
+    of being copied, and the fitted estimators never need to be pickled.
+    Most sklearn estimators release the GIL while fitting and predicting.
+
+    Parameters
+    ----------
+    func : callable
+        Function taking a single member.
+    members : list
+        The members to call `func` on, such as the committee's learners or
+        their `IncrementalTrainer` objects.
+    n_jobs : int, default = None
+        The most members run at the same time. If `None`, `DEFAULT_N_JOBS` is
+        used.
+
+    Returns
+    -------
+    results : list
+        The value returned by `func` for each of `members`, in order.
+    seconds : list of float
+        The time taken by `func` for each of `members`.
+
+    """
+    if n_jobs is None:
+        n_jobs = DEFAULT_N_JOBS
+
+    def _timed(member):
+        start = time.perf_counter()
+        result = func(member)
+        return result, time.perf_counter() - start
+
+    if n_jobs == 1 or len(members) <= 1:
+        timed = [_timed(member) for member in members]
+    else:
+        with ThreadPoolExecutor(max_workers=min(n_jobs, len(members))) as executor:
+            timed = list(executor.map(_timed, members))
+
+    results = [result for result, _ in timed]
+    seconds = [elapsed for _, elapsed in timed]
+
+    return results, seconds
+
+
+def share_n_jobs(estimators, n_jobs=None):
+    """Split the threads available to a committee between its members.
+
+    The members are fitted and make predictions at the same time, so if each
+    of them also used every core, as with `n_jobs=-1`, the machine would run
+    many times more threads than it has cores. Each estimator with an
+    `n_jobs` parameter is instead given an equal share of `n_jobs`.
+
+    Parameters
+    ----------
+    estimators : list of sklearn estimator
+        The estimators of the committee's members, which are modified in
+        place.
+    n_jobs : int, default = None
+        The total number of threads the committee may use. If `None`,
+        `DEFAULT_N_JOBS` is used.
+
+    Returns
+    -------
+    None
+
+    """
+    if n_jobs is None:
+        n_jobs = DEFAULT_N_JOBS
+
+    share = max(1, n_jobs // max(1, len(estimators)))
+
+    for estimator in estimators:
+        if "n_jobs" in estimator.get_params(deep=False):
+            estimator.set_params(n_jobs=share)
+
+
+class ParallelCommittee(Committee):
+    """A modAL Committee whose learners make their predictions at the same time.
+
+    The predictions are combined exactly as `Committee` combines them. The
+    time each learner spends predicting is recorded so that the slowest
+    member of the committee can be found.
+
+    Parameters
+    ----------
+    learner_list : list of ModAL ActiveLearner
+        The learners forming the committee.
+    query_strategy : callable, default = vote_entropy_sampling
+        The committee's query strategy.
+    on_transformed : bool, default = False
+        Whether to transform samples with each learner's pipeline when applying
+        the query strategy.
+    n_jobs : int, default = None
+        The most learners predicting at the same time. If `None`,
+        `DEFAULT_N_JOBS` is used.
+
+    Attributes
+    ----------
+    n_jobs : int
+        The most learners predicting at the same time.
+    _predict_seconds : list of list of float
+        The time taken by each learner for every prediction since the
+        timings were last reset.
+
+    """
+
+    def __init__(
+        self,
+        learner_list,
+        query_strategy=vote_entropy_sampling,
+        on_transformed=False,
+        n_jobs=None,
+    ):
+
+        super().__init__(learner_list, query_strategy, on_transformed)
+
+        self.n_jobs = n_jobs
+        self._predict_seconds = []
+
+    def _map_learners(self, func):
+
+        results, seconds = map_members(func, self.learner_list, self.n_jobs)
+
+        # Appending is atomic, so predictions may be made from several threads.
+        self._predict_seconds.append(seconds)
+
+        return results
+
+    def predict_times(self):
+        """Get the total time each learner has spent predicting.
+
+        Returns
+        -------
+        seconds : Numpy Array
+            The seconds spent predicting by each learner since
+            `reset_predict_times` was last called.
+
+        """
+        seconds = np.zeros(len(self.learner_list))
+
+        for call in list(self._predict_seconds):
+            seconds += call
+
+        return seconds
+
+    def reset_predict_times(self):
+        """Clear the prediction times, such as after the learners are refit.
+
+        Returns
+        -------
+        None
+
+        """
+        self._predict_seconds = []
+
+    def vote(self, X, **predict_kwargs):
+        """Predict the class of each sample with each learner in the committee.
+
+        Parameters
+        ----------
+        X : Numpy Array
+            The samples to predict.
+        **predict_kwargs
+            Keyword arguments passed to the `predict` of each learner.
+
+        Returns
+        -------
+        prediction : Numpy Array
+            The predicted class of each sample by each learner, with shape
+            (n_samples, n_learners).
+
+        """
+        votes = self._map_learners(lambda learner: learner.predict(X, **predict_kwargs))
+
+        prediction = np.zeros(shape=(X.shape[0], len(self.learner_list)))
+        for learner_idx, vote in enumerate(votes):
+            prediction[:, learner_idx] = vote
+
+        return prediction
+
+    def vote_proba(self, X, **predict_proba_kwargs):
+        """Predict the class probabilities of each sample with each learner.
+
+        Parameters
+        ----------
+        X : Numpy Array
+            The samples to predict.
+        **predict_proba_kwargs
+            Keyword arguments passed to the `predict_proba` of each learner.
+
+        Returns
+        -------
+        proba : Numpy Array
+            The probability of each class of the committee for each sample by
+            each learner, with shape (n_samples, n_learners, n_classes).
+
+        """
+        same_classes = check_class_labels(
+            *[learner.estimator for learner in self.learner_list]
+        )
+
+        def _proba(learner):
+            proba = learner.predict_proba(X, **predict_proba_kwargs)
+            if same_classes:
+                return proba
+            return check_class_proba(
+                proba=proba,
+                known_labels=learner.estimator.classes_,
+                all_labels=self.classes_,
+            )
+
+        probas = self._map_learners(_proba)
+
+        proba = np.zeros(shape=(X.shape[0], len(self.learner_list), self.n_classes_))
+        for learner_idx, learner_proba in enumerate(probas):
+            proba[:, learner_idx, :] = learner_proba
+
+        return proba
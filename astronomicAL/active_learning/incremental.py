@@ -0,0 +1,201 @@
+import numpy as np
+import time
+
+# The ways a classifier can be retrained after each new label.
+TRAINING_MODES = ["Full", "Incremental"]
+
+# Number of new labels after which an incrementally trained classifier is
+# refit from scratch.
+DEFAULT_REFIT_EVERY = 10
+
+# Fraction of the estimators of a warm started ensemble that are replaced by
+# each incremental update.
+ESTIMATOR_INCREMENT = 0.1
+
+# Attributes of averaging ensembles holding one entry per fitted estimator.
+_PER_ESTIMATOR_ATTRIBUTES = ["estimators_", "estimators_features_"]
+
+
+def supports_incremental(estimator):
+    """Check whether an estimator can be updated without refitting from scratch.
+
+    Parameters
+    ----------
+    estimator : sklearn estimator
+        The estimator to check.
+
+    Returns
+    -------
+    supported : bool
+        `True` if `estimator` implements `partial_fit`, or is an averaging
+        ensemble, such as a random forest, that can add estimators using
+        `warm_start`.
+
+    """
+    if hasattr(estimator, "partial_fit"):
+        return True
+
+    params = estimator.get_params(deep=False)
+
+    # Each stage of a boosted ensemble corrects the stages before it, so its
+    # oldest stages cannot be replaced and warm starting would only grow it.
+    return (
+        ("warm_start" in params)
+        and ("n_estimators" in params)
+        and ("learning_rate" not in params)
+    )
+
+
+class IncrementalTrainer:
+    """Retrain a modAL learner on its growing set of labelled data.
+
+    In incremental mode, estimators that implement `partial_fit` are only
+    updated with the newly labelled sources, and averaging ensembles that
+    support `warm_start` replace their oldest `ESTIMATOR_INCREMENT` of
+    estimators with new ones trained on the whole labelled set. The ensemble
+    therefore keeps the same number of estimators, and so the same prediction
+    cost and memory, as a fully refit one. A full refit is forced every
+    `refit_every` labels. Estimators that support neither are always refit
+    from scratch.
+
+    Parameters
+    ----------
+    learner : ModAL ActiveLearner
+        The learner to train. It should already be fitted on its initial
+        training data.
+    incremental : bool, default = False
+        Flag for whether to train incrementally between full refits.
+    refit_every : int, default = DEFAULT_REFIT_EVERY
+        The number of new labels after which the learner is refit from
+        scratch.
+
+    Attributes
+    ----------
+    learner : ModAL ActiveLearner
+        The learner being trained.
+    incremental : bool
+        Flag for whether `learner` is trained incrementally between full
+        refits.
+    refit_every : int
+        The number of new labels after which `learner` is refit from scratch.
+    last_fit : str
+        Either "full" or "incremental", depending on how `learner` was last
+        trained.
+    fit_time : float
+        The number of seconds taken to last train `learner`.
+
+    """
+
+    def __init__(self, learner, incremental=False, refit_every=DEFAULT_REFIT_EVERY):
+
+        self.learner = learner
+        self.incremental = incremental and supports_incremental(learner.estimator)
+        self.refit_every = max(1, int(refit_every))
+        self.last_fit = "full"
+        self.fit_time = 0.0
+
+        params = learner.estimator.get_params(deep=False)
+        self._base_n_estimators = params.get("n_estimators")
+        self._num_updates = 0
+
+        if learner.y_training is None:
+            self._num_fitted = 0
+        else:
+            self._num_fitted = len(learner.y_training)
+
+        self._labels_since_refit = 0
+
+    def fit(self, X, y):
+        """Train the learner on all of its labelled data.
+
+        Parameters
+        ----------
+        X : Numpy Array
+            The data of every labelled source. Any sources added since the
+            last fit must be at the end of the array.
+        y : Numpy Array
+            The labels corresponding to `X`.
+
+        Returns
+        -------
+        None
+
+        """
+        start = time.perf_counter()
+
+        num_new = len(y) - self._num_fitted
+
+        self.learner.X_training = X
+        self.learner.y_training = y
+
+        if (
+            (not self.incremental)
+            or (self._num_fitted == 0)
+            or (num_new <= 0)
+            or (self._labels_since_refit + num_new >= self.refit_every)
+        ):
+            self._full_fit(X, y)
+        else:
+            self._incremental_fit(X, y, num_new)
+
+        self._num_fitted = len(y)
+
+        self.fit_time = time.perf_counter() - start
+
+    def _full_fit(self, X, y):
+
+        estimator = self.learner.estimator
+        params = estimator.get_params(deep=False)
+
+        reset = {}
+        if "warm_start" in params:
+            reset["warm_start"] = False
+        if self._base_n_estimators is not None:
+            reset["n_estimators"] = self._base_n_estimators
+
+        estimator.set_params(**reset)
+        estimator.fit(X, y)
+
+        self._labels_since_refit = 0
+        self.last_fit = "full"
+
+    def _incremental_fit(self, X, y, num_new):
+
+        estimator = self.learner.estimator
+
+        if hasattr(estimator, "partial_fit"):
+            estimator.partial_fit(X[-num_new:], np.asarray(y)[-num_new:])
+        else:
+            num_fitted = len(estimator.estimators_)
+            step = max(1, int(num_fitted * ESTIMATOR_INCREMENT))
+
+            # The ensemble is always warm started from the same size, so a
+            # fixed seed would give every update's new estimators the same
+            # seeds. Each update draws them from its own seed instead.
+            random_state = estimator.get_params(deep=False).get("random_state")
+            self._num_updates += 1
+            update = {}
+            if isinstance(random_state, (int, np.integer)):
+                update["random_state"] = int(
+                    np.random.SeedSequence(
+                        [int(random_state), self._num_updates]
+                    ).generate_state(1)[0]
+                )
+
+            estimator.set_params(
+                warm_start=True, n_estimators=num_fitted + step, **update
+            )
+            estimator.fit(X, y)
+
+            # Drop as many of the oldest estimators as were added.
+            for name in _PER_ESTIMATOR_ATTRIBUTES:
+                if hasattr(estimator, name):
+                    setattr(estimator, name, getattr(estimator, name)[step:])
+
+            # Saved models should behave like normally fitted ones.
+            if "random_state" in update:
+                update["random_state"] = random_state
+            estimator.set_params(warm_start=False, n_estimators=num_fitted, **update)
+
+        self._labels_since_refit += num_new
+        self.last_fit = "incremental"
@@ -0,0 +1,177 @@
+from astronomicAL.extensions import query_strategies
+from astronomicAL.utils.inference import apply_chunked, get_chunk_n_jobs
+from modAL.models import Committee
+
+import numpy as np
+
+
+class PredictionCache:
+    """The predictions of one fitted classifier, each made at most once.
+
+    The pool is a subset of the training set, so rather than predicting the
+    training set for the metrics and the pool again for each query, the
+    probabilities of each training row are predicted the first time any part
+    of the dashboard asks for them and reused afterwards. A new cache is
+    created whenever the classifier is refit.
+
+    Parameters
+    ----------
+    learner : ModAL ActiveLearner or Committee
+        The fitted classifier.
+    X : DataFrame or Numpy Array
+        The training data, including sources with unknown labels.
+
+    Attributes
+    ----------
+    learner : ModAL ActiveLearner or Committee
+        The fitted classifier.
+    X : DataFrame or Numpy Array
+        The training data, including sources with unknown labels.
+    _vote_proba : Numpy Array
+        The class probabilities predicted by each learner for each row of
+        `X`, with shape (n_rows, n_learners, n_classes). Only allocated once
+        the first row is predicted.
+    _predicted : Numpy Array
+        Boolean mask of the rows of `X` that have been predicted.
+    _arrays : dict
+        Any other predictions that have been made, keyed by name.
+
+    """
+
+    def __init__(self, learner, X):
+
+        self.learner = learner
+        self.X = X
+
+        self._vote_proba = None
+        self._predicted = np.zeros(X.shape[0], dtype=bool)
+        self._arrays = {}
+
+    def _predict_rows(self, rows):
+
+        if hasattr(self.X, "iloc"):
+            x = self.X.iloc[rows].to_numpy()
+        else:
+            x = self.X[rows]
+
+        if isinstance(self.learner, Committee):
+            return self.learner.vote_proba(x)
+
+        return self.learner.predict_proba(x)[:, np.newaxis, :]
+
+    def vote_proba(self, rows):
+        """Get the class probabilities predicted by each learner.
+
+        Parameters
+        ----------
+        rows : array-like of int
+            The rows of `X` to get the probabilities of.
+
+        Returns
+        -------
+        vote_proba : Numpy Array
+            The probabilities of each row, with shape
+            (len(rows), n_learners, n_classes).
+
+        """
+        rows = np.asarray(rows, dtype=int)
+
+        missing = np.unique(rows[~self._predicted[rows]])
+
+        if len(missing) > 0:
+            values = apply_chunked(
+                self._predict_rows, missing, n_jobs=get_chunk_n_jobs(self.learner)
+            )
+
+            if self._vote_proba is None:
+                self._vote_proba = np.empty(
+                    (self.X.shape[0],) + values.shape[1:], dtype=values.dtype
+                )
+
+            self._vote_proba[missing] = values
+            self._predicted[missing] = True
+
+        if self._vote_proba is None:
+            return self._predict_rows(rows)
+
+        return self._vote_proba[rows]
+
+    def predict_proba(self, rows):
+        """Get the class probabilities predicted by the classifier.
+
+        Parameters
+        ----------
+        rows : array-like of int
+            The rows of `X` to get the probabilities of.
+
+        Returns
+        -------
+        proba : Numpy Array
+            The probabilities of each row, with shape (len(rows), n_classes).
+            For a committee, these are the mean of each learner's
+            probabilities.
+
+        """
+        vote_proba = self.vote_proba(rows)
+
+        if vote_proba.shape[1] == 1:
+            return vote_proba[:, 0, :]
+
+        return np.mean(vote_proba, axis=1)
+
+    def has_utility(self):
+        """Check whether the query strategy can score sources from cached probabilities.
+
+        Returns
+        -------
+        supported : bool
+            `True` if the learner's query strategy has an entry in
+            `query_strategies.get_proba_utility_dict`.
+
+        """
+        utility_dict = query_strategies.get_proba_utility_dict()
+
+        return self.learner.query_strategy in utility_dict
+
+    def utility(self, rows):
+        """Score how informative each row is using the learner's query strategy.
+
+        Parameters
+        ----------
+        rows : array-like of int
+            The rows of `X` to score.
+
+        Returns
+        -------
+        utility : Numpy Array or None
+            The utility of each row, or `None` if `has_utility` is `False`.
+
+        """
+        utility_dict = query_strategies.get_proba_utility_dict()
+        utility = utility_dict.get(self.learner.query_strategy)
+
+        if utility is None:
+            return None
+
+        return utility(self.vote_proba(rows))
+
+    def get(self, name, predict):
+        """Get any other prediction, making it the first time it is requested.
+
+        Parameters
+        ----------
+        name : str
+            The name of the prediction, such as "val_pred".
+        predict : callable
+            Function taking no arguments which makes the prediction.
+
+        Returns
+        -------
+        prediction : any
+            The value returned by `predict`.
+
+        """
+        if name not in self._arrays:
+            self._arrays[name] = predict()
+
+        return self._arrays[name]
@@ -0,0 +1,961 @@
+from astronomicAL.extensions import feature_generation
+from astronomicAL.utils.cache import (
+    get_preprocessed_cache_key,
+    hash_dict,
+    load_preprocessed_from_cache,
+    save_preprocessed_to_cache,
+)
+from astronomicAL.utils.optimise import get_float_dtype, optimise
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import RobustScaler
+
+import astronomicAL.config as config
+import json
+import numpy as np
+import os
+import pandas as pd
+
+# Number of rows converted into the feature matrix at a time.
+CHUNK_SIZE = 250000
+
+# Number of histogram bins used by each pass of `streaming_quantiles`.
+QUANTILE_BINS = 1024
+
+# The settings which change the train, validation and test sets. Preprocessing
+# is only repeated when one of these changes.
+PREPROCESSING_SETTINGS = [
+    "dataset_filepath",
+    "id_col",
+    "label_col",
+    "labels_to_strings",
+    "strings_to_labels",
+    "features_for_training",
+    "feature_generation",
+    "scale_data",
+    "streaming_scaling",
+    "exclude_labels",
+    "unclassified_labels",
+    "exclude_unknown_labels",
+    "test_set_file",
+]
+
+
+def get_ids_trained_on():
+    """Get the ids of every source that a loaded classifier was trained on.
+
+    These sources are kept out of the test set so that a classifier is never
+    tested on data it was trained on.
+
+    Returns
+    -------
+    ids_trained_on : list
+        The ids of the sources, or an empty list unless the configuration was
+        loaded with its trained classifiers.
+
+    """
+    ids_trained_on = []
+
+    if config.settings.get("config_load_level") != 2:
+        return ids_trained_on
+
+    for i in config.settings.get("classifiers", {}):
+        classifier = config.settings["classifiers"][i]
+        if ("y" in classifier.keys()) and ("id" in classifier.keys()):
+            ids_trained_on += list(classifier["id"])
+
+    return list(dict.fromkeys(ids_trained_on))
+
+
+def get_preprocessing_key(df):
+    """Create the key identifying the preprocessed data of the current settings.
+
+    Parameters
+    ----------
+    df : DataFrame
+        A dataframe containing all of the dataset.
+
+    Returns
+    -------
+    key : str
+        Hash of `PREPROCESSING_SETTINGS` and the size of `df`.
+
+    """
+    values = {}
+    for setting in PREPROCESSING_SETTINGS:
+        values[setting] = config.settings.get(setting)
+
+    values["num_rows"] = len(df)
+
+    return hash_dict(values)
+
+
+def get_artefact_cache_key(df):
+    """Create the key of the on-disk preprocessing cache entry for `df`.
+
+    Parameters
+    ----------
+    df : DataFrame
+        A dataframe containing all of the dataset.
+
+    Returns
+    -------
+    key : str or None
+        Hash of the dataset file's fingerprint, `PREPROCESSING_SETTINGS`, the
+        contents of `data/test_set.json` when it is used and the sources
+        excluded from the test set. `None` if the dataset was not loaded from
+        a file.
+
+    """
+    filename = config.settings.get("dataset_filepath")
+
+    if (filename is None) or (not os.path.isfile(filename)):
+        return None
+
+    settings = {}
+    for setting in PREPROCESSING_SETTINGS:
+        settings[setting] = config.settings.get(setting)
+
+    settings["num_rows"] = len(df)
+    settings["optimise_data"] = config.settings.get("optimise_data")
+    settings["ids_trained_on"] = get_ids_trained_on()
+
+    test_set = None
+    if config.settings.get("test_set_file") and os.path.exists("data/test_set.json"):
+        with open("data/test_set.json", "r") as json_file:
+            test_set = json.load(json_file)
+
+    return get_preprocessed_cache_key(filename, settings, test_set)
+
+
+def is_preprocessed(df):
+    """Check whether `config.ml_data` holds the preprocessed data of `df`.
+
+    Parameters
+    ----------
+    df : DataFrame
+        A dataframe containing all of the dataset.
+
+    Returns
+    -------
+    preprocessed : bool
+        `True` if the shared data was created with the current settings.
+
+    """
+    if "x_train_with_unknowns" not in config.ml_data.keys():
+        return False
+
+    if len(config.ml_data["x_train_with_unknowns"].columns) == 0:
+        return False
+
+    return config.ml_data.get("preprocessing_key") == get_preprocessing_key(df)
+
+
+def preprocess_data(df):
+    """Create the train, validation and test sets shared by every classifier.
+
+    Feature generation, splitting, scaling and memory optimisation are the
+    same for every one-vs-rest classifier, so they are run once and stored in
+    `config.ml_data` along with the key of the settings used. Later calls with
+    the same settings return straight away.
+
+    When the dataset was loaded from a file, the resulting sets are also
+    saved in `config.cache_dir`, so that restarting the dashboard with the
+    same data and settings only needs to add the generated features to `df`.
+
+    Parameters
+    ----------
+    df : DataFrame
+        A dataframe containing all of the dataset. Any generated features are
+        added to it in place.
+
+    Returns
+    -------
+    df : DataFrame
+        `df` with the inclusion of the generated features.
+
+    """
+    if is_preprocessed(df):
+        return df
+
+    key = get_preprocessing_key(df)
+    cache_key = get_artefact_cache_key(df)
+
+    if cache_key is not None:
+        cached = load_preprocessed_from_cache(cache_key)
+
+        if cached is not None:
+            print("Loaded preprocessed data from cache.")
+
+            df, _ = add_generated_features(df)
+
+            assign_global_data(
+                cached["x"],
+                cached["x_columns"],
+                cached["y_train_with_unknowns"],
+                cached["id_train_with_unknowns"],
+                cached["y_val"],
+                cached["id_val"],
+                cached["y_test"],
+                cached["id_test"],
+                scaler=cached.get("scaler"),
+            )
+            config.ml_data["preprocessing_key"] = key
+
+            return df
+
+    print("preprocessing...")
+
+    df, features, order = generate_features(df)
+
+    label_col = config.settings["label_col"]
+    id_col = config.settings["id_col"]
+
+    # The labels and ids in shuffled order. Every set is an array of
+    # positions into these, and `order` maps them back to the rows of `df`.
+    labels = df[label_col].take(order).reset_index(drop=True)
+    ids = df[id_col].take(order).reset_index(drop=True)
+
+    x_cols = [col for col in features if col not in [label_col, id_col]]
+
+    rows = np.arange(len(order))
+
+    excluded = {}
+    if config.settings["exclude_labels"]:
+        for label in config.settings["unclassified_labels"]:
+            rows, excluded[f"{label}"] = exclude_unclassified_labels(
+                rows, labels, label
+            )
+
+    if "-1" in config.settings["labels_to_strings"].keys():
+        print("removing -1")
+        label = config.settings["labels_to_strings"]["-1"]
+        rows, excluded[f"{label}"] = exclude_unclassified_labels(rows, labels, label)
+
+    (train, val, test, test_labels) = train_val_test_split(
+        rows, labels, ids, excluded, 0.6, 0.2
+    )
+
+    train_index = train
+
+    if "exclude_unknown_labels" in config.settings.keys():
+        if not config.settings["exclude_unknown_labels"]:
+            if "-1" in config.settings["labels_to_strings"].keys():
+                if config.settings["labels_to_strings"]["-1"] in excluded.keys():
+                    train = np.concatenate(
+                        [train, excluded[config.settings["labels_to_strings"]["-1"]]]
+                    )
+                    train_index = np.arange(len(train))
+
+    y_train = labels.take(train).to_frame().set_index(pd.Index(train_index))
+    y_val = labels.take(val).to_frame()
+    y_test = test_labels.to_frame(label_col)
+
+    id_train = ids.take(train).to_frame().set_index(pd.Index(train_index))
+    id_val = ids.take(val).to_frame()
+    id_test = ids.take(test).to_frame()
+
+    print(f"train: {y_train[label_col].value_counts()}")
+    print(f"val: {y_val[label_col].value_counts()}")
+    print(f"test: {y_test[label_col].value_counts()}")
+
+    scaler = None
+    if config.settings["scale_data"]:
+        scaler = fit_scaler(df, x_cols, order[train])
+
+    x = create_feature_matrix(
+        df, x_cols, [order[train], order[val], order[test]], scaler=scaler
+    )
+
+    assign_global_data(
+        x,
+        x_cols,
+        y_train,
+        id_train,
+        y_val,
+        id_val,
+        y_test,
+        id_test,
+        scaler=scaler,
+    )
+
+    for name in config.ml_data.keys():
+        if name.startswith("x_"):
+            continue
+        if isinstance(config.ml_data[name], pd.DataFrame):
+            config.ml_data[name] = optimise(config.ml_data[name])
+
+    config.ml_data["preprocessing_key"] = key
+
+    if cache_key is not None:
+        save_preprocessed_to_cache(
+            config.ml_data, cache_key, config.settings["dataset_filepath"]
+        )
+
+    return df
+
+
+def _matrix_view(x, start, stop, x_cols, index):
+
+    # Wrapping a 2D array of a single dtype keeps it as the DataFrame's only
+    # block, so `to_numpy()` returns a view of `x` rather than a copy.
+    return pd.DataFrame(x[start:stop], columns=x_cols, index=index, copy=False)
+
+
+def assign_global_data(
+    x, x_cols, y_train, id_train, y_val, id_val, y_test, id_test, scaler
+):
+    """Store the train, validation and test sets in the shared `ml_data` dictionary.
+
+    The features of every set are views of rows of the single matrix `x`,
+    which is also stored as "x". Any per-label targets made from earlier data
+    are discarded.
+
+    Parameters
+    ----------
+    x : Numpy Array
+        C-contiguous matrix holding the features of the training set,
+        including unlabelled sources, followed by the validation and test
+        sets.
+    x_cols : list of str
+        The name of each column of `x`.
+    y_train : DataFrame
+        The labels of the training set, where -1 marks an unlabelled source.
+        Its index is used as the index of the training set.
+    id_train : DataFrame
+        The ids of the training set.
+    y_val : DataFrame
+        The labels of the validation set.
+    id_val : DataFrame
+        The ids of the validation set.
+    y_test : DataFrame
+        The labels of the test set.
+    id_test : DataFrame
+        The ids of the test set.
+    scaler : sklearn.preprocessing.RobustScaler or None
+        The scaler fitted to the training set, or `None` if the data is not
+        scaled.
+
+    Returns
+    -------
+    None
+
+    """
+    num_train = len(y_train)
+    num_val = len(y_val)
+
+    assert x.shape[0] == num_train + num_val + len(
+        y_test
+    ), f"x has {x.shape[0]} rows, but the sets have {num_train + num_val + len(y_test)}"
+
+    is_known = (y_train[config.settings["label_col"]] != -1).to_numpy()
+    known_rows = np.flatnonzero(is_known)
+    num_known = len(known_rows)
+
+    x_train = _matrix_view(x, 0, num_train, x_cols, y_train.index)
+
+    if is_known[:num_known].all():
+        # Unlabelled sources are added to the end of the training set, so the
+        # labelled ones are usually a view of its first rows.
+        x_train_without_unknowns = _matrix_view(
+            x, 0, num_known, x_cols, y_train.index[:num_known]
+        )
+    else:
+        x_train_without_unknowns = x_train.take(known_rows)
+
+    config.ml_data.clear()
+
+    config.ml_data["x"] = x
+
+    config.ml_data["x_train_without_unknowns"] = x_train_without_unknowns
+    config.ml_data["x_train_with_unknowns"] = x_train
+    config.ml_data["x_val"] = _matrix_view(
+        x, num_train, num_train + num_val, x_cols, y_val.index
+    )
+    config.ml_data["x_test"] = _matrix_view(
+        x, num_train + num_val, x.shape[0], x_cols, y_test.index
+    )
+
+    # `take` returns independent copies, so they can be optimised in place.
+    config.ml_data["y_train_without_unknowns"] = y_train.take(known_rows)
+    config.ml_data["y_train_with_unknowns"] = y_train
+    config.ml_data["y_val"] = y_val
+    config.ml_data["y_test"] = y_test
+
+    config.ml_data["id_train_without_unknowns"] = id_train.take(known_rows)
+    config.ml_data["id_train_with_unknowns"] = id_train
+    config.ml_data["id_val"] = id_val
+    config.ml_data["id_test"] = id_test
+
+    if config.settings["scale_data"]:
+        config.ml_data["scaler"] = scaler
+
+
+def _to_one_vs_rest(y, label):
+
+    label_col = config.settings["label_col"]
+
+    is_label = (y[label_col] == label).astype(y[label_col].dtype)
+
+    return pd.DataFrame({label_col: is_label}, index=y.index)
+
+
+def get_one_vs_rest_targets(label):
+    """Get the binary targets of a one-vs-rest classifier for `label`.
+
+    The targets of each label are made once from the shared labels in
+    `config.ml_data` and reused by every classifier of that label.
+
+    Parameters
+    ----------
+    label : int
+        The label being classified.
+
+    Returns
+    -------
+    targets : dict
+        Dictionary of DataFrames keyed by "y_train_without_unknowns", "y_val"
+        and "y_test", where 1 marks a source with `label` and 0 any other
+        label.
+
+    """
+    one_vs_rest = config.ml_data.setdefault("one_vs_rest", {})
+
+    if label not in one_vs_rest:
+        one_vs_rest[label] = {
+            "y_train_without_unknowns": _to_one_vs_rest(
+                config.ml_data["y_train_without_unknowns"], label
+            ),
+            "y_val": _to_one_vs_rest(config.ml_data["y_val"], label),
+            "y_test": _to_one_vs_rest(config.ml_data["y_test"], label),
+        }
+
+    return one_vs_rest[label]
+
+
+def add_generated_features(df):
+    """Add the feature combinations that the user specified to `df`.
+
+    Parameters
+    ----------
+    df : DataFrame
+        A dataframe containing all of the dataset.
+
+    Returns
+    -------
+    df : DataFrame
+        An expanding dataframe of `df` with the inclusion of the feature
+        combinations.
+    features : list of str
+        The names of the features used for training, followed by the label
+        and id columns.
+
+    """
+    np.random.seed(0)
+
+    # CHANGED :: Change this to selected["AL_Features"]
+    bands = config.settings["features_for_training"]
+
+    features = bands + [config.settings["label_col"], config.settings["id_col"]]
+
+    oper_dict = feature_generation.get_oper_dict()
+
+    if "feature_generation" in list(config.settings.keys()):
+        for generator in config.settings["feature_generation"]:
+
+            oper = generator[0]
+            n = generator[1]
+
+            df, generated_features = oper_dict[oper](df, n)
+            features = features + generated_features
+
+    return df, features
+
+
+# TODO :: Add bool to see if user wants this step
+def generate_features(df):
+    """Create the feature combinations that the user specified.
+
+    Parameters
+    ----------
+    df : DataFrame
+        A dataframe containing all of the dataset.
+
+    Returns
+    -------
+    df : DataFrame
+        An expanding dataframe of `df` with the inclusion of the feature
+        combinations.
+    features : list of str
+        The names of the features used for training, followed by the label
+        and id columns and any generated features.
+    order : Numpy Array
+        A random permutation of the row positions of `df`, in which the
+        sources are split into sets.
+
+    """
+    df, features = add_generated_features(df)
+
+    order = np.random.permutation(len(df))
+
+    return df, features, order
+
+
+def get_id_positions(ids, keys):
+    """Find the position of each of `ids` in `keys` using a hash index.
+
+    Parameters
+    ----------
+    ids : array-like
+        The ids to look up.
+    keys : array-like
+        The unique ids to search.
+
+    Returns
+    -------
+    positions : Numpy Array
+        The position in `keys` of each of `ids`, or -1 if it is not in `keys`.
+
+    """
+    return pd.Index(keys).get_indexer(np.asarray(ids))
+
+
+def exclude_unclassified_labels(rows, labels, excluded):
+    """Remove any sources that have a label that is not being trained on.
+
+    Parameters
+    ----------
+    rows : Numpy Array
+        The positions of the sources in `labels`.
+    labels : Series
+        The label of every source.
+    excluded : str
+        The label which should be removed from `rows`.
+
+    Returns
+    -------
+    rows : Numpy Array
+        The positions in `rows` of sources without the label `excluded`.
+    excluded_rows : Numpy Array
+        The positions in `rows` of sources with the label `excluded`.
+
+    """
+    excluded_label = config.settings["strings_to_labels"][excluded]
+
+    is_excluded = labels.to_numpy()[rows] == excluded_label
+
+    return rows[~is_excluded], rows[is_excluded]
+
+
+def train_val_test_split(rows, labels, ids, excluded, train_ratio, val_ratio):
+    """Split the sources into train, validation and test sets.
+    The method uses stratified sampling to ensure each set has the correct
+    distribution of points.
+
+    Parameters
+    ----------
+    rows : Numpy Array
+        The positions in `labels` and `ids` of the sources to split.
+    labels : Series
+        The label of every source.
+    ids : Series
+        The id of every source.
+    excluded : dict
+        The positions of the sources removed by `exclude_unclassified_labels`,
+        keyed by label.
+    train_ratio : float
+        The ratio of all the total dataset that should be used for the
+        training set.
+    val_ratio : float
+        The ratio of all the total dataset that should be used for the
+        validation set.
+
+    Returns
+    -------
+    train : Numpy Array
+        The positions of the sources in the training set.
+    val : Numpy Array
+        The positions of the sources in the validation set.
+    test : Numpy Array
+        The positions of the sources in the test set.
+    test_labels : Series
+        The label of each source in the test set, indexed by `test`.
+
+    """
+
+    np.random.seed(0)
+    rng = np.random.RandomState(seed=0)
+
+    include_test_file = True
+
+    if "test_set_file" not in list(config.settings.keys()):
+        include_test_file = False
+
+    elif not config.settings["test_set_file"]:
+        include_test_file = False
+
+    test_ratio = 1 - train_ratio - val_ratio
+
+    label_values = labels.to_numpy()
+
+    train, temp = train_test_split(
+        rows,
+        test_size=1 - train_ratio,
+        stratify=label_values[rows],
+        random_state=rng,
+    )
+
+    val, test = train_test_split(
+        temp,
+        test_size=test_ratio / (test_ratio + val_ratio),
+        stratify=label_values[temp],
+        random_state=rng,
+    )
+
+    if include_test_file:
+        return reconstruct_tailored_sets(train, val, test, ids, excluded)
+
+    return train, val, test, labels.take(test)
+
+
+def reconstruct_tailored_sets(train, val, test, ids, excluded):
+    """Move the sources labelled in `data/test_set.json` into the test set.
+
+    Labelled sources that a loaded classifier was trained on stay where they
+    are, and every source moved out of the test set joins the validation set.
+    Sources are matched to the labelled ids with a hash index rather than
+    searching the list of ids for each set.
+
+    Parameters
+    ----------
+    train : Numpy Array
+        The positions of the sources in the training set.
+    val : Numpy Array
+        The positions of the sources in the validation set.
+    test : Numpy Array
+        The positions of the sources in the test set.
+    ids : Series
+        The id of every source.
+    excluded : dict
+        The positions of the sources removed by `exclude_unclassified_labels`,
+        keyed by label.
+
+    Returns
+    -------
+    new_train : Numpy Array
+        The training set without the test set sources.
+    new_val : Numpy Array
+        The validation set without the test set sources.
+    new_test : Numpy Array
+        The sources labelled in `data/test_set.json`.
+    new_test_labels : Series
+        The labels given to `new_test` in `data/test_set.json`, indexed by
+        `new_test`.
+
+    """
+
+    labels = {}
+    if os.path.exists("data/test_set.json"):
+        with open("data/test_set.json", "r") as json_file:
+            labels = json.load(json_file)
+
+    ids_test = []
+    labels_test = []
+
+    for id_key in list(labels.keys()):
+        if labels[id_key] != -1:
+            ids_test.append(id_key)
+            labels_test.append(labels[id_key])
+
+    ids_trained_on = get_ids_trained_on()
+
+    id_values = ids.to_numpy()
+
+    def _split(rows, check_trained_on=True):
+        rows_ids = id_values[rows]
+        is_test = get_id_positions(rows_ids, ids_test) != -1
+        if check_trained_on:
+            is_test &= get_id_positions(rows_ids, ids_trained_on) == -1
+        return rows[is_test], rows[~is_test]
+
+    new_test_train, new_train = _split(train)
+    new_test_val, new_val = _split(val)
+    new_test_test, new_val_test = _split(test)
+
+    new_test = [new_test_train, new_test_val, new_test_test]
+    for label in list(excluded.keys()):
+        new_test.append(_split(excluded[label], check_trained_on=False)[0])
+
+    new_test = np.concatenate(new_test)
+    new_val = np.concatenate([new_val, new_val_test])
+
+    new_test_labels = pd.Series(
+        np.asarray(labels_test)[get_id_positions(id_values[new_test], ids_test)],
+        index=new_test,
+    )
+
+    assert len(new_test_labels) == len(
+        ids_test
+    ), f"new_test_labels len:{len(new_test_labels)}, ids_test len:{len(ids_test)}"
+
+    return new_train, new_val, new_test, new_test_labels
+
+
+_SIGN_BIT = np.uint64(1 << 63)
+
+
+def _float_keys(values):
+
+    # Unsigned integers which sort in the same order as the float64 values.
+    bits = values.view(np.uint64)
+
+    return np.where(bits & _SIGN_BIT, ~bits, bits | _SIGN_BIT)
+
+
+def _key_float(key):
+
+    key = np.uint64(key)
+    bits = key & ~_SIGN_BIT if key & _SIGN_BIT else ~key
+
+    return float(np.array([bits], dtype=np.uint64).view(np.float64)[0])
+
+
+def _column_keys(column, rows, chunk_size):
+
+    for start in range(0, len(rows), chunk_size):
+        values = column[rows[start : start + chunk_size]].astype(np.float64)
+        yield _float_keys(values[~np.isnan(values)])
+
+
+def _locate_rank(counts, rank):
+
+    cumulative = np.cumsum(counts)
+    b = int(np.searchsorted(cumulative, rank, side="right"))
+
+    return b, rank - int(cumulative[b] - counts[b])
+
+
+def streaming_quantiles(column, rows, quantiles, bins=None, chunk_size=None):
+    """Find quantiles of a column while only reading a chunk at a time.
+
+    Rather than sorting the whole column, each pass over the chunks builds a
+    histogram of `bins` bins over the range holding each required rank,
+    narrowing that range to a single bin. Once a range holds no more than
+    `chunk_size` values they are collected and sorted, so the quantiles are
+    the same as those given by `np.nanpercentile`. The histograms are built
+    over the bits of each value, which sort in the same order as the values
+    themselves, so no more than ``ceil(64 / log2(bins))`` passes are needed
+    however the values are spread and memory use never grows with the size
+    of the column.
+
+    Parameters
+    ----------
+    column : Numpy Array
+        The values of a single feature.
+    rows : Numpy Array
+        The positions in `column` of the values to include.
+    quantiles : list of float
+        The quantiles to find, each between 0 and 1.
+    bins : int, default = None
+        The number of bins in each histogram. If `None`, `QUANTILE_BINS` is
+        used.
+    chunk_size : int, default = None
+        The number of values read at a time. If `None`, `CHUNK_SIZE` is used.
+
+    Returns
+    -------
+    values : Numpy Array
+        The value of each of `quantiles`, ignoring NaN values. Every value is
+        NaN if there are no other values.
+
+    """
+    if bins is None:
+        bins = QUANTILE_BINS
+
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+
+    num_values = 0
+    lo = None
+    hi = None
+    for keys in _column_keys(column, rows, chunk_size):
+        if len(keys) > 0:
+            num_values += len(keys)
+            lo = int(keys.min()) if lo is None else min(lo, int(keys.min()))
+            hi = int(keys.max()) if hi is None else max(hi, int(keys.max()))
+
+    if num_values == 0:
+        return np.full(len(quantiles), np.nan)
+
+    # The linear interpolation used by np.percentile, between the values
+    # ranked `floor(pos)` and `ceil(pos)`.
+    positions = np.asarray(quantiles, dtype=np.float64) * (num_values - 1)
+    ranks = np.unique(np.concatenate([np.floor(positions), np.ceil(positions)]))
+
+    # Each half-open range of keys still being searched, with the number of
+    # values inside it and the ranks it holds, both overall and within it.
+    ranges = {(lo, hi + 1): (num_values, [(int(rank), int(rank)) for rank in ranks])}
+    ranked_values = {}
+
+    while len(ranges) > 0:
+        histograms = {}
+        collected = {}
+        for (start, stop), (count, targets) in ranges.items():
+            if stop - start == 1:
+                for rank, _ in targets:
+                    ranked_values[rank] = _key_float(start)
+            elif count <= chunk_size:
+                collected[(start, stop)] = []
+            else:
+                width = -(-(stop - start) // bins)
+                histograms[(start, stop)] = (width, np.zeros(bins, dtype=np.int64))
+
+        for keys in _column_keys(column, rows, chunk_size):
+            for (start, stop), parts in collected.items():
+                in_range = (keys >= np.uint64(start)) & (keys < np.uint64(stop))
+                parts.append(keys[in_range])
+
+            for (start, stop), (width, counts) in histograms.items():
+                in_range = (keys >= np.uint64(start)) & (keys < np.uint64(stop))
+                index = (keys[in_range] - np.uint64(start)) // np.uint64(width)
+                counts += np.bincount(index.astype(np.intp), minlength=bins)
+
+        for key, parts in collected.items():
+            in_range = np.sort(np.concatenate(parts))
+            for rank, rank_in_range in ranges[key][1]:
+                ranked_values[rank] = _key_float(in_range[rank_in_range])
+
+        narrowed = {}
+        for (start, stop), (width, counts) in histograms.items():
+            for rank, rank_in_range in ranges[(start, stop)][1]:
+                b, rank_in_bin = _locate_rank(counts, rank_in_range)
+                bin_range = (start + b * width, min(start + (b + 1) * width, stop))
+                narrowed.setdefault(bin_range, (int(counts[b]), []))
+                narrowed[bin_range][1].append((rank, rank_in_bin))
+
+        ranges = narrowed
+
+    result = np.empty(len(positions))
+    for i, pos in enumerate(positions):
+        below = ranked_values[int(np.floor(pos))]
+        above = ranked_values[int(np.ceil(pos))]
+        result[i] = below + (pos - np.floor(pos)) * (above - below)
+
+    return result
+
+
+def _create_robust_scaler(center, scale):
+
+    # Matches RobustScaler, which leaves features with no spread unscaled.
+    scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+
+    scaler = RobustScaler()
+    scaler.center_ = center
+    scaler.scale_ = scale
+    scaler.n_features_in_ = len(center)
+
+    return scaler
+
+
+def fit_scaler(df, x_cols, rows):
+    """Fit the scaler used to scale every set to the training set.
+
+    A RobustScaler is used to limit the impact of outliers on the data. It is
+    fitted one feature at a time, so only a single column of the training set
+    is ever copied. If `config.settings["streaming_scaling"]` is `True`, the
+    medians and quartiles are instead found with `streaming_quantiles`, which
+    only reads a chunk of each column at a time.
+
+    Parameters
+    ----------
+    df : DataFrame
+        A dataframe containing all of the dataset.
+    x_cols : list of str
+        The columns of the features to scale.
+    rows : Numpy Array
+        The row positions in `df` of the training set. All subsequent data
+        will be scaled according to this data.
+
+    Returns
+    -------
+    scaler : sklearn.preprocessing.RobustScaler
+        The scaler fitted to the training set.
+
+    """
+    streaming = config.settings.get("streaming_scaling", False)
+
+    center = np.empty(len(x_cols))
+    scale = np.empty(len(x_cols))
+
+    for i, col in enumerate(x_cols):
+        if streaming:
+            center[i], q_min, q_max = streaming_quantiles(
+                df[col].to_numpy(), rows, [0.5, 0.25, 0.75]
+            )
+        else:
+            values = df[col].to_numpy()[rows].astype(np.float64, copy=False)
+
+            center[i] = np.nanmedian(values)
+            q_min, q_max = np.nanpercentile(values, [25.0, 75.0])
+
+        scale[i] = q_max - q_min
+
+    return _create_robust_scaler(center, scale)
+
+
+def create_feature_matrix(df, x_cols, row_sets, scaler=None, chunk_size=None):
+    """Copy the features of each set, one after another, into a single matrix.
+
+    Rows are gathered from the columns of `df`, and scaled in float64 if
+    required, a block at a time and written straight into a preallocated
+    C-contiguous float32 matrix, so the features are never copied in full
+    anywhere else. The matrix is only float64 if a value is too large to be
+    stored as float32.
+
+    Parameters
+    ----------
+    df : DataFrame
+        A dataframe containing all of the dataset.
+    x_cols : list of str
+        The columns of the features to include.
+    row_sets : list of Numpy Array
+        The row positions in `df` of each set to include, in order.
+    scaler : sklearn.preprocessing.RobustScaler, default = None
+        The fitted scaler to apply to each set, or `None` to copy the data
+        unscaled.
+    chunk_size : int, default = None
+        The number of rows converted at a time. If `None`, `CHUNK_SIZE` is
+        used.
+
+    Returns
+    -------
+    x : Numpy Array
+        C-contiguous matrix with a row for each row of `row_sets` and a column
+        for each of `x_cols`.
+
+    """
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+
+    columns = [df[col].to_numpy() for col in x_cols]
+
+    rows = np.concatenate(row_sets) if len(row_sets) > 0 else np.array([], int)
+
+    x = np.empty((len(rows), len(x_cols)), dtype=np.float32)
+    values = np.empty((min(chunk_size, len(rows)), len(x_cols)))
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        block = values[: len(chunk)]
+
+        for i, column in enumerate(columns):
+            block[:, i] = column[chunk]
+
+        if scaler is not None:
+            block = scaler.transform(block)
+
+        if x.dtype.itemsize == 4 and get_float_dtype(block) is None:
+            x = x.astype(np.float64)
+
+        x[start : start + len(chunk)] = block
+
+    return x
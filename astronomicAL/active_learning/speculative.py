@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+
+class SpeculativeCache:
+    """A small bounded cache of classifiers pre-trained in the background.
+
+    While the user inspects a queried source, a classifier can be trained for
+    each label they could assign to it. Each branch is stored here as the
+    `concurrent.futures.Future` of its training job. When the label is chosen
+    the matching branch is taken and every other branch is discarded, with
+    jobs that have not started yet being cancelled.
+
+    Parameters
+    ----------
+    max_size : int, default = 2
+        The maximum number of branches to keep. When full, the oldest branch
+        is discarded.
+
+    Attributes
+    ----------
+    max_size : int
+        The maximum number of branches to keep.
+    _branches : OrderedDict
+        The futures of each branch, keyed by (source id, label).
+
+    """
+
+    def __init__(self, max_size=2):
+
+        self.max_size = max_size
+        self._branches = OrderedDict()
+
+    def __len__(self):
+        return len(self._branches)
+
+    def __contains__(self, key):
+        return key in self._branches
+
+    def put(self, key, future):
+        """Add the training job of a branch to the cache.
+
+        Parameters
+        ----------
+        key : tuple
+            The (source id, label) pair the branch was trained for.
+        future : concurrent.futures.Future
+            The job training the branch.
+
+        Returns
+        -------
+        None
+
+        """
+        if key in self._branches:
+            self._branches.pop(key).cancel()
+
+        self._branches[key] = future
+
+        while len(self._branches) > self.max_size:
+            _, oldest = self._branches.popitem(last=False)
+            oldest.cancel()
+
+    def take(self, key):
+        """Remove and return a branch, discarding all others.
+
+        Parameters
+        ----------
+        key : tuple
+            The (source id, label) pair of the branch.
+
+        Returns
+        -------
+        future : concurrent.futures.Future or None
+            The job training the branch, or `None` if it is not cached or was
+            cancelled.
+
+        """
+        future = self._branches.pop(key, None)
+
+        self.clear()
+
+        if future is None or future.cancelled():
+            return None
+
+        return future
+
+    def clear(self):
+        """Discard every branch, cancelling any that have not started.
+
+        Returns
+        -------
+        None
+
+        """
+        for future in self._branches.values():
+            future.cancel()
+
+        self._branches.clear()
@@ -0,0 +1,303 @@
+import numpy as np
+
+
+def _get_view(values, size):
+
+    # Views are read only so that classifiers being trained in the background
+    # can safely share the data with the dashboard.
+    view = values[:size]
+    view.flags.writeable = False
+    return view
+
+
+class ActivePool:
+    """The pool of unlabelled sources that can be queried during active learning.
+
+    The pool does not copy the data of its sources. It keeps the row of each
+    source in the shared matrix `x`, along with its label and id, in fixed
+    size arrays where the first `len(pool)` entries are the sources that are
+    still available. Removing a source moves the last available entry into
+    its place, so removal is O(1) and only the small index, label and id
+    arrays are ever reordered.
+
+    Parameters
+    ----------
+    x : Numpy Array
+        The matrix holding the data of every source in the pool, such as
+        `config.ml_data["x"]`. It is shared rather than copied.
+    y : Numpy Array
+        The labels of every source in the pool.
+    ids : array-like
+        The ids of every source in the pool. Every id must be unique.
+    rows : array-like of int, default = None
+        The row of `x` holding the data of each source. If `None`, the
+        sources are the first `len(ids)` rows of `x`.
+
+    Attributes
+    ----------
+    _x : Numpy Array
+        The shared matrix `x`, which is never modified.
+    _y : Numpy Array
+        Copy of `y` which is reordered as sources are removed.
+    _ids : Numpy Array
+        Copy of `ids` which is reordered as sources are removed.
+    _rows : Numpy Array
+        The row of `x` of each source, reordered as sources are removed.
+    _size : int
+        The number of sources still available in the pool.
+    _positions : dict
+        Dictionary mapping the id of each available source to its position.
+
+    """
+
+    def __init__(self, x, y, ids, rows=None):
+
+        self._x = x
+        self._y = np.array(y, copy=True).ravel()
+        self._ids = np.array(ids, copy=True).ravel()
+
+        if rows is None:
+            rows = np.arange(len(self._ids))
+
+        self._rows = np.array(rows, dtype=np.intp, copy=True).ravel()
+
+        assert (
+            len(self._rows) == len(self._y) == len(self._ids)
+        ), f"POOL X, Y & IDs NOT EQUAL - {len(self._rows)}|{len(self._y)}|{len(self._ids)}"
+
+        self._size = len(self._ids)
+
+        self._positions = {
+            source_id: i for i, source_id in enumerate(self._ids.tolist())
+        }
+
+        if len(self._positions) != self._size:
+            raise ValueError(
+                f"The pool has {self._size - len(self._positions)} duplicate ids, "
+                "every source in the pool must have a unique id."
+            )
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, source_id):
+        return source_id in self._positions
+
+    @property
+    def x(self):
+        """Numpy Array : Copy of the data of the available sources."""
+        return self._x[self.rows]
+
+    @property
+    def y(self):
+        """Numpy Array : View of the labels of the available sources."""
+        return _get_view(self._y, self._size)
+
+    @property
+    def ids(self):
+        """Numpy Array : View of the ids of the available sources."""
+        return _get_view(self._ids, self._size)
+
+    @property
+    def rows(self):
+        """Numpy Array : View of the row of the shared matrix of each available source."""
+        return _get_view(self._rows, self._size)
+
+    def take(self, positions):
+        """Get the data of some of the available sources.
+
+        Only the requested rows are gathered from the shared matrix, so this
+        is cheaper than indexing `x` when a few sources are needed.
+
+        Parameters
+        ----------
+        positions : int or array-like of int
+            The positions of the sources in the pool.
+
+        Returns
+        -------
+        x : Numpy Array
+            Copy of the data of the sources at `positions`.
+
+        """
+        return self._x[self.rows[positions]]
+
+    def get_position(self, source_id):
+        """Find the row of an available source.
+
+        Parameters
+        ----------
+        source_id : any
+            The id of the source.
+
+        Returns
+        -------
+        position : int or None
+            The position of `source_id` in `x`, `y`, `ids` and `rows`, or
+            `None` if the source is not in the pool.
+
+        """
+        return self._positions.get(source_id)
+
+    def remove(self, positions):
+        """Remove sources from the pool by their current positions.
+
+        Parameters
+        ----------
+        positions : int or array-like of int
+            The positions in `x`, `y`, `ids` and `rows` of the sources to
+            remove.
+
+        Returns
+        -------
+        None
+
+        """
+        # Positions move as sources are removed, so resolve every id first.
+        source_ids = self.ids[np.atleast_1d(positions)].tolist()
+
+        for source_id in source_ids:
+            self.remove_id(source_id)
+
+    def remove_id(self, source_id):
+        """Remove a source from the pool by its id.
+
+        Parameters
+        ----------
+        source_id : any
+            The id of the source to remove.
+
+        Returns
+        -------
+        None
+
+        """
+        position = self._positions.pop(source_id)
+        last = self._size - 1
+
+        if position != last:
+            self._y[position] = self._y[last]
+            self._ids[position] = self._ids[last]
+            self._rows[position] = self._rows[last]
+            self._positions[self._ids[position]] = position
+
+        self._size = last
+
+
+class LabelledSet:
+    """The sources that have been labelled during active learning.
+
+    The data, labels and ids are stored in preallocated arrays whose capacity
+    doubles whenever they are full, so adding a source is amortised O(1)
+    rather than copying the whole training set each time.
+
+    Parameters
+    ----------
+    x : Numpy Array
+        The data of the initially labelled sources.
+    y : array-like
+        The labels of the initially labelled sources.
+    ids : array-like
+        The ids of the initially labelled sources.
+    capacity : int, default = 64
+        The minimum number of sources to allocate space for.
+
+    Attributes
+    ----------
+    _x : Numpy Array
+        Buffer holding the data of the labelled sources.
+    _y : Numpy Array
+        Buffer holding the labels of the labelled sources.
+    _ids : Numpy Array
+        Buffer holding the ids of the labelled sources.
+    _size : int
+        The number of labelled sources in the buffers.
+
+    """
+
+    def __init__(self, x, y, ids, capacity=64):
+
+        x = np.asarray(x)
+        y = np.asarray(y).ravel()
+        ids = np.asarray(ids).ravel()
+
+        if ids.dtype.kind in "SU":
+            # Fixed width strings would truncate longer ids added later.
+            ids = ids.astype(object)
+
+        capacity = max(capacity, 2 * len(y), 1)
+
+        self._x = np.empty((capacity,) + x.shape[1:], dtype=x.dtype)
+        self._y = np.empty(capacity, dtype=y.dtype)
+        self._ids = np.empty(capacity, dtype=ids.dtype)
+        self._size = 0
+
+        self.append(x, y, ids)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def x(self):
+        """Numpy Array : View of the data of the labelled sources."""
+        return _get_view(self._x, self._size)
+
+    @property
+    def y(self):
+        """Numpy Array : View of the labels of the labelled sources."""
+        return _get_view(self._y, self._size)
+
+    @property
+    def ids(self):
+        """Numpy Array : View of the ids of the labelled sources."""
+        return _get_view(self._ids, self._size)
+
+    def _grow(self, size):
+
+        capacity = len(self._y)
+        while capacity < size:
+            capacity *= 2
+
+        if capacity == len(self._y):
+            return
+
+        for name in ["_x", "_y", "_ids"]:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self._size] = old[: self._size]
+            setattr(self, name, new)
+
+    def append(self, x, y, ids):
+        """Add newly labelled sources to the end of the set.
+
+        Parameters
+        ----------
+        x : Numpy Array
+            The data of the sources, with one row per source.
+        y : array-like
+            The labels of the sources.
+        ids : array-like
+            The ids of the sources.
+
+        Returns
+        -------
+        None
+
+        """
+        x = np.asarray(x)
+        y = np.asarray(y).ravel()
+        ids = np.asarray(ids).ravel()
+
+        assert (
+            x.shape[0] == len(y) == len(ids)
+        ), f"AL_TRAIN, LABELS & IDs NOT EQUAL - {x.shape[0]}|{len(y)}|{len(ids)}"
+
+        start = self._size
+        stop = start + len(y)
+
+        self._grow(stop)
+
+        self._x[start:stop] = x
+        self._y[start:stop] = y
+        self._ids[start:stop] = ids
+        self._size = stop
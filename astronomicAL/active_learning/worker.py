@@ -0,0 +1,182 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+import panel as pn
+import time
+import traceback
+
+# Number of background jobs run at the same time, one for each label a
+# speculative branch can be trained for.
+BACKGROUND_WORKERS = 2
+
+
+class TrainingWorker:
+    """Run the slow parts of active learning away from the Bokeh event loop.
+
+    Jobs run one at a time in a background thread, so the dashboard stays
+    responsive while classifiers are trained. As the thread shares memory with
+    the dashboard, the training data and pool are read in place rather than
+    being copied to another process. Results are handed back to the event loop
+    with `add_next_tick_callback`, as Bokeh models may only be modified there,
+    and progress is reported with `pn.state.add_periodic_callback`.
+
+    Jobs submitted with `submit_background`, such as speculative training,
+    run on a separate pool of `BACKGROUND_WORKERS` threads, so one branch per
+    label can train at the same time. They do not count towards `is_busy`, and
+    jobs submitted with `submit` never wait for them, so a background job
+    whose result is no longer needed is simply left to finish and ignored.
+
+    When there is no Bokeh server session, for example when running in a
+    script or test, jobs are run synchronously.
+
+    Parameters
+    ----------
+    progress_period : int, default = 500
+        The interval in milliseconds between calls of a job's `on_progress`
+        callback.
+
+    Attributes
+    ----------
+    progress_period : int
+        The interval in milliseconds between calls of a job's `on_progress`
+        callback.
+    _executor : concurrent.futures.ThreadPoolExecutor
+        The single thread executor that runs the jobs. Only created when the
+        first job is submitted within a server session.
+    _background_executor : concurrent.futures.ThreadPoolExecutor
+        The executor that runs the jobs submitted with `submit_background`.
+        Only created when the first of them is submitted within a server
+        session.
+    _future : concurrent.futures.Future
+        The last job submitted with `submit`, if any.
+
+    """
+
+    def __init__(self, progress_period=500):
+
+        self.progress_period = progress_period
+        self._executor = None
+        self._background_executor = None
+        self._future = None
+
+    def is_busy(self):
+        """Check whether a job is still running in the background.
+
+        Returns
+        -------
+        busy : bool
+            Whether the last submitted job has not yet finished.
+
+        """
+        return self._future is not None and not self._future.done()
+
+    def submit(self, job, on_done, on_error=None, on_progress=None):
+        """Run `job` in the background and pass its result to `on_done`.
+
+        Parameters
+        ----------
+        job : callable
+            Function taking no arguments which does the work. It must not
+            modify any Bokeh or Panel models.
+        on_done : callable
+            Function called on the event loop with the value returned by
+            `job`.
+        on_error : callable, default = None
+            Function called on the event loop with the exception raised by
+            `job`, if it fails.
+        on_progress : callable, default = None
+            Function called periodically on the event loop with the number of
+            seconds since `job` started, while it is running.
+
+        Returns
+        -------
+        None
+
+        """
+        doc = pn.state.curdoc
+
+        if doc is None or doc.session_context is None:
+            self._run(job, on_done, on_error)
+            return
+
+        progress = None
+        if on_progress is not None:
+            start = time.time()
+            progress = pn.state.add_periodic_callback(
+                lambda: on_progress(time.time() - start),
+                period=self.progress_period,
+            )
+
+        self._future = self._get_executor().submit(job)
+        self._future.add_done_callback(
+            lambda future: doc.add_next_tick_callback(
+                partial(self._finish, future, on_done, on_error, progress)
+            )
+        )
+
+    def submit_background(self, job):
+        """Run `job` alongside other jobs without reporting its result to the dashboard.
+
+        Parameters
+        ----------
+        job : callable
+            Function taking no arguments which does the work. It must not
+            modify any Bokeh or Panel models.
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            The future holding the result of `job`. Without a server session,
+            `job` has already been run and the future is done.
+
+        """
+        doc = pn.state.curdoc
+
+        if doc is None or doc.session_context is None:
+            future = Future()
+            try:
+                future.set_result(job())
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        if self._background_executor is None:
+            self._background_executor = ThreadPoolExecutor(
+                max_workers=BACKGROUND_WORKERS
+            )
+
+        return self._background_executor.submit(job)
+
+    def _get_executor(self):
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        return self._executor
+
+    def _run(self, job, on_done, on_error):
+
+        try:
+            result = job()
+        except Exception as e:
+            # Errors propagate to the caller, as they would without a worker.
+            if on_error is not None:
+                on_error(e)
+            raise
+
+        on_done(result)
+
+    def _finish(self, future, on_done, on_error, progress):
+
+        if progress is not None:
+            progress.stop()
+
+        try:
+            result = future.result()
+        except Exception as e:
+            traceback.print_exception(type(e), e, e.__traceback__)
+            if on_error is not None:
+                on_error(e)
+            return
+
+        on_done(result)
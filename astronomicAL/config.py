@@ -60,6 +60,9 @@ def _save_layout_button_cb(event):
 
 
 layout_file = "astronomicAL/layout.json"
+cache_dir = "data/cache"
+# The most memory, in bytes, kept by derived features once calculated.
+derived_cache_size = 256 * 1024 ** 2
 dashboards = {}
 
 source = ColumnDataSource()
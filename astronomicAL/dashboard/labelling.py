@@ -1,6 +1,8 @@
 import astronomicAL.config as config
 from astronomicAL.dashboard.plot import PlotDashboard
-from astronomicAL.active_learning.active_learning import ActiveLearningModel
+from astronomicAL.active_learning import preprocessing
+from astronomicAL.utils import derived_features
+from astronomicAL.utils.source_index import get_source
 import panel as pn
 import numpy as np
 import datashader as ds
@@ -8,6 +10,7 @@ import holoviews as hv
 import param
 import pandas as pd
 import random
+import operator
 import os
 import json
 
@@ -19,6 +22,15 @@ from holoviews.operation.datashader import (
     dynspread,
 )
 
+_CRITERIA_OPERATIONS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<=": operator.le,
+    "<": operator.lt,
+}
+
 
 class LabellingDashboard(param.Parameterized):
     """A dashboard for .
@@ -46,6 +58,7 @@ class LabellingDashboard(param.Parameterized):
         self.row = pn.Row(pn.pane.Str("loading"))
         self.df = df
         self.sample_region = df
+        self.sample_region_mask = None
         self.region_criteria_df = pd.DataFrame([], columns=["column", "oper", "value"])
         self.region_message = ""
         self.src = src
@@ -54,7 +67,9 @@ class LabellingDashboard(param.Parameterized):
         self.labels = self.get_previous_labels()
         self._construct_panel()
 
-        ActiveLearningModel(self.src, df, config.settings["labels_to_train"][0])
+        # Adds any generated features to the dataset, sharing the work with
+        # the classifiers trained later.
+        preprocessing.preprocess_data(df)
 
         self._update_variable_lists()
         self.select_random_point()
@@ -142,8 +157,10 @@ class LabellingDashboard(param.Parameterized):
     def _update_variable_lists(self):
         """Update the list of options used inside `X_variable` and `Y_variable`.
 
-        This method retrieves an up-to-date list of columns inside `df` and
-        assigns them to both Selector objects.
+        This method retrieves an up-to-date list of columns inside `df`,
+        along with any derived features, and assigns them to both Selector
+        objects and the criteria column dropdown. Derived features are only
+        calculated once they are used.
 
         Returns
         -------
@@ -151,7 +168,7 @@ class LabellingDashboard(param.Parameterized):
 
         """
 
-        cols = list(config.main_df.columns)
+        cols = derived_features.list_columns(config.main_df)
 
         if config.settings["id_col"] in cols:
             cols.remove(config.settings["id_col"])
@@ -228,35 +245,28 @@ class LabellingDashboard(param.Parameterized):
                 )
                 self.region_criteria_df.drop([exists.index[0]], inplace=True)
 
-        all_bools = ""
+        # Criteria are applied as boolean masks rather than through
+        # `DataFrame.query` so that derived features, and columns whose names
+        # contain operators, can be used.
+        mask = None
 
         for i in range(len(self.region_criteria_df)):
             row = self.region_criteria_df.iloc[i]
-            oper = row["oper"]
-            col = row["column"]
+            oper = _CRITERIA_OPERATIONS[row["oper"]]
+            col = derived_features.get_column(self.df, row["column"]).to_numpy()
             value = float(row["value"])
-            if oper == ">":
-                bool = f"{col} > {value}"
-            elif oper == ">=":
-                bool = f"{col} >= {value}"
-            elif oper == "==":
-                bool = f"{col} == {value}"
-            elif oper == "!=":
-                bool = f"{col} != {value}"
-            elif oper == "<=":
-                bool = f"{col} <= {value}"
-            elif oper == "<":
-                bool = f"{col} < {value}"
-
-            if i == 0:
-                all_bools = bool
+
+            if mask is None:
+                mask = oper(col, value)
             else:
-                all_bools = f"{all_bools} & {bool}"
+                mask &= oper(col, value)
+
+        self.sample_region_mask = mask
 
-        if all_bools == "":
+        if mask is None:
             self.sample_region = self.df
         else:
-            self.sample_region = self.df.query(all_bools)
+            self.sample_region = self.df[mask]
 
         if len(self.sample_region) == 0:
             self.region_message = "No Matching Sources!"
@@ -290,13 +300,22 @@ class LabellingDashboard(param.Parameterized):
         if y_var is None:
             y_var = self.Y_variable
 
+        data = derived_features.get_columns(
+            self.df, [x_var, y_var, config.settings["label_col"]]
+        )
+
         p = hv.Points(
-            self.df,
+            data,
             [x_var, y_var],
         ).opts(active_tools=["pan", "wheel_zoom"])
 
+        if self.sample_region_mask is None:
+            region_data = data
+        else:
+            region_data = data[self.sample_region_mask]
+
         sample_region = hv.Points(
-            self.sample_region,
+            region_data,
             [x_var, y_var],
         ).opts(active_tools=["pan", "wheel_zoom"])
 
@@ -304,8 +323,11 @@ class LabellingDashboard(param.Parameterized):
 
         if len(self.src.data[cols[0]]) == 1:
             selected = pd.DataFrame(self.src.data, columns=cols, index=[0])
+            selected = derived_features.get_columns(
+                selected, [x_var, y_var], cache=False
+            )
         else:
-            selected = pd.DataFrame(columns=cols)
+            selected = pd.DataFrame(columns=[x_var, y_var])
 
         selected_plot = hv.Scatter(selected, x_var, y_var,).opts(
             fill_color="black",
@@ -325,16 +347,16 @@ class LabellingDashboard(param.Parameterized):
             }
         )
 
-        max_x = np.max(self.df[x_var])
-        min_x = np.min(self.df[x_var])
+        max_x = np.max(data[x_var])
+        min_x = np.min(data[x_var])
 
-        max_y = np.max(self.df[y_var])
-        min_y = np.min(self.df[y_var])
+        max_y = np.max(data[y_var])
+        min_y = np.min(data[y_var])
 
-        x_sd = np.std(self.df[x_var])
-        x_mu = np.mean(self.df[x_var])
-        y_sd = np.std(self.df[y_var])
-        y_mu = np.mean(self.df[y_var])
+        x_sd = np.std(data[x_var])
+        x_mu = np.mean(data[x_var])
+        y_sd = np.std(data[y_var])
+        y_mu = np.mean(data[y_var])
 
         max_x = np.min([x_mu + 4 * x_sd, max_x])
         min_x = np.max([x_mu - 4 * x_sd, min_x])
@@ -432,7 +454,7 @@ class LabellingDashboard(param.Parameterized):
 
     def select_random_point(self):
 
-        inside_region = list(self.sample_region[config.settings["id_col"]].values)
+        inside_region = self.sample_region[config.settings["id_col"]].values
 
         if len(inside_region) == 0:
             self.region_message = "No Matching Sources!"
@@ -442,10 +464,8 @@ class LabellingDashboard(param.Parameterized):
         else:
             self.region_message = f"{len(inside_region)} Matching Sources"
 
-        selected = random.choice(
-            list(self.sample_region[config.settings["id_col"]].values)
-        )
-        selected_source = self.df[self.df[config.settings["id_col"]] == selected]
+        selected = random.choice(inside_region)
+        selected_source = get_source(selected, self.df)
         selected_dict = selected_source.to_dict("list")
 
         self.src.data = selected_dict
@@ -475,7 +495,7 @@ class LabellingDashboard(param.Parameterized):
 
         if updated is not None:
 
-            selected_source = self.df[self.df[config.settings["id_col"]] == updated]
+            selected_source = get_source(updated, self.df)
             selected_dict = selected_source.to_dict("list")
             self.assign_label_group.value = config.settings["labels_to_strings"][
                 f"{self.labels[updated]}"
@@ -6,6 +6,7 @@ from holoviews.operation.datashader import (
 import datashader as ds
 import holoviews as hv
 
+from astronomicAL.utils import derived_features
 import astronomicAL.config as config
 import numpy as np
 import pandas as pd
@@ -62,8 +63,9 @@ class PlotDashboard(param.Parameterized):
     def update_variable_lists(self):
         """Update the list of options used inside `X_variable` and `Y_variable`.
 
-        This method retrieves an up-to-date list of columns inside `df` and
-        assigns them to both Selector objects.
+        This method retrieves an up-to-date list of columns inside `df`,
+        along with any derived features, and assigns them to both Selector
+        objects. Derived features are only calculated once they are plotted.
 
         Returns
         -------
@@ -73,7 +75,7 @@ class PlotDashboard(param.Parameterized):
 
         self.update_df()
 
-        cols = list(self.df.columns)
+        cols = derived_features.list_columns(self.df)
 
         if config.settings["id_col"] in cols:
             cols.remove(config.settings["id_col"])
@@ -132,8 +134,12 @@ class PlotDashboard(param.Parameterized):
         if y_var is None:
             y_var = self.Y_variable
 
+        data = derived_features.get_columns(
+            self.df, [x_var, y_var, config.settings["label_col"]]
+        )
+
         p = hv.Points(
-            self.df,
+            data,
             [x_var, y_var],
         ).opts(active_tools=["pan", "wheel_zoom"])
 
@@ -141,8 +147,11 @@ class PlotDashboard(param.Parameterized):
 
         if len(self.src.data[cols[0]]) == 1:
             selected = pd.DataFrame(self.src.data, columns=cols, index=[0])
+            selected = derived_features.get_columns(
+                selected, [x_var, y_var], cache=False
+            )
         else:
-            selected = pd.DataFrame(columns=cols)
+            selected = pd.DataFrame(columns=[x_var, y_var])
 
         selected_plot = hv.Scatter(selected, x_var, y_var,).opts(
             fill_color="black",
@@ -162,16 +171,16 @@ class PlotDashboard(param.Parameterized):
             }
         )
 
-        max_x = np.max(self.df[x_var])
-        min_x = np.min(self.df[x_var])
+        max_x = np.max(data[x_var])
+        min_x = np.min(data[x_var])
 
-        max_y = np.max(self.df[y_var])
-        min_y = np.min(self.df[y_var])
+        max_y = np.max(data[y_var])
+        min_y = np.min(data[y_var])
 
-        x_sd = np.std(self.df[x_var])
-        x_mu = np.mean(self.df[x_var])
-        y_sd = np.std(self.df[y_var])
-        y_mu = np.mean(self.df[y_var])
+        x_sd = np.std(data[x_var])
+        x_mu = np.mean(data[x_var])
+        y_sd = np.std(data[y_var])
+        y_mu = np.mean(data[y_var])
 
         max_x = np.min([x_mu + 4 * x_sd, max_x])
         min_x = np.max([x_mu - 4 * x_sd, min_x])
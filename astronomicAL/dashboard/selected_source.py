@@ -1,3 +1,4 @@
+from astronomicAL.utils.source_index import contains_source, get_source
 from functools import partial
 from requests.exceptions import ConnectionError
 from multiprocessing import Process
@@ -161,13 +162,13 @@ class SelectedSourceDashboard:
 
         self._search_status = "Searching..."
 
-        if event.new not in list(self.df[config.settings["id_col"]].values):
+        selected_source = get_source(event.new, self.df)
+
+        if len(selected_source) == 0:
             self._search_status = "ID not found in dataset"
             self.panel()
             return
 
-        selected_source = self.df[self.df[config.settings["id_col"]] == event.new]
-
         selected_dict = selected_source.set_index(config.settings["id_col"]).to_dict(
             "list"
         )
@@ -186,9 +187,7 @@ class SelectedSourceDashboard:
 
         if config.settings["id_col"] in list(self.src.data.keys()):
             if len(self.src.data[config.settings["id_col"]]) > 0:
-                if self.src.data[config.settings["id_col"]][0] in list(
-                    self.df[config.settings["id_col"]].values
-                ):
+                if contains_source(self.src.data[config.settings["id_col"]][0], self.df):
                     selected = True
 
         return selected
@@ -314,13 +313,51 @@ class SelectedSourceDashboard:
 
             self._update_default_images()
 
+    def _get_ra_dec_columns(self):
+
+        ra = None
+        dec = None
+        for col in list(self.df.columns):
+            if str(col).upper() == "RA":
+                ra = col
+            if str(col).upper() == "DEC":
+                dec = col
+
+        return ra, dec
+
+    def has_ra_dec(self):
+        """Check `df` has both Right Ascension and Declination columns.
+
+        Returns
+        -------
+        has_ra_dec : bool
+            Whether `df` has a column named RA and one named DEC (ignoring case).
+
+        """
+        ra, dec = self._get_ra_dec_columns()
+
+        return (ra is not None) and (dec is not None)
+
+    def get_selected_ra_dec(self):
+        """Get the Right Ascension and Declination of the selected source.
+
+        Returns
+        -------
+        ra : str
+            The Right Ascension of the selected source.
+        dec : str
+            The Declination of the selected source.
+
+        """
+        ra, dec = self._get_ra_dec_columns()
+
+        return str(self.src.data[ra][0]), str(self.src.data[dec][0])
+
     def _get_optical_url(self):
         url = "http://skyserver.sdss.org/dr16/SkyServerWS/ImgCutout/getjpeg?TaskName=Skyserver.Explore.Image&ra="
 
-        if self.check_required_column("ra_dec"):
-            ra_dec = self.src.data["ra_dec"][0]
-            ra = ra_dec[: ra_dec.index(",")]
-            dec = ra_dec[ra_dec.index(",") + 1 :]
+        if self.has_ra_dec():
+            ra, dec = self.get_selected_ra_dec()
 
             url = f"{url}{ra}&dec={dec}&opt=G&scale="
 
@@ -343,9 +380,7 @@ class SelectedSourceDashboard:
                 print(e)
 
             try:
-                ra_dec = self.src.data["ra_dec"][0]
-                ra = ra_dec[: ra_dec.index(",")]
-                dec = ra_dec[ra_dec.index(",") + 1 :]
+                ra, dec = self.get_selected_ra_dec()
                 self._url_radio_image = self._generate_radio_url(ra, dec)
                 r = requests.get(f"{self._url_radio_image}", timeout=20.0)
                 self.radio_image.object = self._url_radio_image
@@ -413,7 +448,7 @@ class SelectedSourceDashboard:
 
             button_row = pn.Row()
 
-            if self.check_required_column("ra_dec"):
+            if self.has_ra_dec():
                 button_row.append(self.zoom_increase)
                 button_row.append(self.zoom_decrease)
 
@@ -9,6 +9,7 @@ import holoviews as hv
 from holoviews import opts
 from holoviews.streams import Selection1D
 
+from astronomicAL.utils import derived_features
 import astronomicAL.config as config
 import numpy as np
 import pandas as pd
@@ -71,7 +72,9 @@ class CustomPlot:
 
             settings_row.append(
                 pn.widgets.Select(
-                    name=col, options=list(config.main_df.columns), max_height=120
+                    name=col,
+                    options=derived_features.list_columns(config.main_df),
+                    max_height=120,
                 )
             )
 
@@ -92,7 +95,7 @@ class CustomPlot:
     def plot(self, submit_button):
         self.submit_button = submit_button
 
-        current_cols = config.main_df.columns
+        current_cols = derived_features.list_columns(config.main_df)
 
         unknown_cols = []
         for col in self.extra_features:
@@ -105,7 +108,16 @@ class CustomPlot:
             self.col_selection = self.create_settings(unknown_cols)
             return self.render
         else:
-            return self.plot_fn
+            return self._plot_with_derived_features
+
+    def _plot_with_derived_features(self, data, selected=None):
+        # Only the columns used by this plot are passed on, so the dataset is
+        # never copied and only the derived features it uses are calculated.
+        cols = [config.settings["id_col"], config.settings["label_col"]]
+        cols += [config.settings[col] for col in self.extra_features]
+        data = derived_features.get_columns(data, cols)
+
+        return self.plot_fn(data, selected)
 
 
 def create_plot(
@@ -147,7 +159,10 @@ def create_plot(
             cols = list(data.columns)
 
             if len(selected.data[cols[0]]) == 1:
-                selected = pd.DataFrame(selected.data, columns=cols, index=[0])
+                selected = pd.DataFrame(selected.data, index=[0])
+                selected = derived_features.get_columns(
+                    selected, [x, y], cache=False
+                )
                 if bounds is not None:
                     if (
                         (selected[x][0] < bounds[0])
@@ -1,4 +1,5 @@
 from itertools import combinations
+from scipy.special import comb
 
 import astronomicAL.config as config
 import numpy as np
@@ -16,111 +17,179 @@ def get_oper_dict():
     return oper
 
 
-def add(df, n):
+def _prefixes(X, n, oper):
 
-    np.random.seed(0)
+    num_features = X.shape[1]
 
-    bands = config.settings["features_for_training"]
+    def _extend(prefix, last, depth):
 
-    combs = list(combinations(bands, n))
+        if depth == n - 1:
+            yield prefix, last
+            return
 
-    cols = list(df.columns)
+        for j in range(last + 1, num_features - (n - depth) + 1):
+            yield from _extend(oper(prefix, X[:, j]), j, depth + 1)
 
-    generated_features = []
+    for i in range(num_features - n + 1):
+        yield from _extend(X[:, i], i, 1)
 
-    for comb in combs:
-        col = ""
-        for i in range(n):
-            col = col + f"{comb[i]}"
-            if i != (n - 1):
-                col = col + "+"
-        generated_features.append(col)
-        if col not in cols:
-            for i in range(n):
-                if i == 0:
-                    df[col] = df[comb[i]]
-                else:
-                    df[col] = df[col] + df[comb[i]]
 
-    return df, generated_features
+def _fill_block(X, n, oper, dtype):
 
+    num_rows, num_features = X.shape
 
-def subtract(df, n):
+    num_combs = comb(num_features, n, exact=True)
 
-    np.random.seed(0)
+    out = np.empty((num_rows, num_combs), dtype=dtype, order="F")
+
+    if n == 1:
+        out[:] = X
+        return out
+
+    pos = 0
+    for prefix, last in _prefixes(X, n, oper):
+        stop = pos + num_features - last - 1
+        oper(
+            prefix[:, np.newaxis],
+            X[:, last + 1 :],
+            out=out[:, pos:stop],
+            casting="same_kind",
+        )
+        pos = stop
+
+    return out
+
+
+def combine_block(X, n, oper):
+    """Apply `oper` across every combination of `n` columns of `X` at once.
+
+    Combinations are computed depth first in the order of
+    `itertools.combinations`, so each partial result of the first `n - 1`
+    features is calculated once and then extended with every remaining column
+    in a single broadcast operation, written straight into the output.
+
+    Parameters
+    ----------
+    X : Numpy Array
+        The base features, with one column per feature.
+    n : int
+        The number of features in each combination.
+    oper : numpy.ufunc
+        The binary operation folded from left to right over each combination,
+        for example `np.subtract` gives `a - b - c`.
+
+    Returns
+    -------
+    block : Numpy Array
+        Column-major array with one column per combination. Floating point
+        results are stored as float32, other results keep the dtype given by
+        `oper`.
+    wide : dict
+        Dictionary of the full precision values of each column of `block`
+        whose results are too large for float32, keyed by column position.
+        The same column of `block` holds infinities in their place.
+
+    """
+    X = np.asfortranarray(X)
+
+    wide = {}
+
+    with np.errstate(all="ignore"):
+        dtype = oper(X[:1, :1], X[:1, :1]).dtype
+
+        if dtype.kind == "f" and dtype.itemsize > 4:
+            out = _fill_block(X, n, oper, np.float32)
+
+            if np.isinf(out).any():
+                # Only columns where float32 turned a finite result infinite
+                # are kept at full precision. Results which are infinite to
+                # begin with, such as a division by zero, are not overflows.
+                full = _fill_block(X, n, oper, dtype)
+                overflowed = (np.isinf(out) != np.isinf(full)).any(axis=0)
+
+                for i in np.flatnonzero(overflowed):
+                    wide[i] = full[:, i].copy()
+        else:
+            out = _fill_block(X, n, oper, dtype)
+
+    return out, wide
+
+
+def combine_features(df, n, oper, symbol):
+    """Add every combination of `n` training features to `df`, joined by `oper`.
 
+    All missing combinations are calculated together by `combine_block` and
+    added to `df` in a single assignment. Any combination too large for
+    float32 is then replaced by its full precision values.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame containing the entire dataset.
+    n : int
+        The number of features involved in the operation.
+    oper : numpy.ufunc
+        The binary operation applied between the features of a combination.
+    symbol : str
+        The string placed between feature names in each generated column name.
+
+    Returns
+    -------
+    df : DataFrame
+        `df` with the generated features added in place.
+    generated_features : list of str
+        The names of every generated feature, including any already in `df`.
+
+    """
     bands = config.settings["features_for_training"]
 
-    combs = list(combinations(bands, n))
-
-    cols = list(df.columns)
-    generated_features = []
-    for comb in combs:
-        col = ""
-        for i in range(n):
-            col = col + f"{comb[i]}"
-            if i != (n - 1):
-                col = col + "-"
-        generated_features.append(col)
-        if col not in cols:
-            for i in range(n):
-                if i == 0:
-                    df[col] = df[comb[i]]
-                else:
-                    df[col] = df[col] - df[comb[i]]
+    combs = list(combinations(range(len(bands)), n))
+
+    generated_features = [symbol.join(f"{bands[i]}" for i in c) for c in combs]
+
+    cols = set(df.columns)
+    missing = [i for i, col in enumerate(generated_features) if col not in cols]
+
+    if len(missing) == 0:
+        return df, generated_features
+
+    block, wide = combine_block(df[bands].to_numpy(), n, oper)
+
+    if len(missing) < len(combs):
+        block = np.asfortranarray(block[:, missing])
+
+    df[[generated_features[i] for i in missing]] = block
+
+    for i in missing:
+        if i in wide:
+            df[generated_features[i]] = wide[i]
 
     return df, generated_features
 
 
-def multiply(df, n):
+def add(df, n):
 
     np.random.seed(0)
 
-    bands = config.settings["features_for_training"]
+    return combine_features(df, n, np.add, "+")
 
-    combs = list(combinations(bands, n))
-
-    cols = list(df.columns)
-    generated_features = []
-    for comb in combs:
-        col = ""
-        for i in range(n):
-            col = col + f"{comb[i]}"
-            if i != (n - 1):
-                col = col + "*"
-        generated_features.append(col)
-        if col not in cols:
-            for i in range(n):
-                if i == 0:
-                    df[col] = df[comb[i]]
-                else:
-                    df[col] = df[col] * df[comb[i]]
 
-    return df, generated_features
+def subtract(df, n):
 
+    np.random.seed(0)
+
+    return combine_features(df, n, np.subtract, "-")
 
-def divide(df, n):
+
+def multiply(df, n):
 
     np.random.seed(0)
 
-    bands = config.settings["features_for_training"]
+    return combine_features(df, n, np.multiply, "*")
 
-    combs = list(combinations(bands, n))
-
-    cols = list(df.columns)
-    generated_features = []
-    for comb in combs:
-        col = ""
-        for i in range(n):
-            col = col + f"{comb[i]}"
-            if i != (n - 1):
-                col = col + "/"
-        generated_features.append(col)
-        if col not in cols:
-            for i in range(n):
-                if i == 0:
-                    df[col] = df[comb[i]]
-                else:
-                    df[col] = df[col] / df[comb[i]]
 
-    return df, generated_features
+def divide(df, n):
+
+    np.random.seed(0)
+
+    return combine_features(df, n, np.true_divide, "/")
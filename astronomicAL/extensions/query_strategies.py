@@ -1,4 +1,19 @@
-from modAL.uncertainty import entropy_sampling, margin_sampling, uncertainty_sampling
+from astronomicAL.utils.inference import apply_chunked, get_chunk_n_jobs
+from functools import partial
+from modAL.disagreement import vote_entropy, vote_entropy_sampling
+from modAL.uncertainty import (
+    classifier_entropy,
+    classifier_margin,
+    classifier_uncertainty,
+    entropy_sampling,
+    margin_sampling,
+    uncertainty_sampling,
+)
+from scipy.stats import entropy
+from sklearn.cluster import MiniBatchKMeans
+
+import heapq
+import numpy as np
 
 
 def get_strategy_dict():
@@ -9,3 +24,475 @@ def get_strategy_dict():
         "Entropy Sampling": entropy_sampling,
     }
     return qs_dict
+
+
+def get_utility_dict():
+    """Map each query strategy to the function scoring how informative each source is.
+
+    Returns
+    -------
+    utility_dict : dict
+        Dictionary mapping query strategy functions to functions taking a
+        learner and data and returning the utility of each row, where larger
+        is more informative.
+
+    """
+
+    def _negative_margin(classifier, X):
+        return -classifier_margin(classifier, X)
+
+    utility_dict = {
+        uncertainty_sampling: classifier_uncertainty,
+        margin_sampling: _negative_margin,
+        entropy_sampling: classifier_entropy,
+        vote_entropy_sampling: vote_entropy,
+    }
+    return utility_dict
+
+
+def _consensus(vote_proba):
+
+    if vote_proba.shape[1] == 1:
+        return vote_proba[:, 0, :]
+
+    return np.mean(vote_proba, axis=1)
+
+
+def _proba_uncertainty(vote_proba):
+
+    return 1 - np.max(_consensus(vote_proba), axis=1)
+
+
+def _proba_negative_margin(vote_proba):
+
+    proba = _consensus(vote_proba)
+
+    if proba.shape[1] == 1:
+        return np.zeros(shape=len(proba))
+
+    part = np.partition(-proba, 1, axis=1)
+    return part[:, 0] - part[:, 1]
+
+
+def _proba_entropy(vote_proba):
+
+    return np.transpose(entropy(np.transpose(_consensus(vote_proba))))
+
+
+def _proba_vote_entropy(vote_proba):
+
+    n_learners = vote_proba.shape[1]
+    n_classes = vote_proba.shape[2]
+
+    votes = np.argmax(vote_proba, axis=2)
+    p_vote = np.zeros(shape=(vote_proba.shape[0], n_classes))
+    for class_idx in range(n_classes):
+        p_vote[:, class_idx] = np.sum(votes == class_idx, axis=1) / n_learners
+
+    return entropy(p_vote, axis=1)
+
+
+def get_proba_utility_dict():
+    """Map each query strategy to the function scoring sources from predicted probabilities.
+
+    These give the same scores as the functions in `get_utility_dict`, but
+    take probabilities which have already been predicted, so that they can
+    be shared with the rest of the dashboard.
+
+    Returns
+    -------
+    utility_dict : dict
+        Dictionary mapping query strategy functions to functions taking the
+        class probabilities predicted by each learner, with shape
+        (n_sources, n_learners, n_classes), and returning the utility of each
+        source.
+
+    """
+
+    utility_dict = {
+        uncertainty_sampling: _proba_uncertainty,
+        margin_sampling: _proba_negative_margin,
+        entropy_sampling: _proba_entropy,
+        vote_entropy_sampling: _proba_vote_entropy,
+    }
+    return utility_dict
+
+
+def get_pool_scoring_dict():
+    """List the ways the pool can be narrowed down before it is queried.
+
+    Returns
+    -------
+    scoring_dict : dict
+        Dictionary mapping the name of each pool scoring option to its class.
+        Each class is created with the sample size and must implement
+        `candidates(learner, pool, score=None)`.
+
+    """
+
+    scoring_dict = {
+        "Full Pool": FullPoolScoring,
+        "Random Subsample": RandomSubsampleScoring,
+        "Stratified Subsample": StratifiedSubsampleScoring,
+        "Cached Score Heap": CachedScoreHeap,
+    }
+    return scoring_dict
+
+
+class FullPoolScoring:
+    """Score every source in the pool each time it is queried.
+
+    Parameters
+    ----------
+    sample_size : int, default = None
+        Unused, accepted so that every pool scoring option is created the same
+        way.
+
+    """
+
+    def __init__(self, sample_size=None):
+
+        self.sample_size = sample_size
+
+    def candidates(self, learner, pool, score=None):
+        """Choose the sources that the query strategy should score.
+
+        Parameters
+        ----------
+        learner : ModAL ActiveLearner or Committee
+            The learner that will score the candidates.
+        pool : ActivePool
+            The sources that can be queried.
+        score : callable, default = None
+            Function returning the utility of the sources at the given rows of
+            `pool`, for example using predictions that have already been made.
+            If `None`, sources are scored by `learner` when needed.
+
+        Returns
+        -------
+        candidates : Numpy Array or None
+            The rows of `pool` to score, or `None` to score the whole pool.
+
+        """
+        return None
+
+
+class RandomSubsampleScoring:
+    """Score a random subsample of the pool each time it is queried.
+
+    The queried source is the most informative of `sample_size` sources chosen
+    uniformly at random, so the cost of each query no longer grows with the
+    size of the pool.
+
+    Parameters
+    ----------
+    sample_size : int, default = 10000
+        The number of sources to score.
+    random_state : int, default = 0
+        The seed used to draw each subsample.
+
+    Attributes
+    ----------
+    sample_size : int
+        The number of sources to score.
+    _rng : numpy.random.RandomState
+        The random number generator used to draw each subsample.
+
+    """
+
+    def __init__(self, sample_size=10000, random_state=0):
+
+        self.sample_size = int(sample_size)
+        self._rng = np.random.RandomState(random_state)
+
+    def candidates(self, learner, pool, score=None):
+        """Choose the sources that the query strategy should score.
+
+        Parameters
+        ----------
+        learner : ModAL ActiveLearner or Committee
+            The learner that will score the candidates.
+        pool : ActivePool
+            The sources that can be queried.
+        score : callable, default = None
+            Function returning the utility of the sources at the given rows of
+            `pool`, for example using predictions that have already been made.
+            If `None`, sources are scored by `learner` when needed.
+
+        Returns
+        -------
+        candidates : Numpy Array or None
+            The rows of `pool` to score, or `None` to score the whole pool.
+
+        """
+        if len(pool) <= self.sample_size:
+            return None
+
+        candidates = np.sort(
+            self._rng.choice(len(pool), self.sample_size, replace=False)
+        )
+
+        print(
+            f"query: scoring a random subsample of {self.sample_size}/{len(pool)} pool sources"
+        )
+
+        return candidates
+
+
+class StratifiedSubsampleScoring:
+    """Score a subsample of the pool spread evenly across regions of feature space.
+
+    The pool is split into `n_strata` clusters using k-means, fitted once on a
+    random sample of the pool. Every source is assigned to its cluster once,
+    and sources removed from the pool simply stop being looked up, so later
+    queries never run the clustering again. Each subsample then gives every
+    cluster the same chance of being drawn from, so small regions of feature
+    space are scored as often as large ones.
+
+    Parameters
+    ----------
+    sample_size : int, default = 10000
+        The number of sources to score.
+    n_strata : int, default = 10
+        The number of clusters to split the pool into.
+    random_state : int, default = 0
+        The seed used for clustering and to draw each subsample.
+
+    Attributes
+    ----------
+    sample_size : int
+        The number of sources to score.
+    n_strata : int
+        The number of clusters to split the pool into.
+    _rng : numpy.random.RandomState
+        The random number generator used to draw each subsample.
+    _kmeans : sklearn MiniBatchKMeans
+        The clustering used to assign each source to a stratum.
+    _strata : Numpy Array
+        The stratum of the source at each row of the pool's shared matrix,
+        or -1 for rows that have not been assigned one.
+
+    """
+
+    def __init__(self, sample_size=10000, n_strata=10, random_state=0):
+
+        self.sample_size = int(sample_size)
+        self.n_strata = n_strata
+        self._random_state = random_state
+        self._rng = np.random.RandomState(random_state)
+        self._kmeans = None
+        self._strata = np.empty(0, dtype=np.intp)
+
+    def candidates(self, learner, pool, score=None):
+        """Choose the sources that the query strategy should score.
+
+        Parameters
+        ----------
+        learner : ModAL ActiveLearner or Committee
+            The learner that will score the candidates.
+        pool : ActivePool
+            The sources that can be queried.
+        score : callable, default = None
+            Function returning the utility of the sources at the given rows of
+            `pool`, for example using predictions that have already been made.
+            If `None`, sources are scored by `learner` when needed.
+
+        Returns
+        -------
+        candidates : Numpy Array or None
+            The rows of `pool` to score, or `None` to score the whole pool.
+
+        """
+        if len(pool) <= self.sample_size:
+            return None
+
+        if self._kmeans is None:
+            fit_rows = self._rng.choice(
+                len(pool), min(len(pool), 10 * self.sample_size), replace=False
+            )
+            self._kmeans = MiniBatchKMeans(
+                n_clusters=self.n_strata, random_state=self._random_state
+            ).fit(pool.take(fit_rows))
+
+        strata = self._get_strata(pool)
+        counts = np.bincount(strata, minlength=self.n_strata)
+
+        # Weighted sampling without replacement, where every stratum carries
+        # the same total weight.
+        weights = 1.0 / counts[strata]
+        keys = np.log(self._rng.random_sample(len(pool))) / weights
+        candidates = np.sort(
+            np.argpartition(-keys, self.sample_size - 1)[: self.sample_size]
+        )
+
+        drawn = np.bincount(strata[candidates], minlength=self.n_strata)
+        print(
+            f"query: scoring a stratified subsample of {self.sample_size}/{len(pool)} pool sources "
+            f"(per stratum: {drawn[counts > 0].min()}-{drawn.max()})"
+        )
+
+        return candidates
+
+    def _get_strata(self, pool):
+
+        rows = pool.rows
+
+        if len(rows) > 0 and rows.max() >= len(self._strata):
+            grown = np.full(rows.max() + 1, -1, dtype=np.intp)
+            grown[: len(self._strata)] = self._strata
+            self._strata = grown
+
+        # Only sources that have never been clustered are predicted.
+        missing = np.flatnonzero(self._strata[rows] == -1)
+        if len(missing) > 0:
+            self._strata[rows[missing]] = apply_chunked(
+                lambda positions: self._kmeans.predict(pool.take(positions)),
+                missing,
+            )
+
+        return self._strata[rows]
+
+
+class CachedScoreHeap:
+    """Keep the score of every source and only rescore the most promising ones.
+
+    The whole pool is scored on the first query. Afterwards, the scores are
+    kept in a heap and each query rescores the `sample_size` highest scoring
+    sources with the current classifier, repeating until the highest scores
+    all come from the current classifier. Every other source keeps the score
+    it was given by an earlier classifier, which is the approximation made.
+
+    Unless a `score` function is given, the query strategy must have an entry
+    in `get_utility_dict`, otherwise the whole pool is scored each time.
+
+    Parameters
+    ----------
+    sample_size : int, default = 10000
+        The number of sources to rescore at a time.
+
+    Attributes
+    ----------
+    sample_size : int
+        The number of sources to rescore at a time.
+    _heap : list
+        Heap of (-score, version, id) entries for the pool.
+    _latest : dict
+        Dictionary mapping each source id to the version of its newest heap
+        entry. Older entries are ignored.
+    _version : int
+        The number of queries made so far, used to tell which scores come from
+        the current classifier.
+
+    """
+
+    def __init__(self, sample_size=10000):
+
+        self.sample_size = int(sample_size)
+        self._heap = None
+        self._latest = {}
+        self._version = 0
+
+    def candidates(self, learner, pool, score=None):
+        """Choose the sources that the query strategy should score.
+
+        Parameters
+        ----------
+        learner : ModAL ActiveLearner or Committee
+            The learner that will score the candidates.
+        pool : ActivePool
+            The sources that can be queried.
+        score : callable, default = None
+            Function returning the utility of the sources at the given rows of
+            `pool`, for example using predictions that have already been made.
+            If `None`, sources are scored by `learner` when needed.
+
+        Returns
+        -------
+        candidates : Numpy Array or None
+            The rows of `pool` to score, or `None` to score the whole pool.
+
+        """
+        if score is None:
+            utility = get_utility_dict().get(learner.query_strategy)
+            if utility is None:
+                return None
+
+            def score(positions):
+                return apply_chunked(
+                    partial(utility, learner),
+                    pool.take(positions),
+                    n_jobs=get_chunk_n_jobs(learner),
+                )
+
+        if len(pool) <= self.sample_size:
+            return None
+
+        self._version += 1
+
+        if self._heap is None:
+            self._score_all(pool, score)
+            print(f"query: scored all {len(pool)} pool sources into the score cache")
+            return self._top(pool)
+
+        rescored = 0
+        while True:
+            top = self._pop_top(pool)
+            stale = [entry for entry in top if entry[1] != self._version]
+
+            for entry in top:
+                if entry[1] == self._version:
+                    heapq.heappush(self._heap, entry)
+
+            if len(stale) == 0:
+                break
+
+            source_ids = [entry[2] for entry in stale]
+            positions = [pool.get_position(source_id) for source_id in source_ids]
+            self._push(source_ids, score(positions))
+            rescored += len(stale)
+
+        print(
+            f"query: rescored {rescored}/{len(pool)} pool sources, "
+            f"the rest use cached scores from earlier classifiers"
+        )
+
+        return self._top(pool)
+
+    def _score_all(self, pool, score):
+
+        self._heap = []
+        self._latest = {}
+        self._push(pool.ids.tolist(), score(np.arange(len(pool))))
+
+    def _push(self, source_ids, scores):
+
+        # NaN does not compare with anything, which would break the heap order.
+        scores = np.asarray(scores, dtype=float)
+        scores = np.where(np.isnan(scores), -np.inf, scores)
+
+        for source_id, score in zip(source_ids, scores.tolist()):
+            self._latest[source_id] = self._version
+            heapq.heappush(self._heap, (-score, self._version, source_id))
+
+    def _pop_top(self, pool):
+
+        top = []
+        while self._heap and len(top) < self.sample_size:
+            entry = heapq.heappop(self._heap)
+            source_id = entry[2]
+
+            # Entries of removed sources and rescored sources are dropped lazily.
+            if (source_id not in pool) or (self._latest[source_id] != entry[1]):
+                continue
+
+            top.append(entry)
+
+        return top
+
+    def _top(self, pool):
+
+        top = self._pop_top(pool)
+        for entry in top:
+            heapq.heappush(self._heap, entry)
+
+        return np.sort([pool.get_position(entry[2]) for entry in top])
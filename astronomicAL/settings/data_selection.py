@@ -1,4 +1,10 @@
-from astronomicAL.utils.optimise import optimise
+from astronomicAL.utils.cache import (
+    get_dataframe_cache_key,
+    load_dataframe_from_cache,
+    save_dataframe_to_cache,
+)
+from astronomicAL.utils.load_data import decode_bytes, read_fits_file
+from astronomicAL.utils.optimise import optimise_table
 from astropy.table import Table
 from bokeh.models import TextAreaInput
 from bokeh.models.callbacks import CustomJS
@@ -190,13 +196,21 @@ class DataSelection(param.Parameterized):
 
         print(f"Config load level: {config.settings['config_load_level']}")
 
-    def get_dataframe_from_fits_file(self, filename, optimise_data=None):
+    def get_dataframe_from_fits_file(self, filename, optimise_data=None, columns=None):
         """Load data from FITS file into dataframe.
 
+        The loaded DataFrame is cached in `config.cache_dir` so that subsequent
+        loads of an unchanged file skip parsing the file entirely.
+
         Parameters
         ----------
         filename : str
             Path of file to be loaded.
+        optimise_data : bool, default = None
+            Flag for whether to memory optimise the loaded DataFrame. If `None`
+            the value of `memory_optimisation_check` is used.
+        columns : set of str, default = None
+            The names of the columns to load. If `None`, all columns are loaded.
 
         Returns
         -------
@@ -205,42 +219,61 @@ class DataSelection(param.Parameterized):
 
         """
         ext = filename[filename.rindex(".") + 1 :]
+
+        if optimise_data is None:
+            optimise_data = self.memory_optimisation_check.value
+            config.settings["optimise_data"] = optimise_data
+
+        cache_key = get_dataframe_cache_key(filename, optimise_data, columns)
+        df = load_dataframe_from_cache(cache_key)
+
+        if df is not None:
+            print(f"Loaded {filename} from cache.")
+            return df
+
+        df = None
+        if ext == "fits":
+            df = read_fits_file(
+                filename,
+                columns=columns,
+                optimise_data=optimise_data,
+                decode_strings=True,
+            )
+
+        if df is None:
+            df = self._get_dataframe_from_table(filename, ext, optimise_data, columns)
+
+            # read_fits_file decodes its own string columns as it reads them.
+            if ext == "fits":
+                for col in df.columns:
+                    decoded = decode_bytes(df[col].values)
+                    if decoded is not None:  # Only process byte object columns.
+                        df[col] = decoded
+
+        save_dataframe_to_cache(df, cache_key, filename)
+
+        return df
+
+    def _get_dataframe_from_table(self, filename, ext, optimise_data, columns):
+
         fits_table = Table.read(filename, format=f"{ext}")
 
         names = [
-            name for name in fits_table.colnames if len(fits_table[name].shape) <= 1
+            name
+            for name in fits_table.colnames
+            if len(fits_table[name].shape) <= 1
+            and (columns is None or name in columns)
         ]
 
-        if optimise_data is None:
-            config.settings["optimise_data"] = self.memory_optimisation_check.value
-            if self.memory_optimisation_check.value:
-                approx_time = np.ceil(
-                    (np.array(fits_table).shape[0] * len(names)) / 200000000
-                )
-                self.load_data_button.name = (
-                    f"Optimising... Approx time: {int(approx_time)} minute(s)"
-                )
-                df = optimise(fits_table[names].to_pandas())
-            else:
-                df = fits_table[names].to_pandas()
-        elif optimise_data:
-            approx_time = np.ceil(
-                (np.array(fits_table).shape[0] * len(names)) / 200000000
-            )
+        if optimise_data:
+            approx_time = np.ceil((len(fits_table) * len(names)) / 200000000)
             self.load_data_button.name = (
                 f"Optimising... Approx time: {int(approx_time)} minute(s)"
             )
-            df = optimise(fits_table[names].to_pandas())
+            df = optimise_table(fits_table, names)
         else:
             df = fits_table[names].to_pandas()
 
-        if ext == "fits":
-            for col, dtype in df.dtypes.items():
-                if dtype == np.object:  # Only process byte object columns.
-                    df[col] = df[col].apply(lambda x: x.decode("utf-8"))
-
-        df = self.add_ra_dec_col(df)
-
         return df
 
     def _load_data_cb(self, event):
@@ -262,27 +295,6 @@ class DataSelection(param.Parameterized):
         self.ready = True
         self.load_data_button.name = "File Loaded."
 
-    def add_ra_dec_col(self, df):
-
-        new_df = df
-        has_loc = True
-        ra = None
-        dec = None
-        for col in list(new_df.columns):
-            if col.upper() == "RA":
-                ra = col
-            if col.upper() == "DEC":
-                dec = col
-
-        if (ra is None) or (dec is None):
-            has_loc = False
-
-        if has_loc:
-
-            new_df["ra_dec"] = df[ra].astype(str) + "," + df[dec].astype(str)
-
-        return new_df
-
     def get_df(self):
         """Return the dataframe that has been loaded in from a file.
 
@@ -0,0 +1,486 @@
+from sklearn.preprocessing import RobustScaler
+
+import astronomicAL.config as config
+import hashlib
+import json
+import numpy as np
+import os
+import pandas as pd
+import shutil
+
+# Increment whenever the layout of a cached DataFrame changes so that stale
+# entries written by an older version are never loaded.
+CACHE_VERSION = 7
+
+
+def get_file_fingerprint(filename):
+    """Return the properties of a file which identify its current contents.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the file.
+
+    Returns
+    -------
+    fingerprint : dict
+        Dictionary containing the absolute path, modification time (ns) and
+        size (bytes) of `filename`.
+
+    """
+    stat = os.stat(filename)
+    fingerprint = {
+        "path": os.path.abspath(filename),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+    return fingerprint
+
+
+def hash_dict(values):
+    """Create a stable hash of a json serialisable dictionary.
+
+    Parameters
+    ----------
+    values : dict
+        The dictionary to hash.
+
+    Returns
+    -------
+    key : str
+        Hex digest of the sorted json representation of `values`.
+
+    """
+    encoded = json.dumps(values, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def get_dataframe_cache_key(filename, optimise_data, columns=None):
+    """Create the cache key for a loaded dataset.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the dataset file.
+    optimise_data : bool
+        Flag for whether the DataFrame was memory optimised when loaded.
+    columns : set of str, default = None
+        The names of the columns that were requested, or `None` if every
+        column was loaded.
+
+    Returns
+    -------
+    key : str
+        The key identifying the cached DataFrame.
+
+    """
+    fingerprint = get_file_fingerprint(filename)
+    fingerprint["optimise_data"] = bool(optimise_data)
+    fingerprint["columns"] = None if columns is None else sorted(columns)
+    fingerprint["version"] = CACHE_VERSION
+
+    return hash_dict(fingerprint)
+
+
+def _get_cache_path(key):
+    return os.path.join(config.cache_dir, key)
+
+
+def _get_column_kind(series):
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return "category"
+    elif isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf":
+        return "numeric"
+    elif series.dtype == object:
+        if pd.api.types.infer_dtype(series, skipna=False) == "string":
+            return "string"
+
+    return None
+
+
+def _save_columns(df, path, prefix=""):
+
+    columns = []
+    for col in df.columns:
+        kind = _get_column_kind(df[col])
+        if kind is None:
+            print(f"Unable to cache column {col} with dtype {df[col].dtype}.")
+            return None
+        columns.append({"name": col, "kind": kind})
+
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        kind = columns[i]["kind"]
+        if kind == "category":
+            np.save(f"{path}/{prefix}{i}.npy", values.cat.codes.to_numpy())
+            np.save(
+                f"{path}/{prefix}{i}_categories.npy",
+                _to_storable(values.cat.categories.to_numpy()),
+            )
+            columns[i]["ordered"] = bool(values.cat.ordered)
+        elif kind == "string":
+            np.save(f"{path}/{prefix}{i}.npy", values.to_numpy().astype(str))
+        else:
+            np.save(f"{path}/{prefix}{i}.npy", values.to_numpy())
+
+    return columns
+
+
+def _load_columns(path, columns, num_rows, prefix="", mmap_mode="r"):
+
+    data = {}
+    for i, col in enumerate(columns):
+        values = np.load(
+            f"{path}/{prefix}{i}.npy", mmap_mode=mmap_mode, allow_pickle=False
+        )
+
+        if len(values) != num_rows:
+            return None
+
+        if col["kind"] == "category":
+            categories = np.load(
+                f"{path}/{prefix}{i}_categories.npy", allow_pickle=False
+            )
+            values = pd.Categorical.from_codes(
+                np.array(values), categories=categories, ordered=col["ordered"]
+            )
+        elif col["kind"] == "string":
+            values = values.astype(object)
+
+        data[col["name"]] = values
+
+    return pd.DataFrame(data, columns=[col["name"] for col in columns])
+
+
+def _write_entry(key, write):
+
+    path = _get_cache_path(key)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+
+    try:
+        os.makedirs(tmp_path, exist_ok=True)
+
+        meta = write(tmp_path)
+        if meta is None:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return False
+
+        with open(f"{tmp_path}/meta.json", "w") as fp:
+            json.dump(meta, fp)
+
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+
+        _remove_stale_entries(meta["path"], key, meta["kind"])
+
+    except OSError as e:
+        print(f"Unable to write data cache: {e}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return False
+
+    return True
+
+
+def _read_meta(key, kind):
+
+    meta_file = f"{_get_cache_path(key)}/meta.json"
+
+    if not os.path.isfile(meta_file):
+        return None
+
+    try:
+        with open(meta_file) as fp:
+            meta = json.load(fp)
+    except (OSError, ValueError) as e:
+        print(f"Unable to read data cache: {e}")
+        return None
+
+    if meta.get("version") != CACHE_VERSION or meta.get("kind") != kind:
+        return None
+
+    return meta
+
+
+def save_dataframe_to_cache(df, key, filename):
+    """Save a DataFrame as a directory of memory-mappable `.npy` columns.
+
+    Any previous cache entries created from `filename` are removed. Frames
+    containing columns that cannot be stored losslessly are not cached.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame to cache.
+    key : str
+        The key returned by `get_dataframe_cache_key`.
+    filename : str
+        Path of the dataset file that `df` was loaded from.
+
+    Returns
+    -------
+    cached : bool
+        Whether `df` was written to the cache.
+
+    """
+    if not isinstance(df.index, pd.RangeIndex):
+        return False
+
+    def _write(path):
+
+        columns = _save_columns(df, path)
+        if columns is None:
+            return None
+
+        meta = {
+            "kind": "dataframe",
+            "path": os.path.abspath(filename),
+            "version": CACHE_VERSION,
+            "num_rows": len(df),
+            "columns": columns,
+        }
+        return meta
+
+    return _write_entry(key, _write)
+
+
+def _to_storable(values):
+    if values.dtype == object:
+        return values.astype(str)
+    return values
+
+
+def _remove_stale_entries(abs_path, current_key, kind):
+
+    if not os.path.isdir(config.cache_dir):
+        return
+
+    for entry in os.listdir(config.cache_dir):
+        if entry == current_key or ".tmp-" in entry:
+            continue
+        meta_file = os.path.join(config.cache_dir, entry, "meta.json")
+        if not os.path.isfile(meta_file):
+            continue
+        try:
+            with open(meta_file) as fp:
+                meta = json.load(fp)
+        except (OSError, ValueError):
+            continue
+        if meta.get("path") == abs_path and meta.get("kind", "dataframe") == kind:
+            shutil.rmtree(os.path.join(config.cache_dir, entry), ignore_errors=True)
+
+
+def load_dataframe_from_cache(key):
+    """Load a DataFrame previously saved with `save_dataframe_to_cache`.
+
+    Columns are read through memory maps so only the pages that are used are
+    read from disk.
+
+    Parameters
+    ----------
+    key : str
+        The key returned by `get_dataframe_cache_key`.
+
+    Returns
+    -------
+    df : DataFrame or None
+        The cached DataFrame, or `None` if no valid cache entry exists.
+
+    """
+    meta = _read_meta(key, "dataframe")
+
+    if meta is None:
+        return None
+
+    try:
+        df = _load_columns(_get_cache_path(key), meta["columns"], meta["num_rows"])
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Unable to read data cache: {e}")
+        return None
+
+    return df
+
+
+# The sets stored in a preprocessing cache entry, named as in `config.ml_data`.
+PREPROCESSED_SETS = ["train_with_unknowns", "val", "test"]
+
+
+def get_preprocessed_cache_key(filename, settings, test_set=None):
+    """Create the cache key for the preprocessed train, validation and test sets.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the dataset file.
+    settings : dict
+        The json serialisable settings which change the preprocessed data.
+    test_set : dict, default = None
+        The labels of the sources moved into the test set, or `None` if no
+        test set file is used.
+
+    Returns
+    -------
+    key : str
+        The key identifying the cached preprocessed data.
+
+    """
+    fingerprint = get_file_fingerprint(filename)
+    fingerprint["kind"] = "preprocessed"
+    fingerprint["settings"] = settings
+    fingerprint["test_set"] = test_set
+    fingerprint["version"] = CACHE_VERSION
+
+    return hash_dict(fingerprint)
+
+
+def save_preprocessed_to_cache(ml_data, key, filename):
+    """Save the preprocessed train, validation and test sets.
+
+    The single C-contiguous feature matrix of every set, "x", is stored as it
+    is, alongside the row index of each set, the label and id columns and the
+    parameters of the fitted scaler. Any previous preprocessing entries
+    created from `filename` are removed.
+
+    Parameters
+    ----------
+    ml_data : dict
+        Dictionary holding the preprocessed sets, laid out as
+        `config.ml_data`.
+    key : str
+        The key returned by `get_preprocessed_cache_key`.
+    filename : str
+        Path of the dataset file that the data was created from.
+
+    Returns
+    -------
+    cached : bool
+        Whether the data was written to the cache.
+
+    """
+    matrix = ml_data["x"]
+    x_cols = list(ml_data["x_train_with_unknowns"].columns)
+
+    y_sets = [ml_data[f"y_{name}"] for name in PREPROCESSED_SETS]
+
+    for y in y_sets:
+        if y.index.dtype.kind not in "iu":
+            return False
+
+    scaler = ml_data.get("scaler")
+    if (scaler is not None) and (type(scaler) is not RobustScaler):
+        return False
+
+    def _write(path):
+
+        np.save(f"{path}/x.npy", np.ascontiguousarray(matrix))
+
+        index = np.concatenate([y.index.to_numpy() for y in y_sets])
+        np.save(f"{path}/index.npy", index)
+
+        y = pd.concat(y_sets)
+        y_columns = _save_columns(y, path, prefix="y_")
+
+        ids = pd.concat([ml_data[f"id_{name}"] for name in PREPROCESSED_SETS])
+        id_columns = _save_columns(ids, path, prefix="id_")
+
+        if (y_columns is None) or (id_columns is None):
+            return None
+
+        scaler_meta = None
+        if scaler is not None:
+            np.save(f"{path}/scaler_center.npy", scaler.center_)
+            np.save(f"{path}/scaler_scale.npy", scaler.scale_)
+            scaler_meta = {
+                "params": scaler.get_params(),
+                "has_center": scaler.center_ is not None,
+                "has_scale": scaler.scale_ is not None,
+            }
+
+        meta = {
+            "kind": "preprocessed",
+            "path": os.path.abspath(filename),
+            "version": CACHE_VERSION,
+            "num_rows": [len(y) for y in y_sets],
+            "x_columns": x_cols,
+            "y_columns": y_columns,
+            "id_columns": id_columns,
+            "scaler": scaler_meta,
+        }
+        return meta
+
+    return _write_entry(key, _write)
+
+
+def load_preprocessed_from_cache(key):
+    """Load the sets previously saved with `save_preprocessed_to_cache`.
+
+    Parameters
+    ----------
+    key : str
+        The key returned by `get_preprocessed_cache_key`.
+
+    Returns
+    -------
+    ml_data : dict or None
+        Dictionary of the feature matrix "x" and the names of its columns
+        "x_columns", the y and id DataFrames of each set, laid out as
+        `config.ml_data`, and the fitted "scaler" if the data was scaled. `None`
+        if no valid cache entry exists.
+
+    """
+    meta = _read_meta(key, "preprocessed")
+
+    if meta is None:
+        return None
+
+    path = _get_cache_path(key)
+    total = sum(meta["num_rows"])
+
+    try:
+        matrix = np.load(f"{path}/x.npy", allow_pickle=False)
+        index = np.load(f"{path}/index.npy", allow_pickle=False)
+
+        y = _load_columns(path, meta["y_columns"], total, prefix="y_", mmap_mode=None)
+        ids = _load_columns(
+            path, meta["id_columns"], total, prefix="id_", mmap_mode=None
+        )
+
+        if (
+            (y is None)
+            or (ids is None)
+            or (matrix.shape != (total, len(meta["x_columns"])))
+            or (len(index) != total)
+        ):
+            return None
+
+        scaler = None
+        if meta["scaler"] is not None:
+            scaler = RobustScaler(**meta["scaler"]["params"])
+            scaler.center_ = None
+            scaler.scale_ = None
+            if meta["scaler"]["has_center"]:
+                scaler.center_ = np.load(f"{path}/scaler_center.npy")
+            if meta["scaler"]["has_scale"]:
+                scaler.scale_ = np.load(f"{path}/scaler_scale.npy")
+            scaler.n_features_in_ = len(meta["x_columns"])
+
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Unable to read preprocessing cache: {e}")
+        return None
+
+    ml_data = {"x": matrix, "x_columns": meta["x_columns"]}
+    start = 0
+    for name, num_rows in zip(PREPROCESSED_SETS, meta["num_rows"]):
+        stop = start + num_rows
+        rows = pd.Index(index[start:stop])
+
+        ml_data[f"y_{name}"] = y.iloc[start:stop].set_index(rows)
+        ml_data[f"id_{name}"] = ids.iloc[start:stop].set_index(rows)
+
+        start = stop
+
+    if meta["scaler"] is not None:
+        ml_data["scaler"] = scaler
+
+    return ml_data
@@ -0,0 +1,368 @@
+from collections import OrderedDict
+from functools import lru_cache
+
+import astronomicAL.config as config
+import ast
+import numpy as np
+import pandas as pd
+import re
+import weakref
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# The functions available inside expressions. Each is supported by both
+# numexpr and NumPy, so an expression gives the same result either way.
+_FUNCTIONS = {
+    "abs": np.abs,
+    "arccos": np.arccos,
+    "arcsin": np.arcsin,
+    "arctan": np.arctan,
+    "arctan2": np.arctan2,
+    "cos": np.cos,
+    "cosh": np.cosh,
+    "exp": np.exp,
+    "expm1": np.expm1,
+    "log": np.log,
+    "log10": np.log10,
+    "log1p": np.log1p,
+    "sin": np.sin,
+    "sinh": np.sinh,
+    "sqrt": np.sqrt,
+    "tan": np.tan,
+    "tanh": np.tanh,
+    "where": np.where,
+}
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Compare,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Num,
+    ast.operator,
+    ast.unaryop,
+    ast.cmpop,
+)
+
+if hasattr(ast, "Constant"):
+    _ALLOWED_NODES = _ALLOWED_NODES + (ast.Constant,)
+
+_QUOTED_COLUMN = re.compile(r"`([^`]+)`")
+
+# The evaluated columns of the DataFrame they were last requested from, in
+# least recently used order.
+_cached_columns = OrderedDict()
+_cache_state = {"frame": None, "num_rows": 0, "nbytes": 0}
+
+
+def get_derived_features():
+    """Get the derived features defined in the current configuration.
+
+    Derived features are set in `config.settings["derived_features"]` as a
+    dictionary mapping each feature name to an expression of the columns of
+    the dataset, for example
+    `{"Log10(W3_Flux/W2_Flux)": "log10(W3_Flux / W2_Flux)"}`.
+
+    Returns
+    -------
+    derived_features : dict
+        Dictionary of the expression of each derived feature, keyed by name.
+
+    """
+    if "derived_features" not in config.settings.keys():
+        return {}
+
+    return config.settings["derived_features"]
+
+
+@lru_cache(maxsize=None)
+def parse_expression(expression):
+    """Validate a derived feature expression and find the columns it uses.
+
+    Expressions may use the arithmetic, comparison and bitwise operators,
+    numeric constants, the functions in `_FUNCTIONS` and any column or
+    derived feature by name. Names which are not valid Python identifiers,
+    such as `g-r`, are quoted with backticks.
+
+    Parameters
+    ----------
+    expression : str
+        The expression defining the derived feature.
+
+    Returns
+    -------
+    source : str
+        The expression with every column replaced by a variable name.
+    variables : dict
+        Dictionary of the column used for each variable in `source`.
+
+    Raises
+    ------
+    ValueError
+        If the expression is not valid or uses something other than the
+        operations listed above.
+
+    """
+    variables = {}
+
+    def _quote(match):
+        name = f"__col_{len(variables)}"
+        variables[name] = match.group(1)
+        return name
+
+    source = _QUOTED_COLUMN.sub(_quote, expression.strip())
+
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Unable to parse derived feature `{expression}`.")
+
+    functions = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(
+                f"`{type(node).__name__}` is not allowed in derived feature `{expression}`."
+            )
+        if isinstance(node, ast.Call):
+            if not (isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS):
+                raise ValueError(
+                    f"Derived feature `{expression}` calls an unsupported function, "
+                    f"the available functions are: {list(_FUNCTIONS.keys())}."
+                )
+            if len(node.keywords) > 0:
+                raise ValueError(
+                    f"Keyword arguments are not allowed in derived feature `{expression}`."
+                )
+            functions.add(node.func)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node not in functions:
+            if node.id not in variables:
+                variables[node.id] = node.id
+
+    return source, variables
+
+
+def get_expression_columns(expression):
+    """Get the names of the columns used by an expression.
+
+    Parameters
+    ----------
+    expression : str
+        The expression defining the derived feature.
+
+    Returns
+    -------
+    columns : list of str
+        The columns and derived features used by `expression`.
+
+    """
+    _, variables = parse_expression(expression)
+
+    return list(dict.fromkeys(variables.values()))
+
+
+def list_columns(df):
+    """List the columns of `df` along with every derived feature.
+
+    Derived features are only listed, nothing is calculated.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame containing the entire dataset.
+
+    Returns
+    -------
+    columns : list of str
+        The columns of `df`, followed by any derived features which are not
+        already columns of `df`.
+
+    """
+    cols = list(df.columns)
+
+    existing = set(cols)
+    for name in get_derived_features():
+        if name not in existing:
+            cols.append(name)
+
+    return cols
+
+
+def evaluate_expression(df, expression):
+    """Evaluate an expression over every row of `df`.
+
+    The expression is evaluated with `numexpr` when it is installed, and with
+    NumPy otherwise.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame containing the columns used by `expression`.
+    expression : str
+        The expression defining the derived feature.
+
+    Returns
+    -------
+    values : Numpy Array
+        The value of the expression for each row of `df`.
+
+    Raises
+    ------
+    ValueError
+        If the expression is not valid or uses a column which is neither in
+        `df` nor a derived feature.
+
+    """
+    return _evaluate(df, expression, False, ())
+
+
+def _evaluate(df, expression, cache, resolving):
+
+    source, variables = parse_expression(expression)
+
+    inputs = {}
+    for variable, col in variables.items():
+        inputs[variable] = _get_values(df, col, cache, resolving)
+
+    with np.errstate(all="ignore"):
+        if numexpr is not None:
+            values = numexpr.evaluate(source, local_dict=inputs, global_dict={})
+        else:
+            namespace = dict(_FUNCTIONS)
+            namespace.update(inputs)
+            values = eval(source, {"__builtins__": {}}, namespace)
+
+    values = np.asarray(values)
+
+    if values.shape != (len(df),):
+        values = np.broadcast_to(values, (len(df),)).copy()
+
+    return values
+
+
+def _get_values(df, name, cache, resolving=()):
+
+    if name in df.columns:
+        return df[name].to_numpy()
+
+    derived = get_derived_features()
+
+    if name not in derived:
+        raise ValueError(f"`{name}` is neither a column nor a derived feature.")
+
+    if name in resolving:
+        raise ValueError(f"Derived feature `{name}` is defined in terms of itself.")
+
+    expression = derived[name]
+    key = (name, expression)
+
+    if cache:
+        frame = _cache_state["frame"]
+        if (frame is None) or (frame() is not df) or (
+            _cache_state["num_rows"] != len(df)
+        ):
+            clear_cache()
+            _cache_state["frame"] = weakref.ref(df)
+            _cache_state["num_rows"] = len(df)
+
+        if key in _cached_columns:
+            _cached_columns.move_to_end(key)
+            return _cached_columns[key]
+
+    values = _evaluate(df, expression, cache, resolving + (name,))
+
+    if cache:
+        _add_to_cache(key, values)
+
+    return values
+
+
+def _add_to_cache(key, values):
+
+    if values.nbytes > config.derived_cache_size:
+        return
+
+    _cached_columns[key] = values
+    _cache_state["nbytes"] += values.nbytes
+
+    while _cache_state["nbytes"] > config.derived_cache_size:
+        _, evicted = _cached_columns.popitem(last=False)
+        _cache_state["nbytes"] -= evicted.nbytes
+
+
+def get_column(df, name, cache=True):
+    """Get a column of `df`, calculating it first if it is a derived feature.
+
+    Derived features are calculated the first time they are requested and
+    kept until the memory used by all the calculated features exceeds
+    `config.derived_cache_size` bytes, at which point the least recently used
+    are removed. Only the features of the last DataFrame requested are kept.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame containing the entire dataset.
+    name : str
+        The name of the column or derived feature.
+    cache : bool, default = True
+        Whether to keep the calculated feature. Set to `False` for small
+        DataFrames, such as a single selected source, to avoid replacing the
+        features calculated for the whole dataset.
+
+    Returns
+    -------
+    column : Series
+        The values of `name` for each row of `df`.
+
+    """
+    if name in df.columns:
+        return df[name]
+
+    values = _get_values(df, name, cache)
+
+    return pd.Series(values, index=df.index, name=name, copy=False)
+
+
+def get_columns(df, names, cache=True):
+    """Get a DataFrame of the chosen columns and derived features of `df`.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame containing the entire dataset.
+    names : list of str
+        The names of the columns and derived features to include. Repeated
+        names are only included once.
+    cache : bool, default = True
+        Whether to keep any calculated features, see `get_column`.
+
+    Returns
+    -------
+    columns : DataFrame
+        DataFrame with the same index as `df`, containing `names`.
+
+    """
+    names = list(dict.fromkeys(names))
+
+    return pd.DataFrame({name: get_column(df, name, cache) for name in names})
+
+
+def clear_cache():
+    """Remove every calculated derived feature.
+
+    Returns
+    -------
+    None
+
+    """
+    _cached_columns.clear()
+    _cache_state["frame"] = None
+    _cache_state["num_rows"] = 0
+    _cache_state["nbytes"] = 0
@@ -0,0 +1,181 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import os
+
+# Number of rows passed to a model at a time, which bounds the temporary
+# memory used by predictions on large datasets.
+DEFAULT_CHUNK_SIZE = 50000
+
+# Number of chunks predicted at the same time. Most sklearn estimators release
+# the GIL while predicting, so threads are used and the data is never copied.
+DEFAULT_N_JOBS = os.cpu_count() or 1
+
+
+def get_chunk_n_jobs(model):
+    """Choose how many blocks of rows `model` should predict at the same time.
+
+    Only one layer of threads is used at a time. A committee already predicts
+    with all of its members at the same time, and an estimator with its own
+    `n_jobs` spreads each prediction over its own threads, so their blocks
+    are predicted one after another.
+
+    Parameters
+    ----------
+    model : sklearn estimator, ModAL ActiveLearner or Committee
+        The fitted model.
+
+    Returns
+    -------
+    n_jobs : int
+        1 if `model` makes its predictions in parallel itself, otherwise
+        `DEFAULT_N_JOBS`.
+
+    """
+    if hasattr(model, "learner_list"):
+        return 1
+
+    estimator = getattr(model, "estimator", model)
+
+    if getattr(estimator, "n_jobs", None) not in [None, 1]:
+        return 1
+
+    return DEFAULT_N_JOBS
+
+
+def _get_rows(X, start, stop):
+
+    if hasattr(X, "iloc"):
+        return X.iloc[start:stop]
+
+    return X[start:stop]
+
+
+def apply_chunked(func, X, out=None, chunk_size=None, n_jobs=None):
+    """Apply a row-wise function to `X` in fixed size blocks of rows.
+
+    The first block is used to find the shape and dtype of the output, which
+    is then allocated once and filled in place as each block finishes, so
+    only `n_jobs` blocks of temporary results exist at any time.
+
+    Parameters
+    ----------
+    func : callable
+        Function taking a block of rows of `X` and returning an array with one
+        entry, or row, per row of the block. For example a model's `predict`
+        or `predict_proba`.
+    X : Numpy Array or DataFrame
+        The data to apply `func` to.
+    out : Numpy Array, default = None
+        Array to write the results into. If `None`, a new array is allocated.
+    chunk_size : int, default = None
+        The number of rows in each block. If `None`, `DEFAULT_CHUNK_SIZE` is
+        used.
+    n_jobs : int, default = None
+        The number of blocks processed at the same time. If `None`,
+        `DEFAULT_N_JOBS` is used.
+
+    Returns
+    -------
+    out : Numpy Array
+        The results of `func` for every row of `X`.
+
+    """
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    if n_jobs is None:
+        n_jobs = DEFAULT_N_JOBS
+
+    num_rows = X.shape[0]
+
+    if num_rows <= chunk_size and out is None:
+        return np.asarray(func(X))
+
+    first = np.asarray(func(_get_rows(X, 0, min(chunk_size, num_rows))))
+
+    if out is None:
+        out = np.empty((num_rows,) + first.shape[1:], dtype=first.dtype)
+
+    out[: len(first)] = first
+
+    def _fill(start):
+        stop = min(start + chunk_size, num_rows)
+        out[start:stop] = func(_get_rows(X, start, stop))
+
+    starts = range(chunk_size, num_rows, chunk_size)
+
+    if n_jobs == 1 or len(starts) <= 1:
+        for start in starts:
+            _fill(start)
+    else:
+        with ThreadPoolExecutor(max_workers=min(n_jobs, len(starts))) as executor:
+            # Consume the results so that any exception is raised here.
+            list(executor.map(_fill, starts))
+
+    return out
+
+
+def predict_proba_chunked(model, X, out=None, chunk_size=None, n_jobs=None):
+    """Predict the class probabilities of `X` in fixed size blocks of rows.
+
+    Parameters
+    ----------
+    model : sklearn estimator, ModAL ActiveLearner or Committee
+        The fitted model.
+    X : Numpy Array or DataFrame
+        The data to predict.
+    out : Numpy Array, default = None
+        Array of shape (len(X), n_classes) to write the probabilities into. If
+        `None`, a new array is allocated.
+    chunk_size : int, default = None
+        The number of rows in each block. If `None`, `DEFAULT_CHUNK_SIZE` is
+        used.
+    n_jobs : int, default = None
+        The number of blocks predicted at the same time. If `None`,
+        `get_chunk_n_jobs(model)` is used.
+
+    Returns
+    -------
+    proba : Numpy Array
+        The predicted probability of each class for every row of `X`.
+
+    """
+    if n_jobs is None:
+        n_jobs = get_chunk_n_jobs(model)
+
+    return apply_chunked(
+        model.predict_proba, X, out=out, chunk_size=chunk_size, n_jobs=n_jobs
+    )
+
+
+def predict_chunked(model, X, out=None, chunk_size=None, n_jobs=None):
+    """Predict the class of `X` in fixed size blocks of rows.
+
+    Parameters
+    ----------
+    model : sklearn estimator, ModAL ActiveLearner or Committee
+        The fitted model.
+    X : Numpy Array or DataFrame
+        The data to predict.
+    out : Numpy Array, default = None
+        Array of shape (len(X),) to write the predictions into. If `None`, a
+        new array is allocated.
+    chunk_size : int, default = None
+        The number of rows in each block. If `None`, `DEFAULT_CHUNK_SIZE` is
+        used.
+    n_jobs : int, default = None
+        The number of blocks predicted at the same time. If `None`,
+        `get_chunk_n_jobs(model)` is used.
+
+    Returns
+    -------
+    pred : Numpy Array
+        The predicted class of every row of `X`.
+
+    """
+    if n_jobs is None:
+        n_jobs = get_chunk_n_jobs(model)
+
+    return apply_chunked(
+        model.predict, X, out=out, chunk_size=chunk_size, n_jobs=n_jobs
+    )
@@ -5,7 +5,8 @@ from astronomicAL.extensions.feature_generation import get_oper_dict
 from astronomicAL.extensions.models import get_classifiers
 from astronomicAL.extensions.query_strategies import get_strategy_dict
 from astronomicAL.settings.data_selection import DataSelection
-from astropy.table import Table
+from astronomicAL.utils.derived_features import get_expression_columns
+from astronomicAL.utils.load_data import get_required_columns, get_table_schema
 import json
 import os
 
@@ -81,10 +82,7 @@ def verify_import_config(curr_config_file):
 
             return has_error, error_message
         try:
-            table = Table.read(
-                filename,
-                format=f"{ext}",
-            )
+            schema = get_table_schema(filename, ext=ext)
         except:
             has_error = True
             error_message += f"**Unable to import file due to the following errors:**\n\n\n\nExtension: {ext} is not a filetype that can be imported. **[See astropy documentation to see acceptable filetypes]**\n"
@@ -109,13 +107,30 @@ def verify_import_config(curr_config_file):
 
         missing_cols = []
         for col in columns_used:
-            if col not in table.colnames:
+            if col not in schema:
                 missing_cols.append(col)
 
         if len(missing_cols) > 0:
             has_error = True
             error_message += f"The dataset is missing these columns:\n\n{missing_cols}\n\n **[Rerun astronomicAL and assign the settings yourself or manually edit `{filename}`, replacing the missing columns]**\n\n\n"
             error_message += "\n\n-------------------------------\n\n"
+        if "derived_features" in list(curr_config_file.keys()):
+            derived = curr_config_file["derived_features"]
+            invalid_features = []
+            for name in derived:
+                try:
+                    cols = get_expression_columns(derived[name])
+                except ValueError:
+                    invalid_features.append(name)
+                    continue
+                for col in cols:
+                    if (col not in schema) and (col not in derived):
+                        invalid_features.append(name)
+                        break
+            if len(invalid_features) > 0:
+                has_error = True
+                error_message += f"These derived features are not valid expressions of the columns in the dataset:\n\n{invalid_features}\n\n **[Check the expressions in `derived_features` only use columns from `{filename}`, quoting any names which contain operators with backticks]**\n\n\n"
+                error_message += "\n\n-------------------------------\n\n"
         if "feature_generation" not in missing_settings:
             opers = list(get_oper_dict().keys())
             missing_opers = []
@@ -228,6 +243,7 @@ def create_layout_from_file(react):
             config.main_df = load_data.get_dataframe_from_fits_file(
                 curr_config_file["dataset_filepath"],
                 optimise_data=curr_config_file["optimise_data"],
+                columns=get_required_columns(curr_config_file),
             )
 
             src = {}
@@ -0,0 +1,415 @@
+from astronomicAL.extensions.extension_plots import get_plot_dict
+from astronomicAL.utils.derived_features import get_expression_columns
+from astronomicAL.utils.optimise import (
+    get_bounds,
+    get_categorical,
+    get_float_bound,
+    get_float_dtype_from_bound,
+    get_int_dtype_from_bounds,
+)
+from astropy.io import fits
+from astropy.table import Table
+
+import glob
+import json
+import numpy as np
+import pandas as pd
+
+# Number of rows read from the memory mapped FITS file at a time.
+CHUNK_SIZE = 250000
+
+
+def get_required_columns(settings):
+    """Find every column name that a configuration file could refer to.
+
+    Parameters
+    ----------
+    settings : dict
+        The contents of a configuration file.
+
+    Returns
+    -------
+    columns : set of str
+        Every string found within `settings`, along with the columns
+        required by the extension plots, derived features and SED band files,
+        and `RA` and `DEC`. Only those which match the name of a column will
+        be loaded.
+
+    """
+    columns = set(["RA", "DEC", "ra", "dec", "Ra", "Dec"])
+
+    def _add_strings(values):
+        if isinstance(values, str):
+            columns.add(values)
+        elif isinstance(values, dict):
+            for key in values:
+                _add_strings(key)
+                _add_strings(values[key])
+        elif isinstance(values, (list, tuple)):
+            for value in values:
+                _add_strings(value)
+
+    _add_strings(settings)
+
+    if "derived_features" in settings:
+        for expression in settings["derived_features"].values():
+            try:
+                _add_strings(get_expression_columns(expression))
+            except ValueError:
+                continue
+
+    plot_dict = get_plot_dict()
+    for plot in plot_dict:
+        _add_strings(plot_dict[plot].extra_features)
+
+    for sed_file in glob.glob("data/sed_data/*.json"):
+        try:
+            with open(sed_file, "r") as fp:
+                _add_strings(json.load(fp))
+        except (OSError, ValueError):
+            continue
+
+    return columns
+
+
+def decode_bytes(values, encoding="utf-8"):
+    """Decode an array of byte strings into Python strings in bulk.
+
+    Fixed width bytes arrays holding ASCII data, which all FITS string columns
+    should be, are decoded by a single NumPy cast to a unicode array, falling
+    back to `np.char.decode` for other data. Categorical arrays only have their
+    categories decoded.
+
+    Parameters
+    ----------
+    values : numpy.ndarray or pandas.Categorical
+        The values to decode, either a fixed width bytes array or an object
+        array of `bytes`.
+    encoding : str, default = "utf-8"
+        The encoding of the bytes.
+
+    Returns
+    -------
+    decoded : numpy.ndarray, pandas.Categorical or None
+        Object array (or Categorical) of `str`, or `None` if `values` does not
+        contain bytes.
+
+    """
+    if isinstance(values, pd.Categorical):
+        categories = decode_bytes(values.categories.to_numpy(), encoding=encoding)
+        if categories is None:
+            return None
+        return values.rename_categories(categories)
+
+    values = np.asarray(values)
+
+    if values.dtype.kind == "O":
+        if pd.api.types.infer_dtype(values, skipna=True) != "bytes":
+            return None
+
+        sample = values[:10000]
+        if len(pd.unique(sample)) < len(sample) / 2:
+            # Repetitive columns only need each unique value decoding once.
+            codes, uniques = pd.factorize(values)
+            decoded = np.empty(len(uniques) + 1, dtype=object)
+            decoded[:-1] = [x.decode(encoding) for x in uniques]
+            decoded[-1] = np.nan
+            return decoded.take(codes)
+
+        # Converting to a fixed width array first costs more than it saves.
+        return (
+            pd.Series(values)
+            .map(lambda x: x.decode(encoding) if isinstance(x, bytes) else x)
+            .to_numpy()
+        )
+
+    if values.dtype.kind != "S":
+        return None
+
+    if encoding.lower().replace("-", "") in ["utf8", "ascii"]:
+        try:
+            # NumPy casts bytes to unicode as ASCII, a subset of UTF-8.
+            return values.astype("U").astype(object)
+        except UnicodeDecodeError:
+            pass
+
+    return np.char.decode(values, encoding).astype(object)
+
+
+def _get_table_hdu(hdul):
+
+    for hdu in hdul:
+        if isinstance(hdu, fits.BinTableHDU):
+            return hdu
+
+    return None
+
+
+def _get_fits_schema(filename):
+
+    with fits.open(filename, memmap=True) as hdul:
+        for hdu in hdul:
+            if isinstance(hdu, (fits.BinTableHDU, fits.TableHDU)):
+                return {col.name: col.dtype for col in hdu.columns}
+
+    return None
+
+
+def _get_hdf5_schema(filename):
+
+    try:
+        import h5py
+    except ImportError:
+        return None
+
+    datasets = []
+
+    def _find_tables(name, obj):
+        if isinstance(obj, h5py.Dataset) and obj.dtype.names is not None:
+            datasets.append(obj.dtype)
+
+    with h5py.File(filename, "r") as fp:
+        fp.visititems(_find_tables)
+
+    if len(datasets) == 0:
+        return None
+
+    dtype = datasets[0]
+    return {name: dtype[name] for name in dtype.names}
+
+
+def _get_csv_schema(filename, num_rows=1000):
+
+    sample = pd.read_csv(filename, nrows=num_rows)
+    return {col: sample[col].dtype for col in sample.columns}
+
+
+def _get_parquet_schema(filename):
+
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+
+    schema = {}
+    for field in pq.read_schema(filename):
+        try:
+            schema[field.name] = np.dtype(field.type.to_pandas_dtype())
+        except (NotImplementedError, TypeError):
+            schema[field.name] = np.dtype(object)
+
+    return schema
+
+
+def get_table_schema(filename, ext=None):
+    """Get the column names and dtypes of a dataset without loading its data.
+
+    Only the headers of FITS, HDF5 and Parquet files are read. CSV dtypes are
+    inferred from the first rows of the file. Other formats, or when the
+    optional `h5py` or `pyarrow` packages are unavailable, fall back to
+    reading the whole file with `astropy.table.Table`.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the dataset.
+    ext : str, default = None
+        The astropy format of the file. If `None`, the file extension is used.
+
+    Returns
+    -------
+    schema : dict
+        Dictionary mapping each column name to its numpy dtype, in the order
+        the columns appear in the file.
+
+    """
+    if ext is None:
+        ext = filename[filename.rindex(".") + 1 :]
+
+    probes = {
+        "fits": _get_fits_schema,
+        "hdf5": _get_hdf5_schema,
+        "csv": _get_csv_schema,
+        "parquet": _get_parquet_schema,
+    }
+
+    schema = None
+    if ext in probes:
+        schema = probes[ext](filename)
+
+    if schema is None:
+        table = Table.read(filename, format=f"{ext}")
+        schema = {name: table[name].dtype for name in table.colnames}
+
+    return schema
+
+
+def _get_column_names(hdu, columns):
+
+    raw_dtype = hdu.data.dtype if hdu.data is not None else None
+
+    names = []
+    for col in hdu.columns:
+        if columns is not None and col.name not in columns:
+            continue
+        if raw_dtype is not None and raw_dtype[col.name].shape != ():
+            # Multidimensional columns cannot be stored in a DataFrame.
+            continue
+        names.append(col.name)
+
+    return names
+
+
+def _is_streamable(hdu, names):
+
+    for name in names:
+        col = hdu.columns[name]
+        if col.null is not None:
+            # Columns with null values are masked by astropy.
+            return False
+        if "P" in str(col.format) or "Q" in str(col.format):
+            # Variable length arrays are stored on the heap.
+            return False
+
+    return True
+
+
+def _get_column_chunk(chunk, raw_chunk, name):
+
+    if raw_chunk.dtype[name].kind == "S":
+        # `field` would decode and strip the strings, astropy keeps the bytes.
+        return raw_chunk[name]
+
+    return chunk.field(name)
+
+
+def _get_native_dtypes(data, raw, names):
+
+    chunk = data[0:0]
+    raw_chunk = raw[0:0]
+    dtypes = {}
+    for name in names:
+        dtype = _get_column_chunk(chunk, raw_chunk, name).dtype
+        dtypes[name] = dtype.newbyteorder("=")
+
+    return dtypes
+
+
+def _get_optimised_dtypes(data, raw, names, chunk_size):
+
+    num_rows = len(data)
+    bounds = {}
+    for start in range(0, num_rows, chunk_size):
+        stop = min(start + chunk_size, num_rows)
+        chunk = data[start:stop]
+        raw_chunk = raw[start:stop]
+        for name in names:
+            values = _get_column_chunk(chunk, raw_chunk, name)
+            if values.dtype.kind in "if":
+                bounds[name] = get_bounds(values, bounds.get(name))
+
+    dtypes = _get_native_dtypes(data, raw, names)
+    for name in names:
+        dtype = dtypes[name]
+        target = None
+        col_bounds = bounds.get(name)
+        if dtype.kind == "i":
+            col_min, col_max = col_bounds or (None, None)
+            target = get_int_dtype_from_bounds(col_min, col_max, dtype)
+        elif dtype.kind == "f":
+            bound = None
+            if col_bounds is not None:
+                bound = get_float_bound(None, bounds=col_bounds)
+            target = get_float_dtype_from_bound(bound, dtype)
+
+        if target is not None:
+            dtypes[name] = target
+
+    return dtypes
+
+
+def read_fits_file(
+    filename, columns=None, optimise_data=False, decode_strings=False, chunk_size=None
+):
+    """Load a FITS binary table into a DataFrame in fixed size chunks of rows.
+
+    The file is memory mapped and each chunk of rows is downcast and copied
+    directly into preallocated column arrays, so the only full size copy of the
+    data is the final DataFrame.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the FITS file.
+    columns : set of str, default = None
+        The columns to load. If `None`, every column is loaded.
+    optimise_data : bool, default = False
+        Flag for whether to downcast numerical columns to their smallest dtype
+        and convert repetitive string columns to categories.
+    decode_strings : bool, default = False
+        Flag for whether to decode string columns into `str` rather than
+        leaving them as `bytes`.
+    chunk_size : int, default = None
+        The number of rows to read at a time. If `None`, `CHUNK_SIZE` is used.
+
+    Returns
+    -------
+    df : DataFrame or None
+        The loaded data, or `None` if the file contains columns which must be
+        loaded through `astropy.table.Table`.
+
+    """
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+
+    with fits.open(filename, memmap=True) as hdul:
+        hdu = _get_table_hdu(hdul)
+
+        if hdu is None or hdu.data is None:
+            return None
+
+        names = _get_column_names(hdu, columns)
+
+        if not _is_streamable(hdu, names):
+            return None
+
+        data = hdu.data
+        raw = np.asarray(data)
+        num_rows = len(data)
+
+        if optimise_data:
+            dtypes = _get_optimised_dtypes(data, raw, names, chunk_size)
+        else:
+            dtypes = _get_native_dtypes(data, raw, names)
+
+        output = {}
+        for name in names:
+            output[name] = np.empty(num_rows, dtype=dtypes[name])
+
+        for start in range(0, num_rows, chunk_size):
+            stop = min(start + chunk_size, num_rows)
+            chunk = data[start:stop]
+            raw_chunk = raw[start:stop]
+            for name in names:
+                output[name][start:stop] = _get_column_chunk(chunk, raw_chunk, name)
+
+        del data, raw
+
+    for name in names:
+        values = output[name]
+        if values.dtype.kind == "S":
+            if optimise_data:
+                categorical = get_categorical(values)
+                if categorical is not None:
+                    values = categorical
+
+            if decode_strings:
+                output[name] = decode_bytes(values)
+            elif isinstance(values, np.ndarray):
+                output[name] = values.astype(object)
+            else:
+                output[name] = values
+
+    df = pd.DataFrame(output, columns=names)
+
+    return df
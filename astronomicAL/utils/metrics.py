@@ -0,0 +1,102 @@
+import numpy as np
+
+# The scores reported for each set of predictions, in the order they are shown
+# in the dashboard.
+SCORE_NAMES = ["acc", "prec", "rec", "f1"]
+
+
+def binary_confusion_matrix(y_true, y_pred):
+    """Count the predictions of a one-vs-rest classifier in a single pass.
+
+    Each pair of labels is mapped to one of four bins, `2 * y_true + y_pred`,
+    which are counted with `np.bincount`. This gives the same matrix as
+    `sklearn.metrics.confusion_matrix(y_true, y_pred, labels=[0, 1])` without
+    validating and encoding the labels each time.
+
+    Parameters
+    ----------
+    y_true : array-like of int
+        The true labels, each either 0 or 1.
+    y_pred : array-like of int
+        The predicted labels, each either 0 or 1.
+
+    Returns
+    -------
+    conf_mat : Numpy Array
+        Array of shape (2, 2) laid out as [[tn, fp], [fn, tp]].
+
+    """
+    y_true = np.asarray(y_true).ravel().astype(np.intp, copy=False)
+    y_pred = np.asarray(y_pred).ravel().astype(np.intp, copy=False)
+
+    if len(y_true) != len(y_pred):
+        raise ValueError(
+            f"y_true and y_pred have different lengths: {len(y_true)} and {len(y_pred)}"
+        )
+
+    counts = np.bincount(2 * y_true + y_pred, minlength=4)
+
+    if len(counts) > 4:
+        raise ValueError("Labels must be either 0 or 1.")
+
+    return counts.reshape((2, 2))
+
+
+def scores_from_confusion_matrix(conf_mat):
+    """Calculate the accuracy, precision, recall and F1 score of a confusion matrix.
+
+    Undefined scores are set to 0, matching sklearn's default
+    `zero_division` behaviour but without the warning. The accuracy of an
+    empty set of predictions is `nan`.
+
+    Parameters
+    ----------
+    conf_mat : Numpy Array
+        Array of shape (2, 2) laid out as [[tn, fp], [fn, tp]].
+
+    Returns
+    -------
+    scores : dict
+        Dictionary of the scores, keyed by `SCORE_NAMES`.
+
+    """
+    (tn, fp), (fn, tp) = np.asarray(conf_mat).tolist()
+
+    total = tn + fp + fn + tp
+
+    acc = (tp + tn) / total if total > 0 else np.nan
+    prec = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+    rec = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+    f1 = 2 * tp / (2 * tp + fp + fn) if (tp + fp + fn) > 0 else 0.0
+
+    scores = {
+        "acc": acc,
+        "prec": prec,
+        "rec": rec,
+        "f1": f1,
+    }
+    return scores
+
+
+def binary_classification_metrics(y_true, y_pred):
+    """Score a one-vs-rest classifier from a single confusion matrix.
+
+    Parameters
+    ----------
+    y_true : array-like of int
+        The true labels, each either 0 or 1.
+    y_pred : array-like of int
+        The predicted labels, each either 0 or 1.
+
+    Returns
+    -------
+    scores : dict
+        Dictionary of the accuracy, precision, recall and F1 score, keyed by
+        `SCORE_NAMES`.
+    conf_mat : Numpy Array
+        Array of shape (2, 2) laid out as [[tn, fp], [fn, tp]].
+
+    """
+    conf_mat = binary_confusion_matrix(y_true, y_pred)
+
+    return scores_from_confusion_matrix(conf_mat), conf_mat
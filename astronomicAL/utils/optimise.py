@@ -1,29 +1,416 @@
+import numpy as np
 import pandas as pd
 
-# Following optimisation functions credited to:
+# The downcasting rules follow those of `pd.to_numeric` as used in:
 # https://medium.com/bigdatarepublic/advanced-pandas-optimize-speed-and-memory-a654b53be6c2
+# however each target dtype is chosen from a single min/max pass over the raw
+# values rather than by repeatedly casting and comparing every element.
 
+_INT_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+_CATEGORY_RATIO = 0.5
+
+# Number of values `get_bounds` reduces at a time. Each block stays in the CPU
+# cache between finding its minimum and its maximum, so a column is only read
+# from memory once.
+_BOUNDS_BLOCK_SIZE = 65536
+
+
+def get_bounds(values, bounds=None):
+    """Find the minimum and maximum of `values` in a single pass over memory.
+
+    NaN values are ignored.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Integer or float array to inspect.
+    bounds : tuple or None, default = None
+        The `(min, max)` of values already inspected, such as the previous
+        chunks of the same column, to include in the result.
+
+    Returns
+    -------
+    bounds : tuple or None
+        The `(min, max)` of `values` and `bounds`, which are NaN if every value
+        is NaN, or `bounds` if `values` is empty.
+
+    """
+    values = values.ravel()
+
+    for start in range(0, values.size, _BOUNDS_BLOCK_SIZE):
+        block = values[start : start + _BOUNDS_BLOCK_SIZE]
+        block_min = np.fmin.reduce(block)
+        block_max = np.fmax.reduce(block)
+
+        if bounds is not None:
+            # fmin and fmax ignore the NaN bounds of all-NaN blocks.
+            block_min = np.fmin(block_min, bounds[0])
+            block_max = np.fmax(block_max, bounds[1])
+
+        bounds = (block_min, block_max)
+
+    return bounds
+
+
+def get_int_dtype(values):
+    """Find the smallest signed integer dtype able to hold `values`.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Integer array to inspect.
+
+    Returns
+    -------
+    dtype : numpy.dtype or None
+        The smallest suitable dtype, or `None` if it would not be smaller than
+        the current dtype of `values`.
+
+    """
+    col_min, col_max = get_bounds(values) or (None, None)
+
+    return get_int_dtype_from_bounds(col_min, col_max, values.dtype)
+
+
+def get_int_dtype_from_bounds(col_min, col_max, dtype):
+    """Find the smallest signed integer dtype able to hold `[col_min, col_max]`.
+
+    Parameters
+    ----------
+    col_min : int or None
+        Minimum value of the column, or `None` if the column is empty.
+    col_max : int or None
+        Maximum value of the column, or `None` if the column is empty.
+    dtype : numpy.dtype
+        The current dtype of the column.
+
+    Returns
+    -------
+    dtype : numpy.dtype or None
+        The smallest suitable dtype, or `None` if it would not be smaller than
+        `dtype`.
+
+    """
+    if col_min is None:
+        target = np.dtype(np.int8)
+    else:
+        target = None
+        for int_type in _INT_TYPES:
+            info = np.iinfo(int_type)
+            if info.min <= col_min and col_max <= info.max:
+                target = np.dtype(int_type)
+                break
+
+    if target is None or target.itemsize >= np.dtype(dtype).itemsize:
+        return None
+
+    return target
+
+
+def get_float_bound(values, bounds=None):
+    """Find the largest absolute value in the float array `values`.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Float array to inspect.
+    bounds : tuple or None, default = None
+        The `(min, max)` of `values`, if it has already been found by
+        `get_bounds`, in which case `values` is not read again.
+
+    Returns
+    -------
+    bound : float or None
+        The largest absolute non-NaN value, NaN if every value is NaN or `None`
+        if `values` is empty.
+
+    """
+    if bounds is None:
+        bounds = get_bounds(values)
+
+    if bounds is None:
+        return None
+
+    # All-NaN columns are valid and simply produce a NaN bound.
+    return max(abs(bounds[0]), abs(bounds[1]))
+
+
+def get_float_dtype(values):
+    """Check whether the float array `values` can be stored as float32.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Float array to inspect.
+
+    Returns
+    -------
+    dtype : numpy.dtype or None
+        `float32` if every finite value is within its range, otherwise `None`.
+
+    """
+    if values.dtype.itemsize <= 4:
+        return None
+
+    return get_float_dtype_from_bound(get_float_bound(values), values.dtype)
+
+
+def get_float_dtype_from_bound(bound, dtype):
+    """Check whether floats with a maximum magnitude of `bound` fit in float32.
+
+    Parameters
+    ----------
+    bound : float or None
+        The value returned by `get_float_bound`.
+    dtype : numpy.dtype
+        The current dtype of the column.
+
+    Returns
+    -------
+    dtype : numpy.dtype or None
+        `float32` if it is smaller than `dtype` and can hold `bound`,
+        otherwise `None`.
+
+    """
+    if np.dtype(dtype).itemsize <= 4:
+        return None
+
+    if bound is not None and np.isfinite(bound):
+        if bound > np.finfo(np.float32).max:
+            return None
+
+    return np.dtype(np.float32)
+
+
+def get_categorical(values):
+    """Convert `values` to a Categorical if it has few enough unique values.
+
+    Parameters
+    ----------
+    values : array-like
+        String or object values to inspect.
+
+    Returns
+    -------
+    categorical : pandas.Categorical or None
+        The categorical version of `values` if less than half of the values
+        are unique, otherwise `None`.
+
+    """
+    if len(values) == 0:
+        return None
+
+    try:
+        codes, categories = pd.factorize(values, sort=True)
+    except TypeError:
+        codes, categories = pd.factorize(values)
+
+    if float(len(categories)) / len(values) >= _CATEGORY_RATIO:
+        return None
+
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def optimise_array(values, floats=True, ints=True, objects=True):
+    """Downcast a single column of values to its smallest suitable dtype.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        The column to optimise.
+    floats : bool, default = True
+        Whether to downcast float columns.
+    ints : bool, default = True
+        Whether to downcast integer columns.
+    objects : bool, default = True
+        Whether to convert string and object columns to categories.
+
+    Returns
+    -------
+    optimised : numpy.ndarray, pandas.Categorical or None
+        The optimised column, or `None` if it is already optimal.
+
+    """
+    kind = values.dtype.kind
+
+    if kind == "f" and floats:
+        dtype = get_float_dtype(values)
+    elif kind == "i" and ints:
+        dtype = get_int_dtype(values)
+    elif kind in "OSU" and objects:
+        return get_categorical(values)
+    else:
+        dtype = None
+
+    if dtype is None:
+        return None
+
+    return values.astype(dtype)
+
+
+def _optimise_columns(df, floats=True, ints=True, objects=True, verbose=True):
+
+    before = df.memory_usage(index=False).sum()
+
+    for col in df.columns:
+        if not isinstance(df[col].dtype, np.dtype):
+            continue
+        values = df[col].to_numpy()
+        optimised = optimise_array(values, floats=floats, ints=ints, objects=objects)
+        if optimised is not None:
+            df[col] = optimised
+
+    after = df.memory_usage(index=False).sum()
+
+    if verbose:
+        report_bytes_saved(before, after)
 
-def optimise_floats(df):
-    floats = df.select_dtypes(include=["float64"]).columns.tolist()
-    df[floats] = df[floats].apply(pd.to_numeric, downcast="float")
     return df
 
 
+def report_bytes_saved(before, after):
+    """Print the memory saved by optimising a dataset.
+
+    Parameters
+    ----------
+    before : int
+        Number of bytes used before optimisation.
+    after : int
+        Number of bytes used after optimisation.
+
+    Returns
+    -------
+    None
+
+    """
+    saved = before - after
+    percent = 100 * saved / before if before else 0
+    print(
+        f"Memory optimisation saved {saved / 1024 ** 2:.2f} MB "
+        f"({before} -> {after} bytes, {percent:.1f}%)"
+    )
+
+
+def optimise_floats(df):
+    """Downcast the float columns of `df` to float32 in place.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame to optimise.
+
+    Returns
+    -------
+    df : DataFrame
+        The optimised DataFrame.
+
+    """
+    return _optimise_columns(df, ints=False, objects=False, verbose=False)
+
+
 def optimise_ints(df):
-    ints = df.select_dtypes(include=["int64"]).columns.tolist()
-    df[ints] = df[ints].apply(pd.to_numeric, downcast="integer")
-    return df
+    """Downcast the integer columns of `df` to their smallest dtype in place.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame to optimise.
+
+    Returns
+    -------
+    df : DataFrame
+        The optimised DataFrame.
+
+    """
+    return _optimise_columns(df, floats=False, objects=False, verbose=False)
 
 
 def optimise_objects(df):
-    for col in df.select_dtypes(include=["object"]):
-        num_unique_values = len(df[col].unique())
-        num_total_values = len(df[col])
-        if float(num_unique_values) / num_total_values < 0.5:
-            df[col] = df[col].astype("category")
-    return df
+    """Convert object columns of `df` with few unique values to categories.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame to optimise.
+
+    Returns
+    -------
+    df : DataFrame
+        The optimised DataFrame.
+
+    """
+    return _optimise_columns(df, floats=False, ints=False, verbose=False)
 
 
 def optimise(df):
-    return optimise_floats(optimise_ints(optimise_objects(df)))
+    """Reduce the memory usage of every column of `df` in place.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The DataFrame to optimise.
+
+    Returns
+    -------
+    df : DataFrame
+        The optimised DataFrame.
+
+    """
+    return _optimise_columns(df)
+
+
+def optimise_table(table, names=None):
+    """Create a memory optimised DataFrame directly from an astropy Table.
+
+    The target dtype of each column is decided from the raw NumPy column and
+    the DataFrame is only constructed once, from the already downcast columns.
+
+    Parameters
+    ----------
+    table : astropy.table.Table
+        The table to convert.
+    names : list of str, default = None
+        The columns to convert. If `None`, all columns are converted.
+
+    Returns
+    -------
+    df : DataFrame
+        The optimised DataFrame.
+
+    """
+    if names is None:
+        names = table.colnames
+
+    data = {}
+    before = 0
+    for name in names:
+        col = table[name]
+        mask = getattr(col, "mask", None)
+        if mask is not None and np.any(mask):
+            # Let astropy decide how masked values are represented.
+            series = table[[name]].to_pandas()[name]
+            if not isinstance(series.dtype, np.dtype):
+                before += series.memory_usage(index=False)
+                data[name] = series
+                continue
+            values = series.to_numpy()
+        else:
+            values = np.asarray(col)
+
+        before += values.nbytes
+        optimised = optimise_array(values)
+
+        if optimised is None:
+            if values.dtype.kind in "SU":
+                optimised = values.astype(object)
+            else:
+                optimised = values.astype(values.dtype.newbyteorder("="), copy=False)
+
+        data[name] = optimised
+
+    df = pd.DataFrame(data, columns=names)
+
+    report_bytes_saved(before, df.memory_usage(index=False).sum())
+
+    return df
@@ -106,6 +106,12 @@ def save_config_file(layout_from_js, trigger_text, autosave=False, test=False):
     export_config["feature_generation"] = config.settings["feature_generation"]
     export_config["test_set_file"] = config.settings["test_set_file"]
 
+    if "streaming_scaling" in config.settings.keys():
+        export_config["streaming_scaling"] = config.settings["streaming_scaling"]
+
+    if "derived_features" in config.settings.keys():
+        export_config["derived_features"] = config.settings["derived_features"]
+
     if "classifiers" not in config.settings.keys():
         config.settings["classifiers"] = {}
 
@@ -0,0 +1,155 @@
+import astronomicAL.config as config
+import numpy as np
+import pandas as pd
+import weakref
+
+# Only a handful of distinct DataFrames (the main dataset and its training
+# subsets) are ever looked up, so the cache is kept deliberately small.
+_MAX_CACHED_INDEXES = 4
+
+_index_cache = []
+
+
+def get_id_index(df=None, id_col=None):
+    """Get the hash index mapping each source id of `df` to its row position.
+
+    The index is built the first time it is requested for a DataFrame and
+    reused until a different DataFrame, or id column, is used.
+
+    Parameters
+    ----------
+    df : DataFrame, default = None
+        The DataFrame containing the sources. If `None`, `config.main_df` is
+        used.
+    id_col : str, default = None
+        The column containing the source ids. If `None`,
+        `config.settings["id_col"]` is used.
+
+    Returns
+    -------
+    index : pandas.Index
+        Index of the ids in `df`, in row order.
+
+    """
+    if df is None:
+        df = config.main_df
+    if id_col is None:
+        id_col = config.settings["id_col"]
+
+    for df_ref, cached_col, num_rows, index in _index_cache:
+        if df_ref() is df and cached_col == id_col and num_rows == len(df):
+            return index
+
+    index = pd.Index(df[id_col].values)
+    # Accessing is_unique builds the underlying hash table.
+    index.is_unique
+
+    # Only weak references are kept so replaced datasets can be freed.
+    _index_cache[:] = [entry for entry in _index_cache if entry[0]() is not None]
+    _index_cache.insert(0, (weakref.ref(df), id_col, len(df), index))
+    del _index_cache[_MAX_CACHED_INDEXES:]
+
+    return index
+
+
+def clear_id_index():
+    """Remove every cached id index.
+
+    Returns
+    -------
+    None
+
+    """
+    del _index_cache[:]
+
+
+def get_row_position(source_id, df=None, id_col=None):
+    """Find the row position of a source using the shared id index.
+
+    Parameters
+    ----------
+    source_id : any
+        The id of the source.
+    df : DataFrame, default = None
+        The DataFrame containing the sources. If `None`, `config.main_df` is
+        used.
+    id_col : str, default = None
+        The column containing the source ids. If `None`,
+        `config.settings["id_col"]` is used.
+
+    Returns
+    -------
+    position : int or None
+        The position of the first row with id `source_id`, or `None` if no
+        source has that id.
+
+    """
+    index = get_id_index(df, id_col)
+
+    try:
+        position = index.get_loc(source_id)
+    except (KeyError, TypeError):
+        return None
+
+    if isinstance(position, slice):
+        position = position.start
+    elif not isinstance(position, (int, np.integer)):
+        # Non-unique indexes return a boolean mask.
+        position = int(position.argmax())
+
+    return int(position)
+
+
+def contains_source(source_id, df=None, id_col=None):
+    """Check whether a source id exists using the shared id index.
+
+    Parameters
+    ----------
+    source_id : any
+        The id of the source.
+    df : DataFrame, default = None
+        The DataFrame containing the sources. If `None`, `config.main_df` is
+        used.
+    id_col : str, default = None
+        The column containing the source ids. If `None`,
+        `config.settings["id_col"]` is used.
+
+    Returns
+    -------
+    contains : bool
+        Whether a source with id `source_id` is in `df`.
+
+    """
+    return get_row_position(source_id, df, id_col) is not None
+
+
+def get_source(source_id, df=None, id_col=None):
+    """Get the row of a source using the shared id index.
+
+    Parameters
+    ----------
+    source_id : any
+        The id of the source.
+    df : DataFrame, default = None
+        The DataFrame containing the sources. If `None`, `config.main_df` is
+        used.
+    id_col : str, default = None
+        The column containing the source ids. If `None`,
+        `config.settings["id_col"]` is used.
+
+    Returns
+    -------
+    source : DataFrame
+        Single row DataFrame of the source, which is empty if no source has
+        id `source_id`.
+
+    """
+    if df is None:
+        df = config.main_df
+
+    position = get_row_position(source_id, df, id_col)
+
+    if position is None:
+        return df.iloc[[]]
+
+    return df.iloc[[position]]
@@ -0,0 +1,81 @@
+"""Compare fitting and predicting a committee one member at a time and in parallel.
+
+Run from the root of the repository with ``python benchmarks/committee.py``.
+"""
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], "../"))
+
+from astronomicAL.active_learning.committee import ParallelCommittee, map_members
+from modAL.models import ActiveLearner, Committee
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.neighbors import KNeighborsClassifier
+import numpy as np
+import timeit
+
+
+def create_learners():
+
+    return [
+        ActiveLearner(
+            estimator=RandomForestClassifier(n_estimators=100, random_state=0)
+        ),
+        ActiveLearner(estimator=ExtraTreesClassifier(n_estimators=100, random_state=0)),
+        ActiveLearner(estimator=KNeighborsClassifier(5)),
+    ]
+
+
+def sequential(learners, X_train, y_train, X):
+
+    for learner in learners:
+        learner.fit(X_train, y_train)
+
+    return Committee(learner_list=learners).vote_proba(X)
+
+
+def parallel(learners, X_train, y_train, X):
+
+    map_members(lambda learner: learner.fit(X_train, y_train), learners)
+
+    return ParallelCommittee(learner_list=learners).vote_proba(X)
+
+
+def main(num_train=5000, num_rows=100000, num_features=10, repeat=3):
+
+    rng = np.random.RandomState(0)
+    X = rng.randn(num_rows, num_features).astype(np.float32)
+    X_train = X[:num_train]
+    y_train = (X_train[:, 0] + X_train[:, 1] > 0).astype(int)
+
+    assert np.array_equal(
+        sequential(create_learners(), X_train, y_train, X),
+        parallel(create_learners(), X_train, y_train, X),
+    )
+
+    print(f"{num_train} training rows, {num_rows} predicted, {os.cpu_count()} cpus")
+    for name, run in [("sequential", sequential), ("parallel", parallel)]:
+        seconds = min(
+            timeit.repeat(
+                lambda: run(create_learners(), X_train, y_train, X),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        print(f"  {name:10s} {seconds:.3f}s")
+
+    learners = create_learners()
+    _, fit_times = map_members(lambda learner: learner.fit(X_train, y_train), learners)
+
+    committee = ParallelCommittee(learner_list=learners)
+    committee.vote_proba(X)
+
+    for learner, fit_time, predict_time in zip(
+        learners, fit_times, committee.predict_times()
+    ):
+        name = type(learner.estimator).__name__
+        print(f"  {name:22s} fit {fit_time:.3f}s  predict {predict_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compare per-element and bulk decoding of FITS byte string columns.
+
+Run from the root of the repository with ``python benchmarks/decode_bytes.py``.
+"""
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], "../"))
+
+from astronomicAL.utils.load_data import decode_bytes
+import numpy as np
+import pandas as pd
+import timeit
+
+
+def main(num_rows=1000000, repeat=3):
+
+    ids = np.array([f"J{i:010d}+{i % 997:04d}" for i in range(num_rows)]).astype("S")
+    classes = np.array(["GALAXY", "QSO", "STAR"]).astype("S")[
+        np.arange(num_rows) % 3
+    ]
+
+    for name, values in [("unique ids", ids), ("3 classes", classes)]:
+        series = pd.Series(values.astype(object))
+        categorical = pd.Categorical(values)
+
+        assert list(series.apply(lambda x: x.decode("utf-8"))) == list(
+            decode_bytes(values)
+        )
+
+        print(f"{name} ({num_rows} rows):")
+        for label, fn in [
+            ("apply(x.decode)", lambda: series.apply(lambda x: x.decode("utf-8"))),
+            ("decode_bytes (bytes array)", lambda: decode_bytes(values)),
+            ("decode_bytes (object array)", lambda: decode_bytes(series.values)),
+            ("decode_bytes (categorical)", lambda: decode_bytes(categorical)),
+        ]:
+            if label.endswith("(categorical)") and len(categorical.categories) > (
+                num_rows / 2
+            ):
+                # Columns this unique are never converted to categories.
+                continue
+            best = min(timeit.repeat(fn, number=1, repeat=repeat))
+            print(f"    {label:<28} {best:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
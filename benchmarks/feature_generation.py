@@ -0,0 +1,85 @@
+"""Compare column-by-column and block feature combination for each operator.
+
+Run from the root of the repository with ``python benchmarks/feature_generation.py``.
+"""
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], "../"))
+
+from astronomicAL.extensions import feature_generation
+from itertools import combinations
+import astronomicAL.config as config
+import numpy as np
+import pandas as pd
+import timeit
+import warnings
+
+OPERATORS = {
+    "add (a+b)": ("+", lambda a, b: a + b),
+    "subtract (a-b)": ("-", lambda a, b: a - b),
+    "multiply (a*b)": ("*", lambda a, b: a * b),
+    "divide (a/b)": ("/", lambda a, b: a / b),
+}
+
+
+def loop_combination(df, n, symbol, op):
+    """The previous implementation, adding one pandas column at a time."""
+
+    bands = config.settings["features_for_training"]
+
+    generated_features = []
+    for comb in combinations(bands, n):
+        col = symbol.join(comb)
+        generated_features.append(col)
+        if col not in df.columns:
+            for i in range(n):
+                if i == 0:
+                    df[col] = df[comb[i]]
+                else:
+                    df[col] = op(df[col], df[comb[i]])
+
+    return df, generated_features
+
+
+def main(num_rows=200000, num_bands=10, arities=(2, 3), repeat=3):
+
+    rng = np.random.RandomState(0)
+    bands = [f"band_{i}" for i in range(num_bands)]
+    data = pd.DataFrame(rng.randn(num_rows, num_bands) + 20, columns=bands)
+
+    config.settings = {"features_for_training": bands}
+    oper_dict = feature_generation.get_oper_dict()
+
+    print(f"{num_rows} rows, {num_bands} bands:")
+    for name, (symbol, op) in OPERATORS.items():
+        for n in arities:
+            with warnings.catch_warnings():
+                # The column-by-column version fragments the DataFrame.
+                warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+
+                expected, features = loop_combination(data.copy(), n, symbol, op)
+                result, result_features = oper_dict[name](data.copy(), n)
+
+                assert result_features == features
+                assert np.array_equal(
+                    result[features].to_numpy(),
+                    expected[features].to_numpy().astype(np.float32),
+                    equal_nan=True,
+                )
+
+                timings = []
+                for fn in [
+                    lambda: loop_combination(data.copy(), n, symbol, op),
+                    lambda: oper_dict[name](data.copy(), n),
+                ]:
+                    timings.append(min(timeit.repeat(fn, number=1, repeat=repeat)))
+
+            print(
+                f"    {name:<15} n={n} ({len(features):>3} features)  "
+                f"columns: {timings[0]:.3f}s  block: {timings[1]:.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
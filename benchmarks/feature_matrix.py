@@ -0,0 +1,79 @@
+"""Compare per-column float32 DataFrames with views of a single feature matrix.
+
+Run from the root of the repository with ``python benchmarks/feature_matrix.py``.
+"""
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], "../"))
+
+from astronomicAL.active_learning.preprocessing import create_feature_matrix
+from astronomicAL.utils.inference import predict_chunked
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import RobustScaler
+import numpy as np
+import pandas as pd
+import timeit
+
+
+def column_frame(x, scaler):
+
+    # The previous layout: a float64 DataFrame downcast column by column.
+    scaled = pd.DataFrame(scaler.transform(x), columns=x.columns, index=x.index)
+    for col in scaled.columns:
+        scaled[col] = scaled[col].astype(np.float32)
+    return scaled
+
+
+def matrix_frame(x, scaler):
+
+    rows = np.arange(len(x))
+    matrix = create_feature_matrix(x, list(x.columns), [rows], scaler=scaler)
+    return pd.DataFrame(matrix, columns=x.columns, index=x.index, copy=False)
+
+
+def main(num_rows=500000, num_features=20, repeat=3):
+
+    rng = np.random.RandomState(0)
+    x = pd.DataFrame(
+        rng.randn(num_rows, num_features),
+        columns=[f"f{i}" for i in range(num_features)],
+    )
+    y = rng.randint(0, 2, num_rows)
+
+    scaler = RobustScaler().fit(x.to_numpy())
+
+    model = RandomForestClassifier(n_estimators=10, max_depth=8, random_state=0)
+    model.fit(x.to_numpy(dtype=np.float32)[:1000], y[:1000])
+
+    old = column_frame(x, scaler)
+    new = matrix_frame(x, scaler)
+
+    assert np.array_equal(old.to_numpy(), new.to_numpy())
+    assert new.to_numpy().flags["C_CONTIGUOUS"]
+
+    print(f"{num_rows} rows, {num_features} features")
+    for name, frame_fn in [("columns", column_frame), ("matrix", matrix_frame)]:
+        frame = frame_fn(x, scaler)
+
+        build = min(
+            timeit.repeat(lambda: frame_fn(x, scaler), number=1, repeat=repeat)
+        )
+        to_numpy = min(
+            timeit.repeat(lambda: frame.to_numpy(), number=1, repeat=repeat)
+        )
+        predict = min(
+            timeit.repeat(
+                lambda: predict_chunked(model, frame.to_numpy()),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        print(
+            f"  {name:8s} build {build:.3f}s  to_numpy {to_numpy:.4f}s  "
+            f"predict {predict:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare separate sklearn metric calls with a single confusion matrix pass.
+
+Run from the root of the repository with ``python benchmarks/metrics.py``.
+"""
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], "../"))
+
+from astronomicAL.utils.metrics import binary_classification_metrics
+from sklearn.metrics import (
+    accuracy_score,
+    confusion_matrix,
+    f1_score,
+    precision_score,
+    recall_score,
+)
+import numpy as np
+import pandas as pd
+import timeit
+
+
+def sklearn_metrics(y_true, y_pred):
+
+    scores = {
+        "acc": accuracy_score(y_true, y_pred),
+        "prec": precision_score(y_true, y_pred),
+        "rec": recall_score(y_true, y_pred),
+        "f1": f1_score(y_true, y_pred),
+    }
+    return scores, confusion_matrix(y_true, y_pred)
+
+
+def main(sizes=(1000, 100000, 1000000), repeat=5):
+
+    rng = np.random.RandomState(0)
+
+    for num_rows in sizes:
+        y_true = pd.DataFrame({"labels": rng.randint(0, 2, num_rows)})
+        y_pred = np.where(
+            rng.rand(num_rows) < 0.8, y_true["labels"], 1 - y_true["labels"]
+        ).reshape((-1, 1))
+
+        expected, expected_conf = sklearn_metrics(y_true, y_pred)
+        scores, conf = binary_classification_metrics(y_true, y_pred)
+
+        assert np.array_equal(conf, expected_conf)
+        assert all(np.isclose(scores[name], expected[name]) for name in expected)
+
+        print(f"{num_rows} rows (one set of predictions):")
+        for label, fn in [
+            ("sklearn (5 calls)", lambda: sklearn_metrics(y_true, y_pred)),
+            (
+                "binary_classification_metrics",
+                lambda: binary_classification_metrics(y_true, y_pred),
+            ),
+        ]:
+            best = min(timeit.repeat(fn, number=1, repeat=repeat))
+            print(f"    {label:<30} {best * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare fitting the scaler in memory with streaming quantiles.
+
+Run from the root of the repository with ``python benchmarks/scaler.py``.
+"""
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], "../"))
+
+from astronomicAL.active_learning import preprocessing
+import astronomicAL.config as config
+import numpy as np
+import pandas as pd
+import timeit
+import tracemalloc
+
+
+def fit(df, x_cols, rows, streaming):
+
+    config.settings = {"streaming_scaling": streaming}
+    return preprocessing.fit_scaler(df, x_cols, rows)
+
+
+def peak_memory(fn):
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(num_rows=4000000, num_features=5, repeat=3):
+
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame(
+        rng.lognormal(size=(num_rows, num_features)).astype(np.float32),
+        columns=[f"f{i}" for i in range(num_features)],
+    )
+    x_cols = list(df.columns)
+    rows = rng.permutation(num_rows)[: int(num_rows * 0.6)]
+
+    exact = fit(df, x_cols, rows, False)
+    streamed = fit(df, x_cols, rows, True)
+
+    assert np.allclose(exact.center_, streamed.center_, rtol=1e-15, atol=0)
+    assert np.allclose(exact.scale_, streamed.scale_, rtol=1e-15, atol=0)
+
+    print(f"{len(rows)} training rows, {num_features} features")
+    for name, streaming in [("in memory", False), ("streaming", True)]:
+        seconds = min(
+            timeit.repeat(
+                lambda: fit(df, x_cols, rows, streaming), number=1, repeat=repeat
+            )
+        )
+        peak = peak_memory(lambda: fit(df, x_cols, rows, streaming))
+        print(f"  {name:10s} {seconds:.3f}s  peak {peak / 1024 ** 2:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
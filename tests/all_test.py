@@ -1110,6 +1110,105 @@ class TestSettings:
         pd.testing.assert_frame_equal(df, new_df)
         assert not config.settings["optimise_data"]
 
+    def test_data_selection_get_dataframe_from_fits_loads_from_cache(self):
+
+        from astropy.table import Table
+        import shutil
+
+        t = Table(
+            [["x", "y"], [4, 5], [7.5, 8.5], ["a", "a"]], names=("a", "b", "c", "d")
+        )
+
+        check_folder_exists("data")
+        t.write("data/table1.fits", format="fits", overwrite=True)
+
+        config.cache_dir = "data/test_cache"
+
+        src = ColumnDataSource()
+        ds = DataSelection(src, "AL")
+
+        df = ds.get_dataframe_from_fits_file("data/table1.fits", optimise_data=True)
+
+        assert len(os.listdir(config.cache_dir)) == 1
+
+        cached_df = ds.get_dataframe_from_fits_file(
+            "data/table1.fits", optimise_data=True
+        )
+
+        pd.testing.assert_frame_equal(df, cached_df)
+
+        non_optimised_df = ds.get_dataframe_from_fits_file(
+            "data/table1.fits", optimise_data=False
+        )
+
+        assert non_optimised_df["b"].dtype == np.int64
+
+        t["b"] = [6, 7]
+        t.write("data/table1.fits", format="fits", overwrite=True)
+        os.utime("data/table1.fits", ns=(0, 0))
+
+        updated_df = ds.get_dataframe_from_fits_file(
+            "data/table1.fits", optimise_data=False
+        )
+
+        os.remove("data/table1.fits")
+        shutil.rmtree(config.cache_dir)
+        config.cache_dir = "data/cache"
+
+        assert list(updated_df["b"]) == [6, 7]
+        assert list(updated_df["a"]) == ["x", "y"]
+
+    def test_data_selection_get_dataframe_from_fits_selected_columns(self):
+
+        from astropy.table import Table
+
+        t = Table(
+            [[1, 2], [4, 5], [7, 8], [[0, 1], [2, 3]]], names=("a", "b", "c", "d")
+        )
+
+        check_folder_exists("data")
+        t.write("data/table1.fits", format="fits", overwrite=True)
+
+        src = ColumnDataSource()
+        ds = DataSelection(src, "AL")
+
+        df = ds.get_dataframe_from_fits_file(
+            "data/table1.fits", optimise_data=False, columns={"a", "c", "e"}
+        )
+
+        os.remove("data/table1.fits")
+
+        pd.testing.assert_frame_equal(
+            df, pd.DataFrame([[1, 7], [2, 8]], columns=["a", "c"])
+        )
+
+    def test_data_selection_read_fits_file_in_chunks(self):
+
+        from astropy.table import Table
+        from astronomicAL.utils.load_data import read_fits_file
+
+        t = Table(
+            [
+                np.array([str(i) for i in range(10)]),
+                np.arange(10) * 1000,
+                np.linspace(0, 1, 10),
+                np.array(["x", "y"] * 5),
+            ],
+            names=("a", "b", "c", "d"),
+        )
+
+        check_folder_exists("data")
+        t.write("data/table1.fits", format="fits", overwrite=True)
+
+        df = read_fits_file("data/table1.fits", optimise_data=True, chunk_size=3)
+        non_optimised_df = read_fits_file("data/table1.fits", chunk_size=3)
+        expected_df = Table.read("data/table1.fits").to_pandas()
+
+        os.remove("data/table1.fits")
+
+        pd.testing.assert_frame_equal(non_optimised_df, expected_df)
+        pd.testing.assert_frame_equal(df, optimise.optimise(expected_df))
+
     def test_data_selection_get_df_after_load_non_optimised(self):
 
         from astropy.table import Table
@@ -1189,7 +1288,7 @@ class TestDashboards:
 
         for i in range(100):
             if i % 2 == 0:
-                data.append([str(i), i % 3, i, i, i, "178.52904,2.1655949", ""])
+                data.append([str(i), i % 3, i, i, i, 178.52904, 2.1655949, ""])
             else:
                 data.append(
                     [
@@ -1198,12 +1297,15 @@ class TestDashboards:
                         i,
                         i,
                         i,
-                        "178.52904,2.1655949",
+                        178.52904,
+                        2.1655949,
                         "https://dr15.sdss.org/sas/dr15/sdss/spectro/redux/images/v5_10_0/8125-56955/spec-image-8125-56955-0534.png",
                     ]
                 )
 
-        df = pd.DataFrame(data, columns=list("ABCDE") + ["ra_dec", "png_path_DR16"])
+        df = pd.DataFrame(
+            data, columns=list("ABCDE") + ["RA", "DEC", "png_path_DR16"]
+        )
 
         return df
 
@@ -1612,6 +1714,21 @@ class TestDashboards:
 
         assert not has_column
 
+    def test_selected_source_get_selected_ra_dec(self):
+        data = self._create_test_df_with_image_data()
+        config.main_df = data
+        data_selected = data.iloc[3]
+        src = ColumnDataSource({str(c): [v] for c, v in data_selected.items()})
+        selected_source = SelectedSourceDashboard(src=src, close_button=None)
+
+        assert selected_source.has_ra_dec()
+        assert selected_source.get_selected_ra_dec() == ("178.52904", "2.1655949")
+
+        config.main_df = self._create_test_df()
+        selected_source = SelectedSourceDashboard(src=src, close_button=None)
+
+        assert not selected_source.has_ra_dec()
+
     def test_selected_source_search_deselect(self):
         data = self._create_test_df()
         config.main_df = data
@@ -1635,9 +1752,8 @@ class TestDashboards:
         selected_source = SelectedSourceDashboard(src=src, close_button=None)
         selected_source._update_default_images()
 
-        ra_dec = selected_source.src.data["ra_dec"][0]
-        ra = ra_dec[: ra_dec.index(",")]
-        dec = ra_dec[ra_dec.index(",") + 1 :]
+        ra = selected_source.src.data["RA"][0]
+        dec = selected_source.src.data["DEC"][0]
 
         url = "http://skyserver.sdss.org/dr16/SkyServerWS/ImgCutout/getjpeg?TaskName=Skyserver.Explore.Image&ra="
         _url_optical_image = (
@@ -2153,14 +2269,16 @@ class TestDashboards:
             "C",
             "D",
             "E",
-            "ra_dec",
+            "RA",
+            "DEC",
             "png_path_DR16",
         ]
         assert list(plot_db.param.Y_variable.objects) == [
             "C",
             "D",
             "E",
-            "ra_dec",
+            "RA",
+            "DEC",
             "png_path_DR16",
         ]
 
@@ -2627,6 +2745,69 @@ class TestExtensions:
             assert list(new_data[col].unique())[1] == 1.0
             assert len(list(new_data[col].unique())) == 2
 
+    def test_feature_extension_combinations_of_three(self):
+
+        config.settings = {"features_for_training": ["C", "D", "E", "F"]}
+
+        rng = np.random.RandomState(0)
+        data = pd.DataFrame(rng.randn(50, 4), columns=["C", "D", "E", "F"])
+        data.loc[0, "D"] = 0
+
+        for oper, symbol in [
+            (feature_generation.subtract, "-"),
+            (feature_generation.divide, "/"),
+        ]:
+            new_data, gen_features = oper(data.copy(), 3)
+
+            assert gen_features == [
+                f"C{symbol}D{symbol}E",
+                f"C{symbol}D{symbol}F",
+                f"C{symbol}E{symbol}F",
+                f"D{symbol}E{symbol}F",
+            ]
+            for feature in gen_features:
+                a, b, c = feature.split(symbol)
+                expected = pd.eval(f"(data.{a} {symbol} data.{b}) {symbol} data.{c}")
+
+                assert new_data[feature].dtype == np.float32
+                assert np.array_equal(
+                    new_data[feature], expected.astype(np.float32), equal_nan=True
+                )
+
+        data["E"] = 1e300
+        new_data, gen_features = feature_generation.multiply(data.copy(), 2)
+
+        assert new_data["C*E"].dtype == np.float64
+        assert np.allclose(new_data["C*E"], data["C"] * 1e300)
+        assert new_data["C*D"].dtype == np.float32
+
+    def test_feature_extension_overflow_is_found_next_to_infinities(self):
+
+        config.settings = {"features_for_training": ["a", "b", "c"]}
+
+        data = pd.DataFrame({"a": [1.0, 2.0], "b": [0.0, 1.0], "c": [1e-300, 1.0]})
+
+        new_data, gen_features = feature_generation.divide(data, 2)
+
+        assert new_data["a/b"].dtype == np.float32
+        assert list(new_data["a/b"]) == [np.inf, 2.0]
+        assert new_data["a/c"].dtype == np.float64
+        assert np.allclose(new_data["a/c"], [1e300, 2.0])
+        assert new_data["b/c"].dtype == np.float32
+
+    def test_feature_extension_only_adds_missing_features(self):
+
+        config.settings = {"features_for_training": ["C", "D", "E"]}
+
+        data = self._create_test_df()
+        data["C-D"] = -1
+
+        new_data, gen_features = feature_generation.subtract(data, 2)
+
+        assert gen_features == ["C-D", "C-E", "D-E"]
+        assert list(new_data["C-D"].unique()) == [-1]
+        assert list(new_data["D-E"].unique()) == [0]
+
 
 class TestUtils:
     def _create_test_df(self):
@@ -2736,3 +2917,1162 @@ class TestUtils:
             ), f"{k}: {created_file[k]} != {config.settings[k]}"
 
         os.remove("configs/config_export.json")
+
+    def test_optimise_table_matches_optimised_dataframe(self):
+
+        from astropy.table import Table
+
+        t = Table(
+            [
+                np.arange(10),
+                np.arange(10) * 1000,
+                np.linspace(0, 1, 10),
+                np.full(10, 1e300),
+                np.array(["x", "y"] * 5),
+                np.array([str(i) for i in range(10)]),
+            ],
+            names=("a", "b", "c", "d", "e", "f"),
+        )
+
+        df = optimise.optimise_table(t)
+
+        expected = optimise.optimise(t.to_pandas())
+
+        pd.testing.assert_frame_equal(df, expected)
+        assert df["a"].dtype == np.int8
+        assert df["b"].dtype == np.int16
+        assert df["c"].dtype == np.float32
+        assert df["d"].dtype == np.float64
+        assert df["e"].dtype == "category"
+        assert df["f"].dtype == object
+
+    def test_load_data_decode_bytes(self):
+
+        from astronomicAL.utils.load_data import decode_bytes
+
+        fixed_width = np.array([b"a", b"bc", "\u00e9".encode("utf-8")])
+        objects = np.array([b"a", None, b"bc"] * 10, dtype=object)
+        categorical = pd.Categorical([b"x", b"y", b"x"])
+
+        assert list(decode_bytes(fixed_width)) == ["a", "bc", "\u00e9"]
+        decoded = decode_bytes(objects)
+        assert list(decoded[pd.notna(decoded)]) == ["a", "bc"] * 10
+        assert pd.isna(decoded[1::3]).all()
+        assert list(decode_bytes(categorical)) == ["x", "y", "x"]
+        assert list(decode_bytes(categorical).categories) == ["x", "y"]
+        assert decode_bytes(np.array(["a", "b"], dtype=object)) is None
+        assert decode_bytes(np.arange(3)) is None
+
+    def test_source_index_lookup(self):
+
+        from astronomicAL.utils import source_index
+
+        config.settings = {"id_col": "A"}
+        df = self._create_test_df()
+        config.main_df = df
+
+        assert source_index.get_row_position("5") == 5
+        assert source_index.get_row_position("500") is None
+        assert source_index.contains_source("99")
+        assert not source_index.contains_source(5)
+
+        pd.testing.assert_frame_equal(source_index.get_source("7"), df.iloc[[7]])
+        assert len(source_index.get_source("500")) == 0
+
+        assert source_index.get_id_index() is source_index.get_id_index(df, "A")
+
+        config.main_df = df.iloc[::-1].reset_index(drop=True)
+
+        assert source_index.get_row_position("5") == 94
+
+    def test_load_data_get_table_schema(self):
+
+        from astropy.table import Table
+        from astronomicAL.utils.load_data import get_table_schema
+
+        t = Table([[1, 2], [4.0, 5.0], ["x", "y"]], names=("a", "b", "c"))
+
+        check_folder_exists("data")
+        t.write("data/table1.fits", format="fits", overwrite=True)
+        t.write("data/table1.csv", format="csv", overwrite=True)
+
+        fits_schema = get_table_schema("data/table1.fits")
+        csv_schema = get_table_schema("data/table1.csv")
+
+        os.remove("data/table1.fits")
+        os.remove("data/table1.csv")
+
+        assert list(fits_schema.keys()) == ["a", "b", "c"]
+        assert list(csv_schema.keys()) == ["a", "b", "c"]
+        assert fits_schema["a"] == np.int64
+        assert fits_schema["b"] == np.float64
+        assert fits_schema["c"].kind == "S"
+        assert csv_schema["b"] == np.float64
+
+    def test_training_data_active_pool_remove(self):
+
+        from astronomicAL.active_learning.training_data import ActivePool
+
+        x = np.arange(20).reshape((10, 2)).astype(float)
+        y = np.arange(10) % 2
+        ids = np.array([f"{i}" for i in range(10)], dtype=object)
+
+        pool = ActivePool(x, y, ids)
+
+        pool.remove([0, 3])
+        pool.remove_id("7")
+
+        assert len(pool) == 7
+        assert "0" not in pool
+        assert "7" not in pool
+        assert pool._x is x
+        assert sorted(pool.ids) == ["1", "2", "4", "5", "6", "8", "9"]
+
+        for i, source_id in enumerate(pool.ids):
+            assert pool.get_position(source_id) == i
+            assert pool.rows[i] == int(source_id)
+            assert list(pool.x[i]) == [2 * int(source_id), 2 * int(source_id) + 1]
+            assert pool.y[i] == int(source_id) % 2
+
+        assert np.array_equal(pool.take([1, 2]), pool.x[1:3])
+        assert np.array_equal(x, np.arange(20).reshape((10, 2)))
+
+        offset = ActivePool(x, y[:3], ids[:3], rows=[7, 8, 9])
+        offset.remove_id("1")
+        assert list(offset.rows) == [7, 9]
+        assert np.array_equal(offset.x, x[[7, 9]])
+
+        with pytest.raises(ValueError):
+            ActivePool(x, y, np.array(["a"] * 5 + ["b"] * 5, dtype=object))
+
+    def test_training_data_labelled_set_append(self):
+
+        from astronomicAL.active_learning.training_data import LabelledSet
+
+        x = np.arange(6).reshape((3, 2)).astype(float)
+
+        labelled = LabelledSet(x, [0, 1, 0], np.array(["a", "b", "c"]), capacity=4)
+        initial_buffer = labelled.x
+
+        labelled.append(np.array([[6.0, 7.0]]), [1], ["d"])
+
+        assert np.shares_memory(labelled.x, initial_buffer)
+
+        for i in range(10):
+            labelled.append(np.array([[i, i]]), [i % 2], [f"long_id_{i}"])
+
+        assert len(labelled) == 14
+        assert labelled.x.shape == (14, 2)
+        assert list(labelled.x[3]) == [6.0, 7.0]
+        assert list(labelled.y[:4]) == [0, 1, 0, 1]
+        assert labelled.ids[0] == "a"
+        assert labelled.ids[-1] == "long_id_9"
+
+    def test_incremental_trainer_refit_policy(self):
+
+        from astronomicAL.active_learning.incremental import (
+            IncrementalTrainer,
+            supports_incremental,
+        )
+        from modAL.models import ActiveLearner
+        from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+        from sklearn.neighbors import KNeighborsClassifier
+
+        rng = np.random.RandomState(0)
+        x = rng.randn(50, 3)
+        y = (x[:, 0] > 0).astype(int)
+
+        assert supports_incremental(RandomForestClassifier())
+        assert not supports_incremental(GradientBoostingClassifier())
+        assert not supports_incremental(KNeighborsClassifier())
+
+        learner = ActiveLearner(
+            estimator=RandomForestClassifier(n_estimators=20, random_state=0),
+            X_training=x[:10],
+            y_training=y[:10],
+        )
+        trainer = IncrementalTrainer(learner, incremental=True, refit_every=3)
+
+        first_trees = list(learner.estimator.estimators_)
+
+        trainer.fit(x[:11], y[:11])
+        assert trainer.last_fit == "incremental"
+        assert len(learner.estimator.estimators_) == 20
+        assert learner.estimator.n_estimators == 20
+        assert learner.estimator.estimators_[:18] == first_trees[2:]
+        assert not learner.estimator.warm_start
+
+        first_seeds = [
+            tree.random_state for tree in learner.estimator.estimators_[-2:]
+        ]
+
+        trainer.fit(x[:12], y[:12])
+        assert trainer.last_fit == "incremental"
+        assert len(learner.estimator.estimators_) == 20
+        assert learner.estimator.estimators_[:16] == first_trees[4:]
+        assert learner.estimator.random_state == 0
+
+        second_seeds = [
+            tree.random_state for tree in learner.estimator.estimators_[-2:]
+        ]
+        assert first_seeds != second_seeds
+        assert learner.estimator.predict_proba(x).shape == (50, 2)
+
+        trainer.fit(x[:13], y[:13])
+        assert trainer.last_fit == "full"
+        assert len(learner.estimator.estimators_) == 20
+        assert learner.X_training.shape[0] == 13
+
+        learner = ActiveLearner(
+            estimator=KNeighborsClassifier(3),
+            X_training=x[:10],
+            y_training=y[:10],
+        )
+        trainer = IncrementalTrainer(learner, incremental=True, refit_every=3)
+        trainer.fit(x[:11], y[:11])
+        assert trainer.last_fit == "full"
+
+    def test_training_worker_runs_synchronously_without_server(self):
+
+        from astronomicAL.active_learning.worker import TrainingWorker
+
+        worker = TrainingWorker()
+        results = []
+        errors = []
+
+        worker.submit(lambda: 5, results.append, on_error=errors.append)
+
+        assert results == [5]
+        assert not worker.is_busy()
+
+        def _fail():
+            raise ValueError("failed")
+
+        with pytest.raises(ValueError):
+            worker.submit(_fail, results.append, on_error=errors.append)
+
+        assert results == [5]
+        assert len(errors) == 1
+
+    def test_speculative_cache_keeps_only_chosen_branch(self):
+
+        from astronomicAL.active_learning.speculative import SpeculativeCache
+        from astronomicAL.active_learning.worker import TrainingWorker
+        from concurrent.futures import Future
+
+        worker = TrainingWorker()
+        cache = SpeculativeCache(max_size=2)
+
+        for label in [1, 0]:
+            future = worker.submit_background(lambda label=label: label * 10)
+            assert future.done()
+            cache.put(("a", label), future)
+
+        assert len(cache) == 2
+
+        pending = Future()
+        cache.put(("b", 1), pending)
+
+        assert len(cache) == 2
+        assert ("a", 1) not in cache
+        assert ("b", 1) in cache
+
+        branch = cache.take(("a", 0))
+
+        assert branch.result() == 0
+        assert len(cache) == 0
+        assert pending.cancelled()
+
+        assert cache.take(("a", 1)) is None
+
+    def test_batch_query_top_k_and_diverse(self):
+
+        from astronomicAL.active_learning.batch import (
+            kmeans_plusplus_select,
+            query_batch,
+        )
+        from modAL.models import ActiveLearner
+        from modAL.uncertainty import uncertainty_sampling
+        from sklearn.linear_model import LogisticRegression
+
+        clusters = np.array([[0.0, 0.0], [10.0, 10.0], [-10.0, 10.0]])
+        X = np.repeat(clusters, 4, axis=0) + np.tile(
+            np.arange(4).reshape(-1, 1) * 0.01, (3, 2)
+        )
+
+        chosen = kmeans_plusplus_select(X, 3, first=0)
+
+        assert chosen[0] == 0
+        assert len(set((chosen // 4).tolist())) == 3
+
+        rng = np.random.RandomState(0)
+        X_pool = rng.randn(200, 2)
+        learner = ActiveLearner(
+            estimator=LogisticRegression(),
+            query_strategy=uncertainty_sampling,
+            X_training=np.array([[-1.0, 0.0], [1.0, 0.0]]),
+            y_training=np.array([0, 1]),
+        )
+
+        single_index, _ = query_batch(learner, X_pool, batch_size=1)
+        expected_index, _ = learner.query(X_pool)
+        assert list(single_index) == list(expected_index)
+
+        top_index, top_instance = query_batch(learner, X_pool, batch_size=5)
+        assert len(set(top_index.tolist())) == 5
+        assert np.array_equal(top_instance, X_pool[top_index])
+
+        diverse_index, diverse_instance = query_batch(
+            learner, X_pool, batch_size=5, diversity="k-means++"
+        )
+        assert len(set(diverse_index.tolist())) == 5
+        assert diverse_index[0] == single_index[0]
+        assert np.array_equal(diverse_instance, X_pool[diverse_index])
+
+    def test_pool_scoring_candidates(self):
+
+        from astronomicAL.active_learning.training_data import ActivePool
+        from modAL.models import ActiveLearner
+        from modAL.uncertainty import classifier_uncertainty, uncertainty_sampling
+        from sklearn.linear_model import LogisticRegression
+
+        rng = np.random.RandomState(0)
+        x = rng.randn(500, 2)
+        pool = ActivePool(x, np.zeros(500), np.arange(500))
+
+        learner = ActiveLearner(
+            estimator=LogisticRegression(),
+            query_strategy=uncertainty_sampling,
+            X_training=np.array([[-1.0, 0.0], [1.0, 0.0]]),
+            y_training=np.array([0, 1]),
+        )
+
+        scoring_dict = query_strategies.get_pool_scoring_dict()
+
+        assert scoring_dict["Full Pool"](50).candidates(learner, pool) is None
+        assert scoring_dict["Random Subsample"](1000).candidates(learner, pool) is None
+
+        for name in ["Random Subsample", "Stratified Subsample"]:
+            candidates = scoring_dict[name](50).candidates(learner, pool)
+
+            assert len(candidates) == 50
+            assert len(np.unique(candidates)) == 50
+            assert candidates.max() < len(pool)
+
+        heap = scoring_dict["Cached Score Heap"](50)
+        candidates = heap.candidates(learner, pool)
+        best = int(np.argmax(classifier_uncertainty(learner, pool.x)))
+
+        assert len(candidates) == 50
+        assert best in candidates
+
+        pool.remove_id(best)
+        learner.teach(np.array([[0.0, 1.0]]), np.array([1]))
+
+        candidates = heap.candidates(learner, pool)
+
+        assert len(candidates) == 50
+        assert candidates.max() < len(pool)
+        assert best not in pool.ids[candidates]
+
+        stratified = scoring_dict["Stratified Subsample"](50)
+        stratified.candidates(learner, pool)
+        strata = stratified._kmeans.predict(pool.x)
+
+        predicted = []
+        predict = stratified._kmeans.predict
+        stratified._kmeans.predict = lambda x: predicted.append(x) or predict(x)
+
+        pool.remove(np.arange(10))
+        stratified.candidates(learner, pool)
+
+        assert predicted == []
+        assert np.array_equal(stratified._get_strata(pool), predict(pool.x))
+        assert np.array_equal(
+            np.sort(stratified._get_strata(pool)), np.sort(strata[10:])
+        )
+
+        nan_heap = scoring_dict["Cached Score Heap"](5)
+        scores = np.arange(len(pool), dtype=float)
+        scores[-5:] = np.nan
+        candidates = nan_heap.candidates(
+            learner, pool, score=lambda positions: scores[positions]
+        )
+
+        assert list(candidates) == list(range(len(pool) - 10, len(pool) - 5))
+
+    def test_chunked_inference_matches_whole_prediction(self):
+
+        from astronomicAL.utils.inference import (
+            apply_chunked,
+            predict_chunked,
+            predict_proba_chunked,
+        )
+        from sklearn.tree import DecisionTreeClassifier
+
+        rng = np.random.RandomState(0)
+        X = rng.randn(1003, 4)
+        y = (X[:, 0] > 0).astype(int)
+        model = DecisionTreeClassifier(random_state=0, max_depth=3).fit(X, y)
+
+        for n_jobs in [1, 3]:
+            proba = predict_proba_chunked(model, X, chunk_size=100, n_jobs=n_jobs)
+            assert np.array_equal(proba, model.predict_proba(X))
+
+            pred = predict_chunked(
+                model, pd.DataFrame(X), chunk_size=100, n_jobs=n_jobs
+            )
+            assert np.array_equal(pred, model.predict(X))
+
+        out = np.zeros((len(X), 2))
+        result = predict_proba_chunked(model, X, out=out, chunk_size=250)
+        assert result is out
+        assert np.array_equal(out, model.predict_proba(X))
+
+        assert np.array_equal(apply_chunked(np.sum, X[:0]), np.sum(X[:0]))
+
+    def test_prediction_cache_predicts_each_row_once(self):
+
+        from astronomicAL.active_learning.predictions import PredictionCache
+        from astronomicAL.active_learning.training_data import ActivePool
+        from modAL.disagreement import vote_entropy
+        from modAL.models import ActiveLearner, Committee
+        from modAL.uncertainty import classifier_margin, margin_sampling
+        from sklearn.neighbors import KNeighborsClassifier
+        from sklearn.tree import DecisionTreeClassifier
+
+        rng = np.random.RandomState(0)
+        X = rng.randn(300, 3)
+        X_train = X[:20]
+        y_train = (X_train[:, 0] > 0).astype(int)
+
+        learner = ActiveLearner(
+            estimator=DecisionTreeClassifier(random_state=0, max_depth=2),
+            query_strategy=margin_sampling,
+            X_training=X_train,
+            y_training=y_train,
+        )
+
+        cache = PredictionCache(learner, pd.DataFrame(X))
+        predicted = []
+        predict_rows = cache._predict_rows
+
+        def _count_rows(rows):
+            predicted.extend(rows.tolist())
+            return predict_rows(rows)
+
+        cache._predict_rows = _count_rows
+
+        known = np.arange(0, 300, 2)
+        assert np.array_equal(cache.predict_proba(known), learner.predict_proba(X[known]))
+
+        pool = ActivePool(X, np.zeros(300), np.arange(300))
+        pool.remove([0, 5, 7])
+        rows = pool.rows
+
+        assert np.array_equal(pool.x, X[rows])
+        assert np.allclose(cache.utility(rows), -classifier_margin(learner, X[rows]))
+        assert sorted(predicted) == sorted(set(known.tolist()) | set(rows.tolist()))
+
+        committee = Committee(
+            learner_list=[
+                learner,
+                ActiveLearner(
+                    estimator=KNeighborsClassifier(3),
+                    X_training=X_train,
+                    y_training=y_train,
+                ),
+            ]
+        )
+        cache = PredictionCache(committee, X)
+
+        assert np.allclose(cache.predict_proba(rows), committee.predict_proba(X[rows]))
+        assert np.allclose(cache.utility(rows), vote_entropy(committee, X[rows]))
+        assert cache.get("val_pred", lambda: 1) == 1
+        assert cache.get("val_pred", lambda: 2) == 1
+
+    def test_binary_metrics_match_sklearn(self):
+
+        from astronomicAL.utils.metrics import (
+            binary_classification_metrics,
+            binary_confusion_matrix,
+        )
+        from sklearn.metrics import (
+            accuracy_score,
+            confusion_matrix,
+            f1_score,
+            precision_score,
+            recall_score,
+        )
+
+        rng = np.random.RandomState(0)
+        y_true = rng.randint(0, 2, 500)
+        y_pred = np.where(rng.rand(500) < 0.8, y_true, 1 - y_true)
+
+        scores, conf = binary_classification_metrics(
+            pd.DataFrame({"labels": y_true}), y_pred.reshape((-1, 1))
+        )
+
+        assert np.array_equal(conf, confusion_matrix(y_true, y_pred))
+        assert np.isclose(scores["acc"], accuracy_score(y_true, y_pred))
+        assert np.isclose(scores["prec"], precision_score(y_true, y_pred))
+        assert np.isclose(scores["rec"], recall_score(y_true, y_pred))
+        assert np.isclose(scores["f1"], f1_score(y_true, y_pred))
+
+        scores, conf = binary_classification_metrics([0, 0, 0], [0, 0, 0])
+
+        assert np.array_equal(conf, [[3, 0], [0, 0]])
+        assert scores == {"acc": 1.0, "prec": 0.0, "rec": 0.0, "f1": 0.0}
+
+        with pytest.raises(ValueError):
+            binary_confusion_matrix([0, 2], [0, 1])
+
+    def test_preprocessing_is_shared_between_labels(self):
+
+        from astronomicAL.active_learning import preprocessing
+
+        data = self._create_test_df()
+        config.main_df = data
+        config.ml_data = {}
+
+        config.settings = {
+            "id_col": "A",
+            "label_col": "B",
+            "default_vars": ["C", "D"],
+            "labels": [0, 1, 2],
+            "labels_to_strings": {"0": "0", "1": "1", "2": "2"},
+            "strings_to_labels": {"0": 0, "1": 1, "2": 2},
+            "labels_to_train": ["0", "1", "2"],
+            "features_for_training": ["C", "D"],
+            "exclude_labels": False,
+            "exclude_unknown_labels": False,
+            "unclassified_labels": [],
+            "scale_data": False,
+            "feature_generation": [["subtract (a-b)", 2]],
+        }
+
+        preprocessing.preprocess_data(data)
+
+        assert "C-D" in data.columns
+        assert preprocessing.is_preprocessed(data)
+
+        x_train = config.ml_data["x_train_with_unknowns"]
+        preprocessing.preprocess_data(data)
+
+        assert config.ml_data["x_train_with_unknowns"] is x_train
+
+        y_train = config.ml_data["y_train_without_unknowns"]["B"]
+        for label in [0, 1, 2]:
+            targets = preprocessing.get_one_vs_rest_targets(label)
+
+            assert targets is preprocessing.get_one_vs_rest_targets(label)
+            assert list(targets["y_train_without_unknowns"]["B"]) == list(
+                (y_train == label).astype(int)
+            )
+
+        config.settings["scale_data"] = True
+
+        assert not preprocessing.is_preprocessed(data)
+
+        preprocessing.preprocess_data(data)
+
+        assert config.ml_data["x_train_with_unknowns"] is not x_train
+        assert "scaler" in config.ml_data
+        assert "one_vs_rest" not in config.ml_data
+
+        config.ml_data = {}
+
+    def test_preprocessing_artefacts_are_loaded_from_disk(self, tmp_path):
+
+        from astronomicAL.active_learning import preprocessing
+        import shutil
+
+        data = self._create_test_df()
+        data["C"] = data["C"] * 1.5
+        filename = str(tmp_path / "data.csv")
+        data.to_csv(filename, index=False)
+
+        config.cache_dir = str(tmp_path / "cache")
+        config.ml_data = {}
+
+        config.settings = {
+            "dataset_filepath": filename,
+            "id_col": "A",
+            "label_col": "B",
+            "default_vars": ["C", "D"],
+            "labels": [0, 1, 2],
+            "labels_to_strings": {"0": "0", "1": "1", "2": "2"},
+            "strings_to_labels": {"0": 0, "1": 1, "2": 2},
+            "labels_to_train": ["0", "1", "2"],
+            "features_for_training": ["C", "D"],
+            "exclude_labels": False,
+            "exclude_unknown_labels": False,
+            "unclassified_labels": [],
+            "scale_data": True,
+            "feature_generation": [["subtract (a-b)", 2]],
+        }
+
+        preprocessing.preprocess_data(data.copy())
+        expected = dict(config.ml_data)
+
+        assert len(os.listdir(config.cache_dir)) == 1
+
+        config.ml_data = {}
+        restarted = data.copy()
+        preprocessing.preprocess_data(restarted)
+
+        assert "C-D" in restarted.columns
+        for key in expected.keys():
+            if isinstance(expected[key], pd.DataFrame):
+                pd.testing.assert_frame_equal(config.ml_data[key], expected[key])
+
+        features = restarted[["C", "D", "C-D"]].to_numpy()
+        assert np.array_equal(
+            config.ml_data["scaler"].transform(features),
+            expected["scaler"].transform(features),
+        )
+
+        config.ml_data = {}
+        config.settings["feature_generation"] = []
+        preprocessing.preprocess_data(data.copy())
+
+        assert list(config.ml_data["x_val"].columns) == ["C", "D"]
+        assert len(os.listdir(config.cache_dir)) == 1
+
+        shutil.rmtree(config.cache_dir)
+        config.cache_dir = "data/cache"
+        config.ml_data = {}
+
+    def test_derived_features_are_evaluated_lazily(self):
+
+        from astronomicAL.utils import derived_features
+
+        derived_features.clear_cache()
+
+        data = pd.DataFrame(
+            {"A": [1.0, 10.0, 100.0], "B": [10.0, 10.0, 10.0], "C-D": [1.0, 2.0, 3.0]}
+        )
+
+        config.settings = {
+            "derived_features": {
+                "log_ratio": "log10(A / B)",
+                "double": "2 * log_ratio + `C-D`",
+                "loop": "loop + 1",
+            }
+        }
+
+        assert derived_features.get_expression_columns("2 * log_ratio + `C-D`") == [
+            "C-D",
+            "log_ratio",
+        ]
+        assert derived_features.list_columns(data) == [
+            "A",
+            "B",
+            "C-D",
+            "log_ratio",
+            "double",
+            "loop",
+        ]
+        assert list(data.columns) == ["A", "B", "C-D"]
+        assert len(derived_features._cached_columns) == 0
+
+        column = derived_features.get_column(data, "double")
+
+        assert np.allclose(column, [-1.0, 2.0, 5.0])
+        assert list(column.index) == list(data.index)
+        assert len(derived_features._cached_columns) == 2
+
+        assert derived_features.get_column(data, "A") is not None
+        pd.testing.assert_frame_equal(
+            derived_features.get_columns(data, ["A", "log_ratio"]),
+            pd.DataFrame({"A": data["A"], "log_ratio": [-1.0, 0.0, 1.0]}),
+        )
+
+        with pytest.raises(ValueError):
+            derived_features.get_column(data, "loop")
+        with pytest.raises(ValueError):
+            derived_features.get_column(data, "missing")
+        with pytest.raises(ValueError):
+            derived_features.parse_expression("__import__('os')")
+        with pytest.raises(ValueError):
+            derived_features.parse_expression("A.values")
+
+        selected = data.iloc[[0]].reset_index(drop=True)
+        assert derived_features.get_column(selected, "log_ratio", cache=False)[0] == -1
+        assert derived_features._cache_state["frame"]() is data
+
+        config.derived_cache_size = 2 * 3 * 8
+        derived_features.get_column(data, "double")
+        derived_features.get_column(data, "log_ratio")
+        derived_features.get_column(data, "double")
+
+        assert list(derived_features._cached_columns.keys()) == [
+            ("log_ratio", "log10(A / B)"),
+            ("double", "2 * log_ratio + `C-D`"),
+        ]
+
+        config.derived_cache_size = 3 * 8
+        derived_features.clear_cache()
+        derived_features.get_column(data, "double")
+
+        assert list(derived_features._cached_columns.keys()) == [
+            ("double", "2 * log_ratio + `C-D`")
+        ]
+
+        config.derived_cache_size = 256 * 1024 ** 2
+        derived_features.clear_cache()
+
+    def test_derived_features_are_listed_in_dashboards(self):
+
+        from astronomicAL.utils import derived_features
+
+        derived_features.clear_cache()
+        config.main_df = self._create_test_df()
+        config.settings = {
+            "id_col": "A",
+            "label_col": "B",
+            "default_vars": ["C", "D"],
+            "label_colours": {0: "#ffad0e", 1: "#0057ff", 2: "#a2a2a2"},
+            "labels_to_strings": {"0": "0", "1": "1", "2": "2"},
+            "derived_features": {"C+D": "C + D"},
+        }
+
+        src = ColumnDataSource({c: [] for c in config.main_df.columns})
+        plot_dashboard = PlotDashboard(src, pn.widgets.Button())
+
+        assert "C+D" in plot_dashboard.param.X_variable.objects
+        assert "C+D" not in config.main_df.columns
+        assert len(derived_features._cached_columns) == 0
+
+        plot_dashboard.plot("C+D", "D")
+
+        assert "C+D" not in config.main_df.columns
+        assert len(derived_features._cached_columns) == 1
+
+        derived_features.clear_cache()
+
+    def test_preprocessed_sets_are_views_of_one_float32_matrix(self):
+
+        from astronomicAL.active_learning import preprocessing
+
+        data = self._create_test_df()
+        data["C"] = data["C"] * 1.5
+        data.loc[data.index % 10 == 0, "B"] = -1
+        config.main_df = data
+        config.ml_data = {}
+
+        config.settings = {
+            "id_col": "A",
+            "label_col": "B",
+            "default_vars": ["C", "D"],
+            "labels": [-1, 0, 1, 2],
+            "labels_to_strings": {"-1": "Unknown", "0": "0", "1": "1", "2": "2"},
+            "strings_to_labels": {"Unknown": -1, "0": 0, "1": 1, "2": 2},
+            "labels_to_train": ["0", "1", "2"],
+            "features_for_training": ["C", "D"],
+            "exclude_labels": False,
+            "exclude_unknown_labels": False,
+            "unclassified_labels": [],
+            "scale_data": True,
+            "feature_generation": [["subtract (a-b)", 2]],
+        }
+
+        preprocessing.preprocess_data(data)
+
+        x = config.ml_data["x"]
+
+        assert x.dtype == np.float32
+        assert x.flags["C_CONTIGUOUS"]
+
+        num_rows = 0
+        for name in ["train_with_unknowns", "val", "test"]:
+            values = config.ml_data[f"x_{name}"].to_numpy()
+            assert np.shares_memory(values, x)
+            assert list(config.ml_data[f"x_{name}"].index) == list(
+                config.ml_data[f"y_{name}"].index
+            )
+            num_rows += len(values)
+
+        assert num_rows == x.shape[0]
+
+        x_train = config.ml_data["x_train_with_unknowns"]
+        known = config.ml_data["y_train_with_unknowns"]["B"].to_numpy() != -1
+
+        assert np.count_nonzero(~known) > 0
+        assert np.shares_memory(config.ml_data["x_train_without_unknowns"], x)
+        assert np.array_equal(
+            config.ml_data["x_train_without_unknowns"].to_numpy(),
+            x_train.to_numpy()[known],
+        )
+
+        ids = config.ml_data["id_train_with_unknowns"]["A"]
+        raw = data.set_index("A").loc[ids, ["C", "D", "C-D"]]
+        raw = raw.to_numpy(dtype=np.float64)
+        assert np.array_equal(
+            x_train.to_numpy(),
+            config.ml_data["scaler"].transform(raw).astype(np.float32),
+        )
+
+        large = pd.DataFrame({"C": [1.0, 1e300], "D": [1.0, 2.0]})
+        matrix = preprocessing.create_feature_matrix(
+            large, ["C", "D"], [np.array([0, 1]), np.array([0, 1])]
+        )
+
+        assert matrix.dtype == np.float64
+        assert matrix.flags["C_CONTIGUOUS"]
+        assert np.array_equal(matrix, np.concatenate([large.to_numpy()] * 2))
+
+    def test_preprocessed_sets_are_split_by_row_index(self):
+
+        from astronomicAL.active_learning import preprocessing
+        from sklearn.preprocessing import RobustScaler
+
+        data = self._create_test_df()
+        data["D"] = np.sqrt(data["D"])
+        config.main_df = data
+        config.ml_data = {}
+
+        config.settings = {
+            "id_col": "A",
+            "label_col": "B",
+            "default_vars": ["C", "D"],
+            "labels": [0, 1, 2],
+            "labels_to_strings": {"0": "0", "1": "1", "2": "2"},
+            "strings_to_labels": {"0": 0, "1": 1, "2": 2},
+            "labels_to_train": ["0", "1", "2"],
+            "features_for_training": ["C", "D"],
+            "exclude_labels": True,
+            "unclassified_labels": ["2"],
+            "scale_data": True,
+            "feature_generation": [],
+            "test_set_file": True,
+        }
+
+        if os.path.exists("data/test_set.json"):
+            os.rename("data/test_set.json", "data/test_set_cp.json")
+
+        # "2" and "5" have the excluded label 2 in `data`.
+        test_set = {"2": 0, "5": 1, "7": 0, "9": 1}
+        with open("data/test_set.json", "w") as json_file:
+            json.dump(test_set, json_file)
+
+        try:
+            preprocessing.preprocess_data(data)
+        finally:
+            os.remove("data/test_set.json")
+            if os.path.exists("data/test_set_cp.json"):
+                os.rename("data/test_set_cp.json", "data/test_set.json")
+
+        id_test = config.ml_data["id_test"]["A"]
+        y_test = config.ml_data["y_test"]["B"]
+
+        assert sorted(id_test) == sorted(test_set.keys())
+        assert dict(zip(id_test, y_test)) == test_set
+
+        ids = [
+            list(config.ml_data[f"id_{name}"]["A"])
+            for name in ["train_with_unknowns", "val", "test"]
+        ]
+        all_ids = ids[0] + ids[1] + ids[2]
+        expected = [i for i in data["A"] if (data["B"][int(i)] != 2)]
+
+        assert len(all_ids) == len(set(all_ids))
+        assert sorted(all_ids) == sorted(expected + ["2", "5"])
+
+        rows = data.set_index("A").loc[ids[0], ["C", "D"]].to_numpy()
+        scaler = config.ml_data["scaler"]
+        expected_scaler = RobustScaler().fit(rows)
+
+        assert np.allclose(scaler.center_, expected_scaler.center_)
+        assert np.allclose(scaler.scale_, expected_scaler.scale_)
+
+        constant = pd.DataFrame({"C": [1.0, 1.0, 1.0], "D": [1.0, np.nan, 3.0]})
+        scaler = preprocessing.fit_scaler(constant, ["C", "D"], np.arange(3))
+        expected_scaler = RobustScaler().fit(constant.to_numpy())
+
+        assert np.array_equal(scaler.center_, expected_scaler.center_)
+        assert np.array_equal(scaler.scale_, expected_scaler.scale_)
+
+    def test_streaming_scaler_matches_robust_scaler(self):
+
+        from astronomicAL.active_learning import preprocessing
+
+        rng = np.random.RandomState(0)
+        values = np.concatenate(
+            [rng.lognormal(size=5000), [np.nan, np.inf, -1e300, 1e300, -0.0, 0.0]]
+        )
+        rng.shuffle(values)
+        rows = rng.permutation(len(values))[:4000]
+
+        for bins, chunk_size in [(4, 100), (1024, 1000), (16, 10000)]:
+            found = preprocessing.streaming_quantiles(
+                values, rows, [0.5, 0.25, 0.75, 0.0, 0.99], bins, chunk_size
+            )
+            expected = np.nanpercentile(values[rows], [50, 25, 75, 0, 99])
+            assert np.allclose(found, expected, rtol=1e-15, atol=0)
+
+        found = preprocessing.streaming_quantiles(np.full(10, np.nan), rows % 10, [0.5])
+        assert np.isnan(found).all()
+
+        data = self._create_test_df()
+        data["D"] = rng.randn(len(data))
+        data["E"] = 1.0
+        config.main_df = data
+        config.ml_data = {}
+
+        config.settings = {
+            "id_col": "A",
+            "label_col": "B",
+            "labels_to_strings": {"0": "0", "1": "1", "2": "2"},
+            "strings_to_labels": {"0": 0, "1": 1, "2": 2},
+            "streaming_scaling": True,
+        }
+
+        rows = rng.permutation(len(data))[:60]
+        scaler = preprocessing.fit_scaler(data, ["C", "D", "E"], rows)
+
+        config.settings["streaming_scaling"] = False
+        expected = preprocessing.fit_scaler(data, ["C", "D", "E"], rows)
+
+        assert type(scaler) is type(expected)
+        assert np.allclose(scaler.center_, expected.center_, rtol=1e-15, atol=0)
+        assert np.allclose(scaler.scale_, expected.scale_, rtol=1e-15, atol=0)
+        assert scaler.scale_[2] == 1.0
+
+    def test_parallel_committee_matches_committee(self):
+
+        from astronomicAL.active_learning.committee import (
+            ParallelCommittee,
+            map_members,
+        )
+        from astronomicAL.active_learning.incremental import IncrementalTrainer
+        from modAL.models import ActiveLearner, Committee
+        from sklearn.neighbors import KNeighborsClassifier
+        from sklearn.tree import DecisionTreeClassifier
+
+        rng = np.random.RandomState(0)
+        X = rng.randn(300, 3)
+        y = (X[:, 0] > 0).astype(int) + (X[:, 1] > 1).astype(int)
+
+        def _learners():
+            return [
+                ActiveLearner(
+                    estimator=DecisionTreeClassifier(random_state=0, max_depth=3)
+                ),
+                ActiveLearner(estimator=KNeighborsClassifier(3)),
+            ]
+
+        learners = _learners()
+        trainers = [IncrementalTrainer(learner) for learner in learners]
+
+        results, seconds = map_members(lambda trainer: trainer.fit(X, y), trainers)
+
+        assert results == [None, None]
+        assert len(seconds) == 2
+        assert all(trainer.fit_time > 0 for trainer in trainers)
+
+        # The second member never sees the third class.
+        expected = _learners()
+        expected[0].fit(X, y)
+        expected[1].fit(X[y < 2], y[y < 2])
+        learners[1].fit(X[y < 2], y[y < 2])
+
+        committee = ParallelCommittee(learner_list=learners, n_jobs=2)
+        expected = Committee(learner_list=expected)
+
+        assert np.array_equal(committee.vote_proba(X), expected.vote_proba(X))
+        assert np.array_equal(committee.vote(X), expected.vote(X))
+        assert np.array_equal(committee.predict(X), expected.predict(X))
+
+        times = committee.predict_times()
+
+        assert times.shape == (2,)
+        assert (times > 0).all()
+
+        committee.reset_predict_times()
+
+        assert (committee.predict_times() == 0).all()
+
+    def test_optimise_bounds_are_found_in_one_pass(self):
+
+        values = np.arange(200000, dtype=np.float64)
+        values[::7] = np.nan
+        values[100000] = -3.0
+        values[-65536:] = np.nan
+
+        assert optimise.get_bounds(values) == (-3.0, 134462.0)
+        assert optimise.get_bounds(values, (-5.0, 10.0)) == (-5.0, 134462.0)
+        assert optimise.get_bounds(values[:0]) is None
+        assert np.isnan(optimise.get_bounds(np.full(5, np.nan))).all()
+        assert optimise.get_float_bound(values) == 134462.0
+        assert optimise.get_int_dtype(np.arange(-129, 100)) == np.int16
+
+    def test_committee_uses_one_layer_of_threads(self):
+
+        from astronomicAL.active_learning.committee import (
+            ParallelCommittee,
+            share_n_jobs,
+        )
+        from astronomicAL.utils.inference import DEFAULT_N_JOBS, get_chunk_n_jobs
+        from modAL.models import ActiveLearner
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.neighbors import KNeighborsClassifier
+        from sklearn.tree import DecisionTreeClassifier
+
+        forest = RandomForestClassifier(n_estimators=5, n_jobs=-1)
+        knn = KNeighborsClassifier(3, n_jobs=-1)
+        tree = DecisionTreeClassifier()
+
+        assert get_chunk_n_jobs(forest) == 1
+        assert get_chunk_n_jobs(ActiveLearner(estimator=tree)) == DEFAULT_N_JOBS
+
+        share_n_jobs([forest, knn, tree], n_jobs=8)
+
+        assert forest.n_jobs == 2
+        assert knn.n_jobs == 2
+
+        share_n_jobs([forest, knn], n_jobs=1)
+
+        assert forest.n_jobs == 1
+        assert get_chunk_n_jobs(forest) == DEFAULT_N_JOBS
+
+        X = np.random.RandomState(0).randn(20, 2)
+        y = (X[:, 0] > 0).astype(int)
+        committee = ParallelCommittee(
+            learner_list=[
+                ActiveLearner(estimator=forest, X_training=X, y_training=y),
+                ActiveLearner(estimator=tree, X_training=X, y_training=y),
+            ]
+        )
+
+        assert get_chunk_n_jobs(committee) == 1
+
+    @pytest.mark.parametrize("backend", ["numpy", "numexpr"])
+    def test_derived_features_give_the_same_result_with_each_backend(
+        self, backend, monkeypatch
+    ):
+
+        from astronomicAL.utils import derived_features
+
+        if backend == "numexpr":
+            monkeypatch.setattr(
+                derived_features, "numexpr", pytest.importorskip("numexpr")
+            )
+        else:
+            monkeypatch.setattr(derived_features, "numexpr", None)
+
+        derived_features.clear_cache()
+
+        data = pd.DataFrame({"A": [1.0, 10.0, 100.0], "B-C": [2.0, -1.0, 4.0]})
+
+        config.settings = {
+            "derived_features": {
+                "log_a": "log10(A)",
+                "mixed": "where(`B-C` > 0, sqrt(`B-C`), abs(`B-C`)) * log_a + 1",
+            }
+        }
+
+        expected = np.where(
+            data["B-C"] > 0, np.sqrt(np.abs(data["B-C"])), np.abs(data["B-C"])
+        ) * np.log10(data["A"]) + 1
+
+        assert np.allclose(derived_features.get_column(data, "mixed"), expected)
+        assert np.allclose(
+            derived_features.evaluate_expression(data, "2 * A"), [2.0, 20.0, 200.0]
+        )
+
+        derived_features.clear_cache()
+
+    def test_custom_plots_only_receive_their_columns(self):
+
+        from astronomicAL.utils import derived_features
+
+        derived_features.clear_cache()
+
+        data = self._create_test_df()
+        config.main_df = data
+        config.settings = {
+            "id_col": "A",
+            "label_col": "B",
+            "C+D": "C+D",
+            "derived_features": {"C+D": "C + D"},
+        }
+
+        received = []
+        plot = CustomPlot(lambda df, selected=None: received.append(df), ["C+D"])
+        plot.plot(pn.widgets.Button())(data)
+
+        assert list(received[0].columns) == ["A", "B", "C+D"]
+        assert np.array_equal(received[0]["C+D"], data["C"] + data["D"])
+        assert "C+D" not in data.columns
+
+        derived_features.clear_cache()
+
+    def test_query_buttons_are_locked_while_the_worker_runs(
+        self, tmp_path, monkeypatch
+    ):
+
+        # Trained models are saved relative to the working directory.
+        monkeypatch.chdir(tmp_path)
+
+        rng = np.random.RandomState(1)
+        data = pd.DataFrame(
+            {
+                "A": [str(i) for i in range(300)],
+                "B": rng.randint(0, 3, 300),
+                "C": rng.randn(300),
+                "D": rng.randn(300),
+            }
+        )
+        config.main_df = data
+        config.ml_data = {}
+        config.settings = {
+            "id_col": "A",
+            "label_col": "B",
+            "default_vars": ["C", "D"],
+            "labels": [0, 1, 2],
+            "label_colours": {0: "#ffad0e", 1: "#0057ff", 2: "#a2a2a2"},
+            "labels_to_strings": {"0": "0", "1": "1", "2": "2"},
+            "strings_to_labels": {"0": 0, "1": 1, "2": 2},
+            "extra_info_cols": [],
+            "extra_image_cols": [],
+            "labels_to_train": ["1"],
+            "features_for_training": ["C", "D"],
+            "exclude_labels": False,
+            "exclude_unknown_labels": False,
+            "unclassified_labels": [],
+            "scale_data": False,
+            "feature_generation": [],
+            "test_set_file": False,
+        }
+
+        model = ActiveLearningModel(ColumnDataSource(), data, "1")
+        model.classifier_dropdown.value = "DTree"
+        model._add_classifier_cb(None)
+        model._start_training_cb(None)
+
+        queried_id = model.id_pool[model.query_index][0]
+
+        jobs = []
+        model.worker.submit = lambda job, on_done, **kwargs: jobs.append(
+            (job, on_done)
+        )
+
+        model.assign_label_group.value = "1"
+        model._assign_label_cb(None)
+        model._next_iteration_cb(None)
+
+        buttons = [
+            model.assign_label_button,
+            model.show_queried_button,
+            model.checkpoint_button,
+        ]
+
+        assert all(button.disabled for button in buttons)
+        assert model.id_al_train[-1] == queried_id
+
+        job, on_done = jobs.pop()
+        on_done(job())
+
+        assert not any(button.disabled for button in buttons)
+        assert queried_id not in model.pool